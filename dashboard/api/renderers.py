@@ -0,0 +1,39 @@
+"""
+Renderers for the dashboard API.
+"""
+
+from rest_framework.renderers import JSONRenderer
+from rest_framework.settings import api_settings
+
+from ..encoders import dumps_bytes
+
+
+class DashboardJSONRenderer(JSONRenderer):
+    """
+    JSON renderer encoding with orjson when it is installed.
+
+    Output is the same as Django REST framework's renderer with its default
+    compact, unicode settings; pretty printed or ASCII-only responses are
+    left to it.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+
+        indent = self.get_indent(accepted_media_type, renderer_context or {})
+        if indent is not None or self.ensure_ascii or not self.compact:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        ret = dumps_bytes(data, default=self.encoder_class().default)
+        # Escape the line separators that are not valid in JavaScript strings,
+        # as Django REST framework does
+        return ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+
+
+def get_renderer_classes():
+    """Return the configured renderer classes, using DashboardJSONRenderer for JSON."""
+    return [
+        DashboardJSONRenderer if renderer_class is JSONRenderer else renderer_class
+        for renderer_class in api_settings.DEFAULT_RENDERER_CLASSES
+    ]
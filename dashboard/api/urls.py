@@ -10,9 +10,14 @@ app_name = 'api'
 urlpatterns = [
     # Widget endpoints
     path('widgets/', views.WidgetListAPI.as_view(), name='widget_list'),
+    path('widgets/batch/', views.WidgetBatchAPI.as_view(), name='widget_batch'),
     path('widgets/<str:widget_id>/', views.WidgetDetailAPI.as_view(), name='widget_detail'),
     path('charts/<str:widget_id>/', views.ChartDataAPI.as_view(), name='chart_data'),
     
+    # ASGI-native widget endpoints
+    path('async/widgets/<str:widget_id>/', views.async_widget_detail_api, name='widget_detail_async'),
+    path('async/charts/<str:widget_id>/', views.async_chart_data_api, name='chart_data_async'),
+    
     # Dashboard stats
     path('stats/', views.DashboardStatsAPI.as_view(), name='dashboard_stats'),
     
@@ -2,52 +2,100 @@
 API views for the custom admin dashboard.
 """
 
+from functools import lru_cache, partial
+
+from asgiref.sync import sync_to_async
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status, permissions
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import api_view, permission_classes, renderer_classes
 from django.contrib.auth.models import User
 from django.core.cache import cache
 from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.utils.module_loading import import_string
 
+from ..cache import (
+    conditional_response,
+    get_fragment_cache_prefixes,
+    make_widget_cache_key,
+    widget_cache,
+    widget_cache_key,
+)
+from ..encoders import JsonResponse
+from ..engine import aprefetch_widgets, run_concurrently
+from ..instrumentation import WidgetTiming, add_server_timing, get_widget_timings
+from ..views import get_cached_card
 from ..widgets import widget_registry
-from dashboard_config.settings import get_dashboard_settings
+from .renderers import get_renderer_classes
+from dashboard_config.settings import get_api_config, get_dashboard_settings
+
+
+# Django REST framework's renderers, encoding JSON with orjson when available
+RENDERER_CLASSES = get_renderer_classes()
+
+
+@lru_cache(maxsize=None)
+def compile_api_permissions(permission_paths):
+    """
+    Import and instantiate the permission classes listed in API_PERMISSIONS.
+    
+    Compiled once per distinct setting value; invalid paths raise
+    ImproperlyConfigured (and are reported by the ``dashboard.E001`` check).
+    """
+    compiled = []
+    for permission_path in permission_paths:
+        try:
+            permission_class = import_string(permission_path)
+        except ImportError as e:
+            raise ImproperlyConfigured(
+                f"Invalid API_PERMISSIONS entry '{permission_path}': {e}"
+            ) from e
+        compiled.append(permission_class())
+    return tuple(compiled)
+
+
+def get_api_permissions():
+    """Get the compiled permission chain of the dashboard API."""
+    return compile_api_permissions(tuple(get_api_config()['permissions']))
 
 
 class DashboardAPIPermission(permissions.BasePermission):
     """
     Custom permission for dashboard API access.
+    
+    The result is memoized on the request, so it is computed once per request.
     """
     
     def has_permission(self, request, view):
+        # DRF requests wrap the Django request; memoize on the latter so
+        # plain Django views checking the same request share the result
+        http_request = getattr(request, '_request', request)
+        allowed = getattr(http_request, '_dashboard_api_permission', None)
+        if allowed is None:
+            allowed = self.check_permission(request, view)
+            http_request._dashboard_api_permission = allowed
+        return allowed
+    
+    def check_permission(self, request, view):
         if not request.user or not request.user.is_authenticated:
             return False
         
-        config = get_dashboard_settings()
-        api_permissions = config.get('API_PERMISSIONS', ['rest_framework.permissions.IsAdminUser'])
-        
         # Check if API is enabled
-        if not config.get('ENABLE_API', True):
+        if not get_api_config()['enabled']:
             return False
         
+        api_permissions = get_api_permissions()
+        
         # Default to admin users if no permissions specified
         if not api_permissions:
             return request.user.is_staff
         
         # Check each permission
-        for permission_path in api_permissions:
-            try:
-                module_path, class_name = permission_path.rsplit('.', 1)
-                module = __import__(module_path, fromlist=[class_name])
-                permission_class = getattr(module, class_name)
-                permission_instance = permission_class()
-                
-                if permission_instance.has_permission(request, view):
-                    return True
-            except (ImportError, AttributeError):
-                continue
-        
-        return False
+        return any(
+            permission.has_permission(request, view)
+            for permission in api_permissions
+        )
 
 
 class WidgetListAPI(APIView):
@@ -55,24 +103,14 @@ class WidgetListAPI(APIView):
     API endpoint to list all available widgets.
     """
     permission_classes = [DashboardAPIPermission]
+    renderer_classes = RENDERER_CLASSES
     
     def get(self, request):
-        enabled_widgets = widget_registry.get_enabled_widgets()
-        
-        widgets_data = []
-        for widget_class in enabled_widgets:
-            widget_instance = widget_class(request=request)
-            
-            if widget_instance.has_permission(request.user):
-                widgets_data.append({
-                    'id': getattr(widget_class, 'widget_id', widget_class.__name__),
-                    'title': widget_instance.title,
-                    'description': widget_instance.description,
-                    'type': widget_instance.widget_type,
-                    'icon': widget_instance.icon,
-                    'color': widget_instance.color,
-                    'refresh_interval': widget_instance.refresh_interval,
-                })
+        widgets_data = [
+            spec.get_metadata()
+            for spec in widget_registry.get_enabled_specs()
+            if spec.has_permission(request.user, request=request)
+        ]
         
         return Response({
             'widgets': widgets_data,
@@ -85,6 +123,7 @@ class WidgetDetailAPI(APIView):
     API endpoint to get specific widget data.
     """
     permission_classes = [DashboardAPIPermission]
+    renderer_classes = RENDERER_CLASSES
     
     def get(self, request, widget_id):
         widget_class = widget_registry.get_widget(widget_id)
@@ -102,24 +141,118 @@ class WidgetDetailAPI(APIView):
                 status=status.HTTP_403_FORBIDDEN
             )
         
-        # Check cache
-        cache_key = f"api_widget_data_{widget_id}_{request.user.id}"
-        cached_data = cache.get(cache_key)
+        def compute():
+            data = widget_instance.get_api_data()
+            data['widget_id'] = widget_id
+            return data
+        
+        # Serve from cache, recomputing once when missing or stale
+        cache_key = widget_cache_key(widget_instance, prefix='api_widget_data')
+        try:
+            entry = widget_cache.get_or_set_entry(cache_key, compute, widget_instance.cache_timeout)
+        except Exception as e:
+            return Response(
+                {'error': str(e)},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
         
-        if cached_data is None:
+        response = conditional_response(request, entry, Response)
+        return add_server_timing(response, get_widget_timings([widget_instance]))
+
+
+class WidgetBatchAPI(APIView):
+    """
+    API endpoint to get the data of several widgets in one request.
+    
+    Takes a comma-separated ``ids`` query parameter (all enabled widgets
+    when omitted). Widgets are served from the cache like WidgetDetailAPI,
+    and the ones that must be computed are evaluated concurrently. With
+    ``fragment=card``, each widget is returned as its rendered dashboard
+    card and the card's ETag instead, which is how the dashboard refreshes
+    every widget in one request.
+    """
+    permission_classes = [DashboardAPIPermission]
+    renderer_classes = RENDERER_CLASSES
+    
+    def get_widget_classes(self, request):
+        """Return ``(widget_id, widget_class)`` pairs for the requested widgets."""
+        ids = request.query_params.get('ids')
+        if ids is None:
+            return [
+                (spec.widget_id, spec.widget_class)
+                for spec in widget_registry.get_enabled_specs()
+            ]
+        
+        widget_ids = dict.fromkeys(
+            widget_id.strip() for widget_id in ids.split(',') if widget_id.strip()
+        )
+        return [
+            (widget_id, widget_registry.get_widget(widget_id))
+            for widget_id in widget_ids
+        ]
+    
+    def get(self, request):
+        widgets = {}
+        errors = {}
+        jobs = []
+        fragment = request.query_params.get('fragment')
+        if fragment not in (None, 'card'):
+            return Response(
+                {'error': f'Unknown fragment: {fragment}'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        for widget_id, widget_class in self.get_widget_classes(request):
+            if not widget_class:
+                errors[widget_id] = {'error': 'Widget not found', 'status': status.HTTP_404_NOT_FOUND}
+                continue
+            
+            widget_instance = widget_class(request=request)
+            if not widget_instance.has_permission(request.user):
+                errors[widget_id] = {'error': 'Permission denied', 'status': status.HTTP_403_FORBIDDEN}
+                continue
+            
+            widgets[widget_id] = None
+            jobs.append((widget_id, widget_instance))
+        
+        def load_card(widget_id, widget_instance):
             try:
+                entry = get_cached_card(request, widget_instance)
+            except Exception as e:
+                return None, str(e)
+            return {'widget_id': widget_id, 'html': entry['value'], 'etag': entry['etag']}, None
+        
+        def load(widget_id, widget_instance):
+            def compute():
                 data = widget_instance.get_api_data()
                 data['widget_id'] = widget_id
-                cache.set(cache_key, data, timeout=widget_instance.cache_timeout)
+                return data
+            
+            cache_key = widget_cache_key(widget_instance, prefix='api_widget_data')
+            try:
+                return widget_cache.get_or_set(cache_key, compute, widget_instance.cache_timeout), None
             except Exception as e:
-                return Response(
-                    {'error': str(e)},
-                    status=status.HTTP_500_INTERNAL_SERVER_ERROR
-                )
-        else:
-            data = cached_data
+                return None, str(e)
+        
+        results = run_concurrently(
+            partial(load_card if fragment else load, *job) for job in jobs
+        )
+        
+        for (widget_id, widget_instance), (data, error) in zip(jobs, results):
+            if error is None:
+                widgets[widget_id] = data
+            else:
+                del widgets[widget_id]
+                errors[widget_id] = {'error': error, 'status': status.HTTP_500_INTERNAL_SERVER_ERROR}
         
-        return Response(data)
+        response = Response({
+            'widgets': widgets,
+            'errors': errors,
+            'count': len(widgets),
+        })
+        return add_server_timing(
+            response, get_widget_timings(widget_instance for widget_id, widget_instance in jobs)
+        )
 
 
 class ChartDataAPI(APIView):
@@ -127,6 +260,7 @@ class ChartDataAPI(APIView):
     API endpoint to get chart data for a specific widget.
     """
     permission_classes = [DashboardAPIPermission]
+    renderer_classes = RENDERER_CLASSES
     
     def get(self, request, widget_id):
         widget_class = widget_registry.get_widget(widget_id)
@@ -144,17 +278,35 @@ class ChartDataAPI(APIView):
                 status=status.HTTP_403_FORBIDDEN
             )
         
-        chart_data = widget_instance.get_chart_data()
-        if chart_data is None:
+        def compute():
+            widget_instance.timing = WidgetTiming(widget_id)
+            with widget_instance.timing.measure():
+                return widget_instance.get_chart_data()
+        
+        # Serve from cache, recomputing once when missing or stale
+        cache_key = widget_cache_key(widget_instance, prefix='api_chart_data')
+        try:
+            entry = widget_cache.get_or_set_entry(cache_key, compute, widget_instance.cache_timeout)
+        except Exception as e:
+            return Response(
+                {'error': str(e)},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+        
+        if entry['value'] is None:
             return Response(
                 {'error': 'Widget does not provide chart data'},
                 status=status.HTTP_404_NOT_FOUND
             )
         
-        return Response({
-            'widget_id': widget_id,
-            'chart_data': chart_data
-        })
+        def build_response(chart_data):
+            return Response({
+                'widget_id': widget_id,
+                'chart_data': chart_data
+            })
+        
+        response = conditional_response(request, entry, build_response)
+        return add_server_timing(response, get_widget_timings([widget_instance]))
 
 
 class DashboardStatsAPI(APIView):
@@ -162,20 +314,19 @@ class DashboardStatsAPI(APIView):
     API endpoint to get overall dashboard statistics.
     """
     permission_classes = [DashboardAPIPermission]
+    renderer_classes = RENDERER_CLASSES
     
     def get(self, request):
         config = get_dashboard_settings()
-        enabled_widgets = widget_registry.get_enabled_widgets()
+        enabled_specs = widget_registry.get_enabled_specs()
         
         # Calculate basic stats
-        total_widgets = len(widget_registry.get_all_widgets())
-        enabled_widget_count = len(enabled_widgets)
-        accessible_widgets = 0
-        
-        for widget_class in enabled_widgets:
-            widget_instance = widget_class(request=request)
-            if widget_instance.has_permission(request.user):
-                accessible_widgets += 1
+        total_widgets = len(widget_registry.get_all_specs())
+        enabled_widget_count = len(enabled_specs)
+        accessible_widgets = sum(
+            1 for spec in enabled_specs
+            if spec.has_permission(request.user, request=request)
+        )
         
         # Get user stats
         total_users = User.objects.count()
@@ -210,6 +361,7 @@ class UserCountAPI(APIView):
     Legacy API endpoint for user count (backward compatibility).
     """
     permission_classes = [DashboardAPIPermission]
+    renderer_classes = RENDERER_CLASSES
     
     def get(self, request):
         return Response({
@@ -220,21 +372,30 @@ class UserCountAPI(APIView):
 
 @api_view(['POST'])
 @permission_classes([DashboardAPIPermission])
+@renderer_classes(RENDERER_CLASSES)
 def refresh_cache_api(request):
     """
     API endpoint to refresh dashboard cache.
     """
     try:
-        # Clear all widget caches for the current user
-        cache.delete_many([
-            f"widget_data_{widget_id}_{request.user.id}"
-            for widget_id in widget_registry._widgets.keys()
-        ])
-        
-        # Clear API caches too
-        cache.delete_many([
-            f"api_widget_data_{widget_id}_{request.user.id}"
-            for widget_id in widget_registry._widgets.keys()
+        # Clear the widget data, API and fragment caches seen by the current user
+        widget_cache.delete_many([
+            make_widget_cache_key(
+                prefix,
+                spec.widget_id,
+                spec.widget_class.cache_scope,
+                request.user,
+                depends_on=spec.widget_class.depends_on,
+                requires_permissions=spec.widget_class.requires_permissions,
+            )
+            for spec in widget_registry.get_all_specs()
+            for prefix in (
+                'widget_data',
+                'widget_prefetch',
+                'api_widget_data',
+                'api_chart_data',
+                *get_fragment_cache_prefixes(),
+            )
         ])
         
         return Response({'message': 'Cache refreshed successfully'})
@@ -248,6 +409,7 @@ def refresh_cache_api(request):
 
 @api_view(['GET'])
 @permission_classes([DashboardAPIPermission])
+@renderer_classes(RENDERER_CLASSES)
 def health_check_api(request):
     """
     API endpoint for health check.
@@ -282,3 +444,99 @@ def health_check_api(request):
         health_data['status'] = 'degraded'
     
     return Response(health_data)
+
+
+# Async endpoints
+#
+# ASGI-native variants of the widget endpoints. These are plain Django views
+# (DRF views are sync only), so they authenticate through the session like
+# the rest of the dashboard and apply DashboardAPIPermission directly.
+
+def _check_widget_access(request, widget_id):
+    """Return ``(widget_instance, error_response)`` for an async endpoint."""
+    if not DashboardAPIPermission().has_permission(request, None):
+        return None, JsonResponse(
+            {'detail': 'You do not have permission to perform this action.'},
+            status=status.HTTP_403_FORBIDDEN
+        )
+    
+    widget_class = widget_registry.get_widget(widget_id)
+    if not widget_class:
+        return None, JsonResponse(
+            {'error': 'Widget not found'},
+            status=status.HTTP_404_NOT_FOUND
+        )
+    
+    widget_instance = widget_class(request=request)
+    
+    if not widget_instance.has_permission(request.user):
+        return None, JsonResponse(
+            {'error': 'Permission denied'},
+            status=status.HTTP_403_FORBIDDEN
+        )
+    
+    return widget_instance, None
+
+
+async def async_widget_detail_api(request, widget_id):
+    """Async variant of WidgetDetailAPI."""
+    widget_instance, error = await sync_to_async(_check_widget_access)(request, widget_id)
+    if error:
+        return error
+    
+    async def compute():
+        await aprefetch_widgets([widget_instance])
+        data = widget_instance.get_api_data()
+        data['widget_id'] = widget_id
+        return data
+    
+    # Serve from cache, recomputing once when missing or stale
+    cache_key = await sync_to_async(widget_cache_key)(widget_instance, prefix='api_widget_data')
+    try:
+        entry = await widget_cache.aget_or_set_entry(cache_key, compute, widget_instance.cache_timeout)
+    except Exception as e:
+        return JsonResponse(
+            {'error': str(e)},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
+    
+    response = conditional_response(request, entry, JsonResponse)
+    return add_server_timing(response, get_widget_timings([widget_instance]))
+
+
+async def async_chart_data_api(request, widget_id):
+    """Async variant of ChartDataAPI."""
+    widget_instance, error = await sync_to_async(_check_widget_access)(request, widget_id)
+    if error:
+        return error
+    
+    async def compute():
+        # Queries are recorded by run_sync() in the threads running them
+        widget_instance.timing = WidgetTiming(widget_id)
+        with widget_instance.timing.measure(record_queries=False):
+            return await widget_instance.aget_chart_data()
+    
+    # Serve from cache, recomputing once when missing or stale
+    cache_key = await sync_to_async(widget_cache_key)(widget_instance, prefix='api_chart_data')
+    try:
+        entry = await widget_cache.aget_or_set_entry(cache_key, compute, widget_instance.cache_timeout)
+    except Exception as e:
+        return JsonResponse(
+            {'error': str(e)},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
+    
+    if entry['value'] is None:
+        return JsonResponse(
+            {'error': 'Widget does not provide chart data'},
+            status=status.HTTP_404_NOT_FOUND
+        )
+    
+    def build_response(chart_data):
+        return JsonResponse({
+            'widget_id': widget_id,
+            'chart_data': chart_data
+        })
+    
+    response = conditional_response(request, entry, build_response)
+    return add_server_timing(response, get_widget_timings([widget_instance]))
@@ -20,6 +20,13 @@ class DashboardConfig(AppConfig):
         except ImportError:
             pass
         
+        # Invalidate cached widget data when the models widgets read change
+        from .signals import connect_signals
+        connect_signals()
+        
+        # Register the dashboard system checks
+        from . import checks  # noqa
+        
         # Override admin site configuration
         self.configure_admin_site()
     
@@ -0,0 +1,516 @@
+"""
+Widget data cache for the custom admin dashboard.
+
+Entries are served stale-while-revalidate: once an entry passes its soft
+timeout it is still served while a single process, holding a cache-based
+lock, recomputes it. Soft timeouts are jittered so entries written together
+do not expire together.
+
+Cache keys are built from the widget's cache scope, so data that is the same
+for many users is computed and stored once for all of them, and from the
+version counters of the models the widget depends on, which are bumped by
+model signals so writes are visible immediately. Rendered widget HTML is
+cached the same way, per theme, so refreshes skip both the ORM and the
+template engine.
+
+Fresh entries are also kept in a small in-process LRU cache (see LocalCache),
+so hot widgets are served from memory without a round trip to the shared
+cache.
+
+Values are serialized, and compressed when large, by the codec configured
+with ``CACHE_CODEC`` (see dashboard.codecs) before they reach the shared
+cache.
+
+Every entry stores an ETag of its value, so views can answer conditional
+requests with ``304 Not Modified`` without serializing anything.
+"""
+
+import asyncio
+import hashlib
+import json
+import pickle
+import random
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from functools import lru_cache
+
+from asgiref.sync import sync_to_async
+from django.apps import apps
+from django.contrib.auth import get_permission_codename
+from django.core.cache import cache as default_cache
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+
+from dashboard_config.settings import THEMES, get_widget_config
+
+from .codecs import decode_value, encode_value
+
+
+# Widget cache scopes
+CACHE_SCOPE_GLOBAL = 'global'  # Same data for every user allowed to see the widget
+CACHE_SCOPE_PERMISSIONS = 'permissions'  # Same data for users with the same permissions
+CACHE_SCOPE_USER = 'user'  # Data specific to each user
+
+CACHE_SCOPES = (CACHE_SCOPE_GLOBAL, CACHE_SCOPE_PERMISSIONS, CACHE_SCOPE_USER)
+
+# Rendered widget HTML kept in the fragment cache: the widget template
+# (``BaseWidget.render()``) and the dashboard card
+WIDGET_FRAGMENTS = ('widget', 'card')
+
+
+@lru_cache(maxsize=None)
+def get_widget_permissions(requires_permissions=(), depends_on=()):
+    """
+    Return the permissions that can change what a widget shows: the ones it
+    requires and the permissions on the models it depends on.
+    """
+    permissions = set(requires_permissions)
+    for model in depends_on:
+        if isinstance(model, str):
+            model = apps.get_model(model)
+        opts = model._meta
+        permissions.update(
+            f"{opts.app_label}.{get_permission_codename(action, opts)}"
+            for action in opts.default_permissions
+        )
+        permissions.update(f"{opts.app_label}.{codename}" for codename, _ in opts.permissions)
+    return frozenset(permissions)
+
+
+def get_permission_hash(user, permissions=frozenset()):
+    """Hash the subset of ``permissions`` held by ``user``."""
+    held = sorted(user.get_all_permissions() & permissions)
+    fingerprint = repr((user.is_superuser, user.is_staff, held))
+    return hashlib.md5(fingerprint.encode('utf-8')).hexdigest()[:16]
+
+
+def get_scope_token(cache_scope, user, permissions=frozenset()):
+    """
+    Return the part of a cache key identifying who shares the entry.
+
+    Permission-scoped entries are shared by users holding the same subset
+    of ``permissions``.
+    """
+    if cache_scope == CACHE_SCOPE_GLOBAL:
+        return 'global'
+    if cache_scope == CACHE_SCOPE_PERMISSIONS:
+        return f"perms_{get_permission_hash(user, permissions)}"
+    return f"user_{user.pk}"
+
+
+def get_model_label(model):
+    """Return the lowercase ``app_label.model_name`` of a model or model label."""
+    if isinstance(model, str):
+        return model.lower()
+    return model._meta.label_lower
+
+
+def get_model_version_key(label):
+    """Return the cache key holding a model's version counter."""
+    return f"dashboard_model_version_{label}"
+
+
+def _new_model_version():
+    # Counters start from the clock so a counter evicted from the cache
+    # never comes back with a value that was already used.
+    return time.time_ns() // 1000
+
+
+# With the in-process cache enabled, version counters read from the shared
+# cache are trusted for this many seconds, so a local cache hit needs no round
+# trip. Writes and deletions in other processes are seen once they expire.
+VERSION_CHECK_INTERVAL = 1
+
+_local_versions = {}  # key -> (version, expires)
+
+
+def bump_model_version(model):
+    """Mark cached widget data depending on ``model`` as outdated."""
+    key = get_model_version_key(get_model_label(model))
+    try:
+        default_cache.incr(key)
+    except ValueError:
+        default_cache.add(key, _new_model_version(), timeout=None)
+    _local_versions.pop(key, None)
+
+
+def get_model_versions(models):
+    """Return the current version counters of ``models`` as a key fragment."""
+    if not models:
+        return ''
+
+    keys = [get_model_version_key(get_model_label(model)) for model in models]
+    keep_local = bool(get_widget_config()['local_cache_max_entries'])
+
+    versions = {}
+    if keep_local:
+        now = time.monotonic()
+        for key in keys:
+            item = _local_versions.get(key)
+            if item is not None and now < item[1]:
+                versions[key] = item[0]
+
+    missing = [key for key in keys if key not in versions]
+    if missing:
+        fetched = default_cache.get_many(missing)
+        for key in missing:
+            if key not in fetched:
+                default_cache.add(key, _new_model_version(), timeout=None)
+                fetched[key] = default_cache.get(key)
+        versions.update(fetched)
+        if keep_local:
+            expires = time.monotonic() + VERSION_CHECK_INTERVAL
+            _local_versions.update((key, (fetched[key], expires)) for key in missing)
+    return '.'.join(str(versions[key]) for key in keys)
+
+
+def make_widget_cache_key(prefix, widget_id, cache_scope, user, depends_on=(), requires_permissions=()):
+    """Build the cache key of a widget's data for ``user``."""
+    permissions = frozenset()
+    if cache_scope == CACHE_SCOPE_PERMISSIONS:
+        permissions = get_widget_permissions(tuple(requires_permissions), tuple(depends_on))
+    key = f"{prefix}_{widget_id}_{get_scope_token(cache_scope, user, permissions)}"
+    versions = get_model_versions(depends_on)
+    if versions:
+        key = f"{key}_v{versions}"
+    return key
+
+
+def widget_cache_key(widget, prefix='widget_data'):
+    """Build the cache key of a widget instance's data for its request user."""
+    return make_widget_cache_key(
+        prefix,
+        widget.widget_id,
+        widget.cache_scope,
+        widget.request.user,
+        depends_on=widget.depends_on,
+        requires_permissions=widget.requires_permissions,
+    )
+
+
+def get_fragment_cache_prefix(theme, fragment='widget'):
+    """Return the cache key prefix of a widget's rendered HTML in ``theme``."""
+    return f"widget_html_{fragment}_{theme}"
+
+
+def get_fragment_cache_prefixes():
+    """Return the cache key prefixes of every rendered widget fragment."""
+    return [
+        get_fragment_cache_prefix(theme, fragment)
+        for theme in THEMES
+        for fragment in WIDGET_FRAGMENTS
+    ]
+
+
+def widget_fragment_cache_key(widget, theme, fragment='widget'):
+    """Build the cache key of a widget instance's rendered HTML in ``theme``."""
+    return widget_cache_key(widget, prefix=get_fragment_cache_prefix(theme, fragment))
+
+
+def compute_etag(value):
+    """Return a hash of a cached value identifying its content."""
+    try:
+        payload = json.dumps(value, sort_keys=True, default=str)
+    except TypeError:
+        payload = repr(value)
+    return hashlib.md5(payload.encode('utf-8')).hexdigest()
+
+
+def conditional_response(request, entry, build_response):
+    """
+    Answer a request for a cached entry, with ``304 Not Modified`` when the
+    client already has it.
+
+    ``build_response(value)`` is only called when the entry must be sent.
+    Responses carry the entry's ``ETag`` and ``Last-Modified`` validators and
+    ask browsers to revalidate them on every request.
+    """
+    etag = quote_etag(entry.get('etag') or compute_etag(entry['value']))
+    last_modified = int(entry['created'])
+
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is None:
+        response = build_response(entry['value'])
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+class LocalCache:
+    """
+    Size-bounded, in-process LRU cache in front of the shared widget cache.
+
+    Values are stored pickled, so every reader gets its own copy and memory
+    use is accounted in bytes. Local copies live at most
+    ``LOCAL_CACHE_TIMEOUT`` seconds. Writes to the models a widget depends on
+    change its cache key (see get_model_versions()); deleting an entry bumps
+    its version key in the shared cache, which every process checks at most
+    every ``VERSION_CHECK_INTERVAL`` seconds before serving its copy.
+    Disabled unless ``LOCAL_CACHE_MAX_ENTRIES`` is set.
+    """
+
+    def __init__(self, cache=None):
+        self.cache = cache or default_cache
+        self.entries = OrderedDict()  # key -> (payload, size, expires, version, checked)
+        self.size = 0  # Bytes
+        self._lock = threading.Lock()
+
+    def get_limits(self):
+        """Return the configured ``(max_entries, max_bytes, timeout)``."""
+        config = get_widget_config()
+        return (
+            config['local_cache_max_entries'],
+            config['local_cache_max_bytes'],
+            config['local_cache_timeout'],
+        )
+
+    def get_version(self, key, timeout):
+        """Return the shared version counter of ``key``, bumped when it is deleted."""
+        version_key = f"{key}:version"
+        version = self.cache.get(version_key)
+        if version is None:
+            # Only needs to outlive the local copies checked against it
+            self.cache.add(version_key, _new_model_version(), timeout=timeout)
+            version = self.cache.get(version_key)
+        return version
+
+    def get(self, key):
+        """Return a copy of the local value for ``key``, or None."""
+        max_entries, max_bytes, timeout = self.get_limits()
+        if not max_entries:
+            return None
+
+        now = time.monotonic()
+        with self._lock:
+            item = self.entries.get(key)
+            if item is None:
+                return None
+            payload, size, expires, version, checked = item
+            if now >= expires:
+                self._remove(key)
+                return None
+            self.entries.move_to_end(key)
+
+        if now - checked >= VERSION_CHECK_INTERVAL:
+            # Deleted by another process since this copy was stored
+            current = self.get_version(key, timeout) == version
+            with self._lock:
+                if self.entries.get(key) is item:
+                    if current:
+                        self.entries[key] = (payload, size, expires, version, now)
+                    else:
+                        self._remove(key)
+            if not current:
+                return None
+        return pickle.loads(payload)
+
+    def set(self, key, value):
+        """Store a local copy of ``value``, evicting the least recently used ones."""
+        max_entries, max_bytes, timeout = self.get_limits()
+        if not max_entries:
+            return
+
+        payload = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        size = len(payload)
+        version = self.get_version(key, timeout)
+        now = time.monotonic()
+        with self._lock:
+            self._remove(key)
+            if size > max_bytes:
+                return
+            self.entries[key] = (payload, size, now + timeout, version, now)
+            self.size += size
+            while len(self.entries) > max_entries or self.size > max_bytes:
+                _, (_, evicted_size, _, _, _) = self.entries.popitem(last=False)
+                self.size -= evicted_size
+
+    def delete_many(self, keys):
+        """Drop the local copies of ``keys`` held by every process."""
+        if not self.get_limits()[0]:
+            return
+
+        with self._lock:
+            for key in keys:
+                self._remove(key)
+
+        for key in keys:
+            try:
+                self.cache.incr(f"{key}:version")
+            except ValueError:
+                # Expired: copies checked against it are dropped anyway
+                pass
+
+    def _remove(self, key):
+        item = self.entries.pop(key, None)
+        if item is not None:
+            self.size -= item[1]
+
+
+class WidgetCache:
+    """Stale-while-revalidate cache with stampede protection."""
+
+    # How long a request with nothing to serve waits for another process
+    # to finish computing an entry before computing it itself.
+    lock_wait = 5
+    poll_interval = 0.05
+
+    def __init__(self, cache=None):
+        self.cache = cache or default_cache
+        self.local = LocalCache(self.cache)
+
+    def make_entry(self, value, timeout, jitter=None):
+        """Wrap a value with its jittered soft expiry and its ETag."""
+        if jitter is None:
+            jitter = get_widget_config()['cache_jitter']
+        now = time.time()
+        return {
+            'value': value,
+            'created': now,
+            'fresh_until': now + timeout * random.uniform(1 - jitter, 1 + jitter),
+            'etag': compute_etag(value),
+        }
+
+    def get_entry(self, key):
+        """Return the cached entry for ``key``, or None."""
+        # Local copies are only served while fresh; stale entries are read
+        # from the shared cache, where another process may have replaced them
+        entry = self.local.get(key)
+        if entry is not None and time.time() < entry['fresh_until']:
+            return entry
+
+        entry = self.cache.get(key)
+        if isinstance(entry, dict) and 'fresh_until' in entry:
+            entry = self.unpack_entry(entry)
+            if time.time() < entry['fresh_until']:
+                self.local.set(key, entry)
+            return entry
+        return None
+
+    def set(self, key, value, timeout, jitter=None):
+        """
+        Store a value, keeping it available as stale data past ``timeout``.
+
+        The soft timeout is jittered by ``jitter`` (``CACHE_JITTER`` by default).
+        """
+        entry = self.make_entry(value, timeout, jitter)
+        stale_timeout = get_widget_config()['cache_stale_timeout']
+        self.cache.set(key, self.pack_entry(entry), timeout=timeout + stale_timeout)
+        self.local.set(key, entry)
+        return entry
+
+    def pack_entry(self, entry):
+        """Serialize an entry's value for the shared cache (see dashboard.codecs)."""
+        data, codec, compressed = encode_value(entry['value'])
+        return {**entry, 'value': data, 'codec': codec, 'compressed': compressed}
+
+    def unpack_entry(self, entry):
+        """Read back an entry written by pack_entry()."""
+        if 'codec' not in entry:
+            return entry
+        entry = dict(entry)
+        value = decode_value(entry.pop('value'), entry.pop('codec'), entry.pop('compressed'))
+        return {**entry, 'value': value}
+
+    def delete(self, key):
+        """Remove a cached value."""
+        self.cache.delete(key)
+        self.local.delete_many([key])
+
+    def delete_many(self, keys):
+        """Remove several cached values."""
+        self.cache.delete_many(keys)
+        self.local.delete_many(keys)
+
+    def acquire_lock(self, key):
+        """Try to take the recompute lock for ``key``; return a token or None."""
+        token = uuid.uuid4().hex
+        lock_timeout = get_widget_config()['cache_lock_timeout']
+        if self.cache.add(f"{key}:lock", token, timeout=lock_timeout):
+            return token
+        return None
+
+    def release_lock(self, key, token):
+        """Release the recompute lock if it is still held by ``token``."""
+        lock_key = f"{key}:lock"
+        if self.cache.get(lock_key) == token:
+            self.cache.delete(lock_key)
+
+    def wait_for_entry(self, key):
+        """Wait for another process to store ``key``; return the entry or None."""
+        deadline = time.monotonic() + self.lock_wait
+        while time.monotonic() < deadline:
+            time.sleep(self.poll_interval)
+            entry = self.get_entry(key)
+            if entry is not None:
+                return entry
+        return None
+
+    async def await_entry(self, key):
+        """Async variant of wait_for_entry()."""
+        deadline = time.monotonic() + self.lock_wait
+        while time.monotonic() < deadline:
+            await asyncio.sleep(self.poll_interval)
+            entry = await sync_to_async(self.get_entry)(key)
+            if entry is not None:
+                return entry
+        return None
+
+    def get_or_set(self, key, compute, timeout):
+        """
+        Return the cached value for ``key``, computing it with ``compute()``
+        when it is missing or stale.
+
+        Only the process holding the lock recomputes a stale entry; everyone
+        else is served the stale value in the meantime.
+        """
+        return self.get_or_set_entry(key, compute, timeout)['value']
+
+    def get_or_set_entry(self, key, compute, timeout):
+        """Like get_or_set(), but return the whole entry, with its ETag."""
+        entry = self.get_entry(key)
+        if entry is not None and time.time() < entry['fresh_until']:
+            return entry
+
+        token = self.acquire_lock(key)
+        if token is None:
+            if entry is None:
+                entry = self.wait_for_entry(key)
+            if entry is not None:
+                return entry
+
+        try:
+            return self.set(key, compute(), timeout)
+        finally:
+            if token is not None:
+                self.release_lock(key, token)
+
+    async def aget_or_set(self, key, acompute, timeout):
+        """Async variant of get_or_set() taking a coroutine function."""
+        return (await self.aget_or_set_entry(key, acompute, timeout))['value']
+
+    async def aget_or_set_entry(self, key, acompute, timeout):
+        """Async variant of get_or_set_entry() taking a coroutine function."""
+        entry = await sync_to_async(self.get_entry)(key)
+        if entry is not None and time.time() < entry['fresh_until']:
+            return entry
+
+        token = await sync_to_async(self.acquire_lock)(key)
+        if token is None:
+            if entry is None:
+                entry = await self.await_entry(key)
+            if entry is not None:
+                return entry
+
+        try:
+            value = await acompute()
+            return await sync_to_async(self.set)(key, value, timeout)
+        finally:
+            if token is not None:
+                await sync_to_async(self.release_lock)(key, token)
+
+
+# Global widget cache
+widget_cache = WidgetCache()
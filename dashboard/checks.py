@@ -0,0 +1,69 @@
+"""
+System checks for the custom admin dashboard.
+"""
+
+import django
+from django.core.checks import Error, register
+from django.core.exceptions import ImproperlyConfigured
+from django.utils.module_loading import import_string
+
+from dashboard_config.settings import get_api_config, get_widget_config
+
+from .codecs import get_codec
+
+
+@register()
+def check_api_permissions(app_configs, **kwargs):
+    """Check that every API_PERMISSIONS entry is an importable permission class."""
+    errors = []
+
+    for permission_path in get_api_config()['permissions']:
+        try:
+            permission_class = import_string(permission_path)
+        except ImportError as e:
+            errors.append(Error(
+                f"API_PERMISSIONS entry '{permission_path}' cannot be imported: {e}",
+                hint="Use the dotted path of a Django REST framework permission class.",
+                obj='CUSTOM_ADMIN_DASHBOARD_CONFIG',
+                id='dashboard.E001',
+            ))
+            continue
+
+        if not callable(getattr(permission_class, 'has_permission', None)):
+            errors.append(Error(
+                f"API_PERMISSIONS entry '{permission_path}' is not a permission class.",
+                hint="Permission classes must implement has_permission(request, view).",
+                obj='CUSTOM_ADMIN_DASHBOARD_CONFIG',
+                id='dashboard.E002',
+            ))
+
+    return errors
+
+
+@register()
+def check_cache_codec(app_configs, **kwargs):
+    """Check that CACHE_CODEC names a usable widget cache codec."""
+    try:
+        get_codec(get_widget_config()['cache_codec'])
+    except ImproperlyConfigured as e:
+        return [Error(
+            str(e),
+            hint="Use 'pickle', 'json', 'msgpack' or the dotted path of a codec class.",
+            obj='CUSTOM_ADMIN_DASHBOARD_CONFIG',
+            id='dashboard.E003',
+        )]
+    return []
+
+
+@register()
+def check_push_updates(app_configs, **kwargs):
+    """Check that the installed Django can serve the PUSH_UPDATES event stream."""
+    if get_widget_config()['push_updates'] and django.VERSION < (4, 2):
+        return [Error(
+            "PUSH_UPDATES requires Django 4.2 or later.",
+            hint="The event stream is an asynchronous streaming response, which "
+                 "older versions of Django cannot serve. Upgrade Django or disable PUSH_UPDATES.",
+            obj='CUSTOM_ADMIN_DASHBOARD_CONFIG',
+            id='dashboard.E004',
+        )]
+    return []
@@ -0,0 +1,114 @@
+"""
+Payload codecs for the widget cache.
+
+Widget cache entries are serialized with the codec named by ``CACHE_CODEC``
+before they are written to the shared cache, and payloads larger than
+``CACHE_COMPRESS_MIN_SIZE`` bytes are compressed with zlib. Chart configs
+and table rows repeat the same keys and strings over and over, so they
+compress to a fraction of their pickled size, which saves cache memory and
+network transfer between the application servers and the cache.
+
+``pickle`` round-trips any value. ``json`` and ``msgpack`` are more compact
+but only round-trip JSON types: dates, times and decimals are stored as
+strings and tuples as lists. A custom codec is the dotted path of a class
+with ``dumps(value)`` returning bytes and ``loads(data)``.
+"""
+
+import json
+import pickle
+import zlib
+from functools import lru_cache
+
+from django.core.exceptions import ImproperlyConfigured
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils.module_loading import import_string
+
+from dashboard_config.settings import get_widget_config
+
+
+class PickleCodec:
+    """Serialize payloads with pickle; every value round-trips."""
+
+    def dumps(self, value):
+        return pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+
+    def loads(self, data):
+        return pickle.loads(data)
+
+
+class JSONCodec:
+    """Serialize payloads as compact JSON."""
+
+    def dumps(self, value):
+        return json.dumps(value, cls=DjangoJSONEncoder, separators=(',', ':')).encode()
+
+    def loads(self, data):
+        return json.loads(data)
+
+
+class MsgpackCodec:
+    """Serialize payloads with msgpack, if it is installed."""
+
+    def __init__(self):
+        try:
+            import msgpack
+        except ImportError as e:
+            raise ImproperlyConfigured(
+                "CACHE_CODEC 'msgpack' requires the msgpack package."
+            ) from e
+        self.msgpack = msgpack
+        self.encoder = DjangoJSONEncoder()
+
+    def dumps(self, value):
+        return self.msgpack.packb(value, use_bin_type=True, default=self.encoder.default)
+
+    def loads(self, data):
+        return self.msgpack.unpackb(data, raw=False)
+
+
+CODECS = {
+    'pickle': PickleCodec,
+    'json': JSONCodec,
+    'msgpack': MsgpackCodec,
+}
+
+
+@lru_cache(maxsize=None)
+def get_codec(name):
+    """
+    Return the codec registered as ``name``, or the codec class at the
+    dotted path ``name``. Invalid names raise ImproperlyConfigured.
+    """
+    codec_class = CODECS.get(name)
+    if codec_class is None:
+        try:
+            codec_class = import_string(name)
+        except ImportError as e:
+            raise ImproperlyConfigured(f"Invalid CACHE_CODEC '{name}': {e}") from e
+    return codec_class()
+
+
+def encode_value(value):
+    """
+    Serialize ``value`` with the configured codec, compressing it when large.
+
+    Return the payload with the name of its codec and whether it was
+    compressed, which decode_value() needs to read it back.
+    """
+    config = get_widget_config()
+    codec_name = config['cache_codec']
+    data = get_codec(codec_name).dumps(value)
+
+    min_size = config['cache_compress_min_size']
+    if min_size is not None and len(data) >= min_size:
+        compressed = zlib.compress(data, config['cache_compress_level'])
+        if len(compressed) < len(data):
+            return compressed, codec_name, True
+    return data, codec_name, False
+
+
+def decode_value(data, codec_name, compressed=False):
+    """Read back a payload returned by encode_value()."""
+    if compressed:
+        data = zlib.decompress(data)
+    return get_codec(codec_name).loads(data)
@@ -0,0 +1,86 @@
+"""
+JSON encoding for the custom admin dashboard.
+
+Chart configs, API payloads and exports are encoded with orjson when it is
+installed, which is several times faster than the standard library encoder,
+and with ``json`` otherwise. Both produce the same compact output: dates,
+times and decimals are encoded by Django's ``DjangoJSONEncoder`` (or by the
+``default`` function given), and lazy translation strings as strings.
+Read-only mappings, such as the resolved dashboard settings, are encoded
+as objects.
+"""
+
+import json
+from collections.abc import Mapping
+from functools import partial
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import HttpResponse, JsonResponse as DjangoJsonResponse
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+# orjson would encode datetimes itself, with full microsecond precision;
+# passing them to ``default`` keeps the output identical to the fallback.
+ORJSON_OPTIONS = (
+    orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+    if orjson is not None else None
+)
+
+_django_encoder = DjangoJSONEncoder()
+
+
+def _encode_mapping(default, value):
+    # Neither encoder handles Mapping types other than dict (MappingProxyType)
+    if isinstance(value, Mapping):
+        return dict(value)
+    return default(value)
+
+
+def dumps_bytes(value, default=None):
+    """
+    Encode ``value`` as compact UTF-8 JSON.
+
+    ``default`` is called with objects JSON cannot represent, and defaults
+    to ``DjangoJSONEncoder().default``.
+    """
+    default = partial(_encode_mapping, default or _django_encoder.default)
+    if orjson is not None:
+        try:
+            return orjson.dumps(value, default=default, option=ORJSON_OPTIONS)
+        except TypeError:
+            # Integers over 64 bits, or keys orjson cannot encode
+            pass
+    return json.dumps(
+        value, default=default, ensure_ascii=False, separators=(',', ':')
+    ).encode()
+
+
+def dumps(value, default=None):
+    """Like dumps_bytes(), but return a string."""
+    return dumps_bytes(value, default).decode()
+
+
+class JsonResponse(DjangoJsonResponse):
+    """
+    ``django.http.JsonResponse`` encoding its data with dumps_bytes().
+
+    A custom ``encoder`` or ``json_dumps_params`` is honoured by falling back
+    to Django's ``json.dumps(data, cls=encoder, **json_dumps_params)``.
+    """
+
+    def __init__(self, data, encoder=DjangoJSONEncoder, safe=True, json_dumps_params=None, **kwargs):
+        if encoder is not DjangoJSONEncoder or json_dumps_params is not None:
+            super().__init__(data, encoder, safe, json_dumps_params, **kwargs)
+            return
+
+        if safe and not isinstance(data, dict):
+            raise TypeError(
+                "In order to allow non-dict objects to be serialized set the "
+                "safe parameter to False."
+            )
+        kwargs.setdefault('content_type', 'application/json')
+        HttpResponse.__init__(self, content=dumps_bytes(data), **kwargs)
@@ -0,0 +1,154 @@
+"""
+Widget execution engine for the custom admin dashboard.
+
+Evaluates the data of several widgets concurrently so that a dashboard page
+costs roughly as much as its slowest widget instead of the sum of all of them.
+"""
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from asgiref.sync import sync_to_async
+from django.db import connections
+
+from dashboard_config.settings import get_widget_config
+
+
+def run_in_worker(func, *args, **kwargs):
+    """
+    Call ``func`` from a worker thread.
+
+    Django keeps one database connection per thread, so every worker thread
+    talks to the database over its own connection. Those connections are
+    closed once the call returns because the thread may never be reused.
+    """
+    try:
+        return func(*args, **kwargs)
+    finally:
+        connections.close_all()
+
+
+def can_run_concurrently():
+    """
+    Check whether widget evaluation may be moved to worker threads.
+
+    Worker threads use their own database connections, so they cannot see
+    rows written inside the caller's open transaction (``ATOMIC_REQUESTS``,
+    ``TestCase``). In that case widgets are evaluated serially.
+    """
+    return not any(
+        conn.in_atomic_block
+        for conn in connections.all()
+    )
+
+
+def get_max_workers(max_workers=None):
+    """Get the configured number of worker threads for widget evaluation."""
+    if max_workers is None:
+        max_workers = get_widget_config()['max_workers']
+    return max(int(max_workers or 1), 1)
+
+
+def run_concurrently(funcs, max_workers=None):
+    """
+    Call every function in ``funcs`` and return their results, in order.
+
+    Functions run in a thread pool of at most ``max_workers`` threads
+    (``WIDGET_MAX_WORKERS`` in ``CUSTOM_ADMIN_DASHBOARD_CONFIG`` by default),
+    or serially in the calling thread when a single worker is configured or
+    the caller is inside an open transaction. The first exception raised
+    propagates to the caller.
+    """
+    funcs = list(funcs)
+    workers = min(get_max_workers(max_workers), len(funcs))
+
+    if workers <= 1 or not can_run_concurrently():
+        return [func() for func in funcs]
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='dashboard-widget') as executor:
+        futures = [executor.submit(run_in_worker, func) for func in funcs]
+        return [future.result() for future in futures]
+
+
+def get_prefetch(widget, cached=False):
+    """Return the method prefetching ``widget``, from the widget cache if ``cached``."""
+    return widget.prefetch_cached if cached else widget.prefetch
+
+
+def prefetch_widgets(widgets, max_workers=None, cached=False):
+    """
+    Evaluate the data of every widget before the page is rendered.
+
+    Widgets are evaluated concurrently (see run_concurrently()). The results
+    are stored on each widget, so templates read precomputed data instead of
+    querying the database while rendering. With ``cached``, the data is read
+    from the widget cache when available (see BaseWidget.prefetch_cached()).
+    Exceptions raised by a widget propagate to the caller, as they would
+    during rendering.
+    """
+    widgets = list(widgets)
+    run_concurrently([get_prefetch(widget, cached) for widget in widgets], max_workers=max_workers)
+    return widgets
+
+
+def iter_prefetch_widgets(widgets, max_workers=None, cached=False):
+    """
+    Evaluate the data of every widget, yielding ``(widget, error)`` pairs as
+    each widget completes.
+
+    Widgets are evaluated like prefetch_widgets(), but results are yielded
+    in completion order so callers can stream each widget as soon as it is
+    ready. ``error`` is the exception raised by the widget, or None.
+    """
+    widgets = list(widgets)
+    workers = min(get_max_workers(max_workers), len(widgets))
+
+    if workers <= 1 or not can_run_concurrently():
+        for widget in widgets:
+            try:
+                get_prefetch(widget, cached)()
+            except Exception as e:
+                yield widget, e
+            else:
+                yield widget, None
+        return
+
+    executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='dashboard-widget')
+    futures = {}
+    try:
+        futures = {
+            executor.submit(run_in_worker, get_prefetch(widget, cached)): widget
+            for widget in widgets
+        }
+        for future in as_completed(futures):
+            yield futures[future], future.exception()
+    finally:
+        # Do not start pending widgets if the consumer went away
+        # (shutdown(cancel_futures=True) needs Python 3.9)
+        for future in futures:
+            future.cancel()
+        executor.shutdown(wait=True)
+
+
+async def aprefetch_widgets(widgets, max_workers=None, cached=False):
+    """
+    Async variant of prefetch_widgets().
+
+    Widgets are evaluated with ``asyncio.gather``, at most ``max_workers`` at
+    a time. Widgets implementing the async API (``aget_value`` and friends)
+    run on the event loop; sync data methods run in worker threads unless the
+    request thread is inside an open transaction.
+    """
+    widgets = list(widgets)
+    use_worker_threads = await sync_to_async(can_run_concurrently)()
+    semaphore = asyncio.Semaphore(get_max_workers(max_workers))
+
+    async def prefetch(widget):
+        async with semaphore:
+            widget.use_worker_threads = use_worker_threads
+            if cached:
+                return await widget.aprefetch_cached()
+            return await widget.aprefetch()
+
+    await asyncio.gather(*(prefetch(widget) for widget in widgets))
+    return widgets
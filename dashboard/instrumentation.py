@@ -0,0 +1,135 @@
+"""
+Widget instrumentation for the custom admin dashboard.
+
+Records the wall time, database query count and database time of every
+widget evaluation. Widgets over the configured budget are logged to the
+``dashboard`` logger, and views report the timings of the widgets they
+evaluated in ``Server-Timing`` response headers, which browsers show in
+their developer tools. Queries are counted with database execute wrappers,
+so this works with ``DEBUG = False``.
+"""
+
+import logging
+import re
+import threading
+import time
+from contextlib import ExitStack, contextmanager
+
+from django.db import connections
+
+from dashboard_config.settings import get_widget_config
+
+
+logger = logging.getLogger('dashboard')
+
+
+class WidgetTiming:
+    """Wall time and database usage of one widget evaluation."""
+
+    def __init__(self, widget_id):
+        self.widget_id = widget_id
+        self.duration = 0.0  # Milliseconds
+        self.queries = 0
+        self.db_time = 0.0  # Milliseconds
+        self._lock = threading.Lock()
+
+    def __call__(self, execute, sql, params, many, context):
+        """Database execute wrapper counting queries and their duration."""
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = (time.perf_counter() - start) * 1000
+            with self._lock:
+                self.queries += 1
+                self.db_time += elapsed
+
+    @contextmanager
+    def record_queries(self):
+        """Record the queries run by the current thread."""
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(self))
+            yield self
+
+    def wrap(self, func):
+        """Return ``func`` recording the queries it runs, in any thread."""
+        def wrapper(*args, **kwargs):
+            with self.record_queries():
+                return func(*args, **kwargs)
+        return wrapper
+
+    @contextmanager
+    def measure(self, record_queries=True):
+        """Measure the wall time of the block, then check the budget."""
+        start = time.perf_counter()
+        try:
+            if record_queries:
+                with self.record_queries():
+                    yield self
+            else:
+                yield self
+        finally:
+            self.duration += (time.perf_counter() - start) * 1000
+            check_budget(self)
+
+    def __repr__(self):
+        return (
+            f"<WidgetTiming {self.widget_id}: {self.duration:.1f}ms, "
+            f"{self.queries} queries, {self.db_time:.1f}ms in database>"
+        )
+
+
+def check_budget(timing):
+    """Log a warning when a widget evaluation exceeds the configured budget."""
+    config = get_widget_config()
+    time_budget = config['time_budget']
+    query_budget = config['query_budget']
+
+    over_time = time_budget is not None and timing.duration > time_budget
+    over_queries = query_budget is not None and timing.queries > query_budget
+    if over_time or over_queries:
+        logger.warning(
+            "Widget %s over budget: %.1fms (budget %sms), %d queries (budget %s), %.1fms in database",
+            timing.widget_id,
+            timing.duration,
+            time_budget,
+            timing.queries,
+            query_budget,
+            timing.db_time,
+        )
+        return False
+    return True
+
+
+def get_widget_timings(widgets):
+    """Return the timings of the widgets evaluated during the request."""
+    return [widget.timing for widget in widgets if widget.timing is not None]
+
+
+def _metric_name(widget_id):
+    # Server-Timing metric names are HTTP tokens
+    return re.sub(r'[^\w.-]', '_', str(widget_id))
+
+
+def format_server_timing(timings):
+    """Format widget timings as a ``Server-Timing`` header value."""
+    metrics = []
+    for timing in timings:
+        name = _metric_name(timing.widget_id)
+        metrics.append(f'{name};dur={timing.duration:.1f};desc="{timing.queries} queries"')
+        metrics.append(f'{name}-db;dur={timing.db_time:.1f}')
+    return ', '.join(metrics)
+
+
+def add_server_timing(response, timings):
+    """Append widget timings to the response's ``Server-Timing`` header."""
+    timings = list(timings)
+    if not timings or not get_widget_config()['server_timing']:
+        return response
+
+    value = format_server_timing(timings)
+    if response.has_header('Server-Timing'):
+        value = f"{response['Server-Timing']}, {value}"
+    response['Server-Timing'] = value
+    return response
@@ -0,0 +1,48 @@
+"""
+Management command to update the dashboard's daily rollups.
+"""
+
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = 'Update the daily rollups read by time-series dashboard widgets'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--metric',
+            action='append',
+            dest='metrics',
+            help='Rollup metric key to update (can be repeated; default: all)'
+        )
+        parser.add_argument(
+            '--since',
+            type=str,
+            help='Recompute from this date (YYYY-MM-DD) instead of the last stored day'
+        )
+
+    def handle(self, *args, **options):
+        from dashboard.rollups import rollup_registry, update_rollups
+
+        metrics = options['metrics']
+        since = None
+
+        if options['since']:
+            try:
+                since = date.fromisoformat(options['since'])
+            except ValueError:
+                raise CommandError(f"Invalid date '{options['since']}', expected YYYY-MM-DD")
+
+        if metrics:
+            unknown = [key for key in metrics if rollup_registry.get_metric(key) is None]
+            if unknown:
+                raise CommandError(f"Unknown rollup metric(s): {', '.join(unknown)}")
+
+        written = update_rollups(keys=metrics, since=since)
+
+        for key, days in written.items():
+            self.stdout.write(f'{key}: {days} day(s) updated.')
+
+        self.stdout.write(self.style.SUCCESS('Rollups updated successfully.'))
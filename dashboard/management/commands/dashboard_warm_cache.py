@@ -0,0 +1,92 @@
+"""
+Management command to warm the dashboard widget caches.
+"""
+
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections
+
+
+class Command(BaseCommand):
+    help = 'Evaluate enabled widgets for every cache scope and fill the widget data and HTML caches'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--widget',
+            action='append',
+            dest='widgets',
+            help='Widget ID to warm (can be repeated; default: all enabled widgets)'
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            help='Number of widgets evaluated concurrently (default: WIDGET_MAX_WORKERS)'
+        )
+        parser.add_argument(
+            '--continuous',
+            action='store_true',
+            help='Keep running, rewarming entries before they expire'
+        )
+        parser.add_argument(
+            '--margin',
+            type=float,
+            default=30,
+            help='With --continuous, rewarm entries expiring within this many seconds (default: 30)'
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=10,
+            help='With --continuous, seconds between two checks (default: 10)'
+        )
+
+    def handle(self, *args, **options):
+        from dashboard.precompute import get_widget_classes
+
+        try:
+            widget_classes = get_widget_classes(options['widgets'])
+        except ValueError as e:
+            raise CommandError(e)
+
+        self.warm(widget_classes, options['workers'])
+        if not options['continuous']:
+            return
+
+        self.stdout.write('Rewarming entries before they expire. Press Ctrl+C to stop.')
+        try:
+            while True:
+                time.sleep(options['interval'])
+                close_old_connections()
+                self.warm(widget_classes, options['workers'], margin=options['margin'])
+        except KeyboardInterrupt:
+            self.stdout.write('Stopped.')
+
+    def warm(self, widget_classes, max_workers, margin=None):
+        """Warm every cache entry of ``widget_classes`` and report their timings."""
+        from dashboard.precompute import precompute_widgets
+
+        start = time.perf_counter()
+        results = precompute_widgets(widget_classes, max_workers=max_workers, margin=margin)
+        elapsed = (time.perf_counter() - start) * 1000
+
+        warmed = 0
+        for result in results:
+            if result.status == 'fresh':
+                continue
+            line = f'{result.widget_id} [{result.cache_key}]: {result.status}'
+            if result.timing is not None:
+                line += (
+                    f' in {result.timing.duration:.1f}ms'
+                    f' ({result.timing.queries} queries, {result.timing.db_time:.1f}ms in database)'
+                )
+            if result.status == 'failed':
+                self.stderr.write(f'{line}: {result.error}')
+            else:
+                warmed += result.status == 'computed'
+                self.stdout.write(line)
+
+        if margin is None or warmed:
+            self.stdout.write(self.style.SUCCESS(
+                f'Warmed {warmed} of {len(results)} cache entries in {elapsed:.1f}ms.'
+            ))
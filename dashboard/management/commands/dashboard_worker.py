@@ -0,0 +1,64 @@
+"""
+Management command to precompute dashboard widget data in the background.
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = 'Recompute widget data on each widget\'s refresh interval and store it in the widget cache'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--widget',
+            action='append',
+            dest='widgets',
+            help='Widget ID to precompute (can be repeated; default: all enabled widgets)'
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            help='Number of widgets computed concurrently (default: WIDGET_MAX_WORKERS)'
+        )
+        parser.add_argument(
+            '--jitter',
+            type=float,
+            help='Random +/- fraction applied to each widget\'s refresh interval (default: CACHE_JITTER)'
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Compute every widget once and exit'
+        )
+
+    def handle(self, *args, **options):
+        from dashboard.precompute import PrecomputeScheduler, get_widget_classes, precompute_widgets
+
+        try:
+            widget_classes = get_widget_classes(options['widgets'])
+        except ValueError as e:
+            raise CommandError(e)
+
+        if options['once']:
+            self.report(precompute_widgets(widget_classes, max_workers=options['workers']))
+            return
+
+        scheduler = PrecomputeScheduler(
+            widget_classes, max_workers=options['workers'], jitter=options['jitter']
+        )
+        self.stdout.write(f'Precomputing {len(widget_classes)} widget(s). Press Ctrl+C to stop.')
+        try:
+            scheduler.run(callback=self.report)
+        except KeyboardInterrupt:
+            self.stdout.write('Stopped.')
+
+    def report(self, results):
+        """Write one line per computed cache entry."""
+        for result in results:
+            line = f'{result.widget_id} [{result.cache_key}]: {result.status}'
+            if result.timing is not None:
+                line += f' in {result.timing.duration:.1f}ms ({result.timing.queries} queries)'
+            if result.status == 'failed':
+                self.stderr.write(f'{line}: {result.error}')
+            else:
+                self.stdout.write(line)
@@ -0,0 +1,23 @@
+"""
+Models for the custom admin dashboard.
+"""
+
+from django.db import models
+
+
+class DailyMetric(models.Model):
+    """Pre-aggregated value of a dashboard metric for one day."""
+    
+    key = models.CharField(max_length=100)
+    date = models.DateField()
+    value = models.FloatField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        ordering = ['key', 'date']
+        constraints = [
+            models.UniqueConstraint(fields=['key', 'date'], name='dashboard_dailymetric_key_date'),
+        ]
+    
+    def __str__(self):
+        return f"{self.key} {self.date}: {self.value}"
@@ -0,0 +1,277 @@
+"""
+Background precomputation of widget data for the custom admin dashboard.
+
+The ``dashboard_worker`` management command recomputes every enabled widget
+on its ``refresh_interval`` and writes the result into the widget cache, so
+dashboard requests read precomputed data instead of querying the database.
+
+The ``dashboard_warm_cache`` command uses the same machinery to fill a cold
+cache after a deploy.
+
+Widget data depends on who asks for it (see the widget cache scopes), so
+each widget is computed for one representative user per cache entry: the
+first staff user for ``global`` widgets, one user per distinct set of relevant
+permissions for ``permissions`` widgets and every staff user for ``user`` widgets.
+
+Workers on several nodes may run at once: a widget's entry is computed
+under the same cache lock taken by requests recomputing it (see
+``WidgetCache.acquire_lock``), so only one process computes it at a time.
+"""
+
+import heapq
+import logging
+import random
+import threading
+import time
+from typing import NamedTuple
+
+from django.contrib.auth import get_user_model
+from django.db import close_old_connections
+from django.test import RequestFactory
+
+from dashboard_config.settings import THEMES, get_widget_config
+
+from .cache import (
+    CACHE_SCOPE_GLOBAL,
+    CACHE_SCOPE_PERMISSIONS,
+    get_permission_hash,
+    get_widget_permissions,
+    widget_cache,
+    widget_cache_key,
+    widget_fragment_cache_key,
+)
+from .engine import run_concurrently
+from .instrumentation import WidgetTiming
+from .widgets import widget_registry
+
+
+logger = logging.getLogger('dashboard')
+
+
+class PrecomputeResult(NamedTuple):
+    """Outcome of computing one widget cache entry."""
+
+    widget_id: str
+    cache_key: str
+    status: str  # 'computed', 'fresh', 'locked' (computed elsewhere) or 'failed'
+    timing: WidgetTiming = None
+    error: Exception = None
+
+
+def get_representative_users(cache_scope, permissions=frozenset()):
+    """
+    Return one user per cache entry of a widget with ``cache_scope``;
+    permission-scoped entries are keyed by the held subset of ``permissions``.
+    """
+    users = get_user_model().objects.filter(
+        is_active=True, is_staff=True
+    ).order_by('-is_superuser', 'pk')
+
+    if cache_scope == CACHE_SCOPE_GLOBAL:
+        return list(users[:1])
+
+    if cache_scope == CACHE_SCOPE_PERMISSIONS:
+        by_permissions = {}
+        for user in users:
+            by_permissions.setdefault(get_permission_hash(user, permissions), user)
+        return list(by_permissions.values())
+
+    return list(users)
+
+
+def make_request(user):
+    """Build a request standing in for a dashboard request made by ``user``."""
+    request = RequestFactory().get('/')
+    request.user = user
+    request.session = {}
+    return request
+
+
+def get_precompute_timeout(widget_class, jitter=None):
+    """
+    Cache timeout of precomputed data: fresh until the next scheduled run
+    has stored new data, i.e. the longest jittered refresh interval plus the
+    time the next run may take, bounded by the recompute lock lease.
+    """
+    config = get_widget_config()
+    if jitter is None:
+        jitter = config['cache_jitter']
+    next_run = max(widget_class.refresh_interval, 1) * (1 + jitter)
+    return max(widget_class.cache_timeout, next_run + config['cache_lock_timeout'])
+
+
+def is_fresh(cache_key, margin):
+    """Check whether a cache entry stays fresh for at least ``margin`` seconds."""
+    entry = widget_cache.get_entry(cache_key)
+    return entry is not None and entry['fresh_until'] - time.time() > margin
+
+
+def store_fragments(widget, timeout, jitter=None):
+    """Render a widget in every theme and store the HTML in the fragment cache."""
+    for theme in THEMES:
+        widget.request.session['dashboard_theme'] = theme
+        widget_cache.set(widget_fragment_cache_key(widget, theme), widget.render(), timeout, jitter)
+        widget_cache.set(widget_fragment_cache_key(widget, theme, 'card'), widget.render_card(), timeout, jitter)
+
+
+def precompute_entry(widget, timeout=None, margin=None, jitter=None):
+    """
+    Compute one widget's data for its request user and store it in every
+    cache read by dashboard pages, the widget and chart APIs and the
+    fragment cache.
+
+    The entry is skipped when another process holds its recompute lock, or
+    when it stays fresh for more than ``margin`` seconds. ``jitter`` is the
+    scheduler's jitter, covered by the default timeout; the stored entries
+    are not jittered again.
+    """
+    cache_key = widget_cache_key(widget)
+    if margin is not None and is_fresh(cache_key, margin):
+        return PrecomputeResult(widget.widget_id, cache_key, 'fresh')
+
+    token = widget_cache.acquire_lock(cache_key)
+    if token is None:
+        return PrecomputeResult(widget.widget_id, cache_key, 'locked')
+
+    if timeout is None:
+        timeout = get_precompute_timeout(type(widget), jitter)
+
+    try:
+        data = widget.get_api_data()
+        widget_cache.set(cache_key, data, timeout, jitter=0)
+        widget_cache.set(widget_cache_key(widget, prefix='widget_prefetch'), widget.data, timeout, jitter=0)
+        widget_cache.set(
+            widget_cache_key(widget, prefix='api_widget_data'),
+            {**data, 'widget_id': widget.widget_id},
+            timeout,
+            jitter=0,
+        )
+        widget_cache.set(
+            widget_cache_key(widget, prefix='api_chart_data'), data['chart_data'], timeout, jitter=0
+        )
+        store_fragments(widget, timeout, jitter=0)
+    except Exception as e:
+        logger.exception("Failed to precompute widget %s", widget.widget_id)
+        return PrecomputeResult(widget.widget_id, cache_key, 'failed', widget.timing, e)
+    finally:
+        widget_cache.release_lock(cache_key, token)
+
+    return PrecomputeResult(widget.widget_id, cache_key, 'computed', widget.timing)
+
+
+def get_widget_classes(widget_ids=None):
+    """
+    Return the classes of ``widget_ids``, or of every enabled widget.
+
+    Raises ValueError naming the unknown widget IDs, if any.
+    """
+    if not widget_ids:
+        return [spec.widget_class for spec in widget_registry.get_enabled_specs()]
+
+    unknown = [widget_id for widget_id in widget_ids if widget_registry.get_widget(widget_id) is None]
+    if unknown:
+        raise ValueError(f"Unknown widget(s): {', '.join(unknown)}")
+    return [widget_registry.get_widget(widget_id) for widget_id in widget_ids]
+
+
+def get_precompute_widgets(widget_class):
+    """Instantiate a widget once per cache entry, for representative users."""
+    widgets = {}
+    permissions = get_widget_permissions(
+        tuple(widget_class.requires_permissions), tuple(widget_class.depends_on)
+    )
+    for user in get_representative_users(widget_class.cache_scope, permissions):
+        widget = widget_class(request=make_request(user))
+        if not widget.has_permission(user):
+            continue
+        widgets.setdefault(widget_cache_key(widget), widget)
+    return list(widgets.values())
+
+
+def precompute_widgets(widget_classes, max_workers=None, **kwargs):
+    """
+    Compute every cache entry of ``widget_classes``, concurrently.
+
+    Keyword arguments are passed to precompute_entry().
+    """
+    widgets = [
+        widget
+        for widget_class in widget_classes
+        for widget in get_precompute_widgets(widget_class)
+    ]
+    return run_concurrently(
+        [lambda widget=widget: precompute_entry(widget, **kwargs) for widget in widgets],
+        max_workers=max_workers,
+    )
+
+
+class PrecomputeScheduler:
+    """
+    Recompute widgets on their ``refresh_interval``.
+
+    Each run is rescheduled with a random jitter (``CACHE_JITTER`` by
+    default) so widgets sharing an interval spread out over time. Widgets
+    due together are computed concurrently, with at most ``max_workers``
+    threads.
+    """
+
+    def __init__(self, widget_classes, max_workers=None, jitter=None):
+        self.widget_classes = list(widget_classes)
+        self.max_workers = max_workers
+        self.jitter = get_widget_config()['cache_jitter'] if jitter is None else jitter
+        self.stop_event = threading.Event()
+
+        # Every widget is due on start, to fill a cold cache
+        now = time.monotonic()
+        self.queue = [(now, index) for index in range(len(self.widget_classes))]
+        heapq.heapify(self.queue)
+
+    def get_next_run(self, widget_class, now):
+        """Return when a widget computed at ``now`` is due again."""
+        jitter = random.uniform(1 - self.jitter, 1 + self.jitter)
+        return now + max(widget_class.refresh_interval, 1) * jitter
+
+    def run_pending(self):
+        """Compute the widgets that are due and reschedule them."""
+        now = time.monotonic()
+        due = []
+        while self.queue and self.queue[0][0] <= now:
+            due.append(heapq.heappop(self.queue)[1])
+        if not due:
+            return []
+
+        results = precompute_widgets(
+            [self.widget_classes[index] for index in due],
+            max_workers=self.max_workers,
+            jitter=self.jitter,
+        )
+
+        # Rescheduled from the start of the run, so precomputed entries stay
+        # fresh until the next run stores new data (see get_precompute_timeout())
+        for index in due:
+            heapq.heappush(self.queue, (self.get_next_run(self.widget_classes[index], now), index))
+        return results
+
+    def get_delay(self):
+        """Return the number of seconds until the next widget is due."""
+        if not self.queue:
+            return None
+        return max(self.queue[0][0] - time.monotonic(), 0)
+
+    def run(self, callback=None):
+        """Run until stop() is called, passing every batch of results to ``callback``."""
+        while not self.stop_event.is_set():
+            # Long-running workers must not keep a broken or expired connection
+            close_old_connections()
+            results = self.run_pending()
+            if results and callback is not None:
+                callback(results)
+
+            delay = self.get_delay()
+            if delay is None:
+                break
+            self.stop_event.wait(delay)
+
+    def stop(self):
+        """Stop run() once the current batch is computed."""
+        self.stop_event.set()
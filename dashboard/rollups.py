@@ -0,0 +1,150 @@
+"""
+Daily rollups for the custom admin dashboard.
+
+A rollup metric aggregates a model per day into ``DailyMetric`` rows, so
+time-series widgets read a handful of pre-aggregated rows instead of scanning
+the source table on every render. ``update_rollups()`` is incremental: it only
+recomputes the days since the last stored row, and is meant to run
+periodically (see the ``dashboard_rollup`` management command).
+"""
+
+from datetime import datetime, time, timedelta
+
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models import Count
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .cache import bump_model_version
+from .models import DailyMetric
+
+
+class RollupMetric:
+    """A metric aggregated per day from a model's date or datetime field."""
+
+    def __init__(self, key, queryset, date_field, aggregate=None, backfill_days=90):
+        self.key = key
+        self.queryset = queryset
+        self.date_field = date_field
+        self.aggregate = aggregate if aggregate is not None else Count('pk')
+        self.backfill_days = backfill_days
+
+    def get_queryset(self):
+        """Return a fresh copy of the source queryset."""
+        if hasattr(self.queryset, '_default_manager'):
+            return self.queryset._default_manager.all()
+        return self.queryset.all()
+
+    def get_bounds(self, start_date, end_date):
+        """Return the ``(start, end)`` filter bounds covering the given days."""
+        field = self.get_queryset().model._meta.get_field(self.date_field)
+        if field.get_internal_type() != 'DateTimeField':
+            return start_date, end_date + timedelta(days=1)
+
+        tz = timezone.get_current_timezone()
+        return (
+            timezone.make_aware(datetime.combine(start_date, time.min), tz),
+            timezone.make_aware(datetime.combine(end_date + timedelta(days=1), time.min), tz),
+        )
+
+    def compute(self, start_date, end_date):
+        """Aggregate the metric per day with a single grouped query."""
+        start, end = self.get_bounds(start_date, end_date)
+        rows = (
+            self.get_queryset()
+            .filter(**{
+                f"{self.date_field}__gte": start,
+                f"{self.date_field}__lt": end,
+            })
+            .annotate(rollup_date=TruncDate(self.date_field))
+            .order_by()
+            .values('rollup_date')
+            .annotate(rollup_value=self.aggregate)
+            .values_list('rollup_date', 'rollup_value')
+        )
+        return {day: float(value or 0) for day, value in rows}
+
+
+class RollupRegistry:
+    """Registry of the metrics maintained by the rollup engine."""
+
+    def __init__(self):
+        self._metrics = {}
+
+    def register(self, metric):
+        """Register a rollup metric."""
+        self._metrics[metric.key] = metric
+        return metric
+
+    def get_metric(self, key):
+        """Get a rollup metric by key."""
+        return self._metrics.get(key)
+
+    def get_all_metrics(self):
+        """Get all registered rollup metrics."""
+        return self._metrics.values()
+
+
+# Global rollup registry
+rollup_registry = RollupRegistry()
+
+
+def register_rollup(key, queryset, date_field, aggregate=None, backfill_days=90):
+    """Register a metric to be rolled up per day."""
+    return rollup_registry.register(
+        RollupMetric(key, queryset, date_field, aggregate=aggregate, backfill_days=backfill_days)
+    )
+
+
+def update_rollup(metric, since=None, today=None):
+    """
+    Recompute the daily rows of one metric.
+
+    Without ``since``, recomputes from the last stored day (which may have
+    been partial) or backfills ``metric.backfill_days`` for a new metric.
+    Returns the number of days written.
+    """
+    today = today or timezone.localdate()
+
+    if since is None:
+        last_date = (
+            DailyMetric.objects.filter(key=metric.key)
+            .order_by('-date')
+            .values_list('date', flat=True)
+            .first()
+        )
+        since = last_date or today - timedelta(days=metric.backfill_days - 1)
+
+    values = metric.compute(since, today)
+    days = [since + timedelta(days=i) for i in range((today - since).days + 1)]
+
+    with transaction.atomic():
+        DailyMetric.objects.filter(key=metric.key, date__gte=since, date__lte=today).delete()
+        DailyMetric.objects.bulk_create([
+            DailyMetric(key=metric.key, date=day, value=values.get(day, 0))
+            for day in days
+        ])
+
+    return len(days)
+
+
+def update_rollups(keys=None, since=None, today=None):
+    """Recompute the daily rows of the given (or all) metrics."""
+    metrics = [
+        metric for metric in rollup_registry.get_all_metrics()
+        if keys is None or metric.key in keys
+    ]
+
+    written = {metric.key: update_rollup(metric, since=since, today=today) for metric in metrics}
+
+    # bulk_create() sends no signals, so invalidate dependent widgets here
+    if written:
+        bump_model_version(DailyMetric)
+
+    return written
+
+
+# Built-in rollups
+register_rollup('auth.user.registrations', User, 'date_joined')
+register_rollup('auth.user.logins', User, 'last_login')
@@ -0,0 +1,66 @@
+"""
+Model signal handlers for the custom admin dashboard.
+
+Widgets declare the models they read in ``depends_on``. Whenever one of those
+models is written, its version counter is bumped, which changes the cache
+keys of every widget depending on it.
+
+Versions are bumped once the write is committed: bumped earlier, a concurrent
+request could read the new version with the old data and cache it under the
+new key.
+"""
+
+from functools import partial
+
+from django.apps import apps
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+
+from .cache import bump_model_version, get_model_label
+
+
+def model_changed(sender, using=None, **kwargs):
+    """Bump the version of a saved or deleted model."""
+    transaction.on_commit(partial(bump_model_version, sender), using=using)
+
+
+def m2m_relation_changed(sender, instance, action, model, using=None, **kwargs):
+    """Bump the versions of the tracked sides of a changed many-to-many relation."""
+    from .widgets import widget_registry
+
+    if not action.startswith('post_'):
+        return
+
+    # Only one side of the relation may be tracked
+    labels = widget_registry.get_dependency_labels()
+    for changed_model in (sender, instance.__class__, model):
+        if get_model_label(changed_model) in labels:
+            transaction.on_commit(partial(bump_model_version, changed_model), using=using)
+
+
+def connect_model_signals(model):
+    """
+    Connect the signal handlers of one model widgets depend on.
+
+    Handlers are connected per sender: receivers listening to every model
+    would disable Django's fast deletes for all of them.
+    """
+    try:
+        model = apps.get_model(get_model_label(model))
+    except LookupError:
+        return
+
+    post_save.connect(model_changed, sender=model, dispatch_uid='dashboard_model_saved')
+    post_delete.connect(model_changed, sender=model, dispatch_uid='dashboard_model_deleted')
+    for field in model._meta.get_fields():
+        if field.many_to_many:
+            through = getattr(field, 'through', None) or field.remote_field.through
+            m2m_changed.connect(m2m_relation_changed, sender=through, dispatch_uid='dashboard_m2m_changed')
+
+
+def connect_signals():
+    """Connect the signal handlers of every model registered widgets depend on."""
+    from .widgets import widget_registry
+
+    for label in widget_registry.get_dependency_labels():
+        connect_model_signals(label)
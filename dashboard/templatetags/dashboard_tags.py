@@ -5,10 +5,11 @@ Template tags for the custom admin dashboard.
 from django import template
 from django.conf import settings
 from django.utils.safestring import mark_safe
-import json
 
 from dashboard_config.settings import get_dashboard_settings, get_theme_config, get_chart_colors
 
+from ..encoders import dumps
+
 register = template.Library()
 
 
@@ -38,7 +39,7 @@ def chart_color(color_name):
 @register.filter
 def to_json(value):
     """Convert value to JSON string."""
-    return mark_safe(json.dumps(value))
+    return mark_safe(dumps(value))
 
 
 @register.inclusion_tag('dashboard/widgets/widget_icon.html')
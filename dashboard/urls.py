@@ -16,6 +16,11 @@ dashboard_patterns = [
     path('export/', views.export_dashboard_data_view, name='export'),
     path('widget/<str:widget_id>/', views.widget_data_view, name='widget_data'),
     path('widget/<str:widget_id>/refresh/', views.refresh_widget_view, name='widget_refresh'),
+    
+    # ASGI-native variants
+    path('async/widgets/', views.async_dashboard_view, name='widgets_async'),
+    path('async/widget/<str:widget_id>/', views.async_widget_data_view, name='widget_data_async'),
+    path('events/', views.widget_events_view, name='widget_events'),
 ]
 
 # API URLs
@@ -134,19 +134,101 @@ def refresh_widget_view(request, widget_id):
     # This would typically refresh cached data
     return widget_data_view(request, widget_id)
 
+import asyncio
 import json
+import logging
+import time
+from functools import partial
+from asgiref.sync import sync_to_async
 from django.shortcuts import render
-from django.http import JsonResponse
+from django.http import HttpResponse, StreamingHttpResponse
+from django.template.loader import render_to_string
+from django.utils.cache import patch_vary_headers
 from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib.auth.decorators import login_required
+from django.contrib.auth.views import redirect_to_login
 from django.utils.decorators import method_decorator
 from django.views.generic import TemplateView
 from django.conf import settings
-from django.core.cache import cache
 from django.utils import timezone
 
 from .widgets import widget_registry
-from dashboard_config.settings import get_dashboard_settings
+from .cache import (
+    conditional_response,
+    get_fragment_cache_prefixes,
+    widget_cache,
+    widget_cache_key,
+    widget_fragment_cache_key,
+)
+from .encoders import JsonResponse, dumps
+from .engine import prefetch_widgets, aprefetch_widgets, iter_prefetch_widgets, run_in_worker
+from .events import WidgetVersionTracker, format_event, parse_resume_id
+from .export import EXPORT_FORMATS, iter_export_records, streaming_export_response
+from .instrumentation import add_server_timing, get_widget_timings
+from dashboard_config.settings import THEMES, as_dict, get_dashboard_settings, get_widget_config
+
+
+logger = logging.getLogger('dashboard')
+
+# Seconds between keep-alive comments on idle event streams
+SSE_HEARTBEAT_INTERVAL = 15
+
+
+def get_user_theme(request):
+    """Get the dashboard theme chosen by the request user."""
+    config = get_dashboard_settings()
+    session = getattr(request, 'session', {})
+    return session.get('dashboard_theme', config.get('THEME', 'light'))
+
+
+def _get_fragment_theme(request):
+    # Fragments are cached for the known themes only
+    theme = get_user_theme(request)
+    return theme if theme in THEMES else 'light'
+
+
+def get_cached_fragment(request, widget, fragment, render_fragment):
+    """Return the fragment cache entry of a widget's rendered HTML, rendering it when missing."""
+    key = widget_fragment_cache_key(widget, _get_fragment_theme(request), fragment)
+    return widget_cache.get_or_set_entry(key, render_fragment, widget.cache_timeout)
+
+
+async def aget_cached_fragment(request, widget, fragment, arender_fragment):
+    """Async variant of get_cached_fragment() taking a coroutine function."""
+    theme = await sync_to_async(_get_fragment_theme)(request)
+    key = await sync_to_async(widget_fragment_cache_key)(widget, theme, fragment)
+    return await widget_cache.aget_or_set_entry(key, arender_fragment, widget.cache_timeout)
+
+
+def get_cached_card(request, widget):
+    """Return the fragment cache entry of a widget's dashboard card."""
+    return get_cached_fragment(request, widget, 'card', widget.render_card)
+
+
+def _html_response(html):
+    return JsonResponse({'html': html})
+
+
+def delete_cached_fragments(widget):
+    """Remove a widget's rendered HTML from the fragment cache, in every theme."""
+    widget_cache.delete_many([
+        widget_cache_key(widget, prefix=prefix)
+        for prefix in get_fragment_cache_prefixes()
+    ])
+
+
+def _get_eager_widgets(widgets):
+    """Widgets evaluated with the page; lazy widgets load when revealed."""
+    return [widget for widget in widgets if not widget.lazy]
+
+
+def _get_permitted_widgets(request):
+    """Instantiate the enabled widgets the request user may see."""
+    return [
+        spec.widget_class(request=request)
+        for spec in widget_registry.get_enabled_specs()
+        if spec.has_permission(request.user, request=request)
+    ]
 
 
 @staff_member_required
@@ -160,13 +242,11 @@ def admin_index_view(request):
     
     # Get dashboard widgets
     config = get_dashboard_settings()
-    enabled_widgets = widget_registry.get_enabled_widgets()
+    widgets = _get_permitted_widgets(request)
     
-    widgets = []
-    for widget_class in enabled_widgets:
-        widget_instance = widget_class(request=request)
-        if widget_instance.has_permission(request.user):
-            widgets.append(widget_instance)
+    # Read widget data from the cache, evaluating missing entries
+    # concurrently before rendering
+    prefetch_widgets(_get_eager_widgets(widgets), cached=True)
     
     # Get recent admin log entries (what Django's admin expects)
     log_entries = LogEntry.objects.filter(
@@ -188,7 +268,8 @@ def admin_index_view(request):
     }
     
     # Use our dashboard template instead of Django's default admin template
-    return render(request, 'dashboard/dashboard.html', context)
+    response = render(request, 'dashboard/dashboard.html', context)
+    return add_server_timing(response, get_widget_timings(widgets))
 
 
 @staff_member_required
@@ -196,17 +277,8 @@ def dashboard_view(request):
     """Main dashboard view."""
     config = get_dashboard_settings()
     
-    # Get enabled widgets
-    enabled_widgets = widget_registry.get_enabled_widgets()
-    
-    # Initialize widgets with request context
-    widgets = []
-    for widget_class in enabled_widgets:
-        widget_instance = widget_class(request=request)
-        
-        # Check permissions
-        if widget_instance.has_permission(request.user):
-            widgets.append(widget_instance)
+    # Initialize the enabled widgets the user may see
+    widgets = _get_permitted_widgets(request)
     
     # Theme configuration
     theme = config.get('THEME', 'light')
@@ -221,7 +293,45 @@ def dashboard_view(request):
         'config': config,
     }
     
-    return render(request, 'dashboard/dashboard.html', context)
+    if config.get('STREAMING_RENDER', False):
+        return stream_dashboard(request, 'dashboard/dashboard.html', context)
+    
+    # Read widget data from the cache, evaluating missing entries
+    # concurrently before rendering
+    prefetch_widgets(_get_eager_widgets(widgets), cached=True)
+    
+    response = render(request, 'dashboard/dashboard.html', context)
+    return add_server_timing(response, get_widget_timings(widgets))
+
+
+def stream_dashboard(request, template_name, context):
+    """
+    Stream a dashboard page progressively.
+    
+    The page shell is sent at once with a skeleton in place of each widget;
+    each widget's card is then streamed as soon as its data is ready, in
+    completion order, and swapped into its placeholder by the browser.
+    Lazy widgets are left to load when they are scrolled into view.
+    """
+    widgets = context['widgets']
+    page = render_to_string(template_name, {**context, 'streaming': True}, request=request)
+    shell, body_end, page_end = page.rpartition('</body>')
+    if not body_end:
+        shell, page_end = page, ''
+    
+    def stream():
+        yield shell
+        for widget, error in iter_prefetch_widgets(_get_eager_widgets(widgets), cached=True):
+            # Headers are already sent, so a failing widget must not end the response
+            yield render_widget_card(
+                request, widget, error, template_name='dashboard/widgets/stream_fragment.html'
+            )
+        yield body_end + page_end
+    
+    response = StreamingHttpResponse(stream(), content_type='text/html; charset=utf-8')
+    # Ask proxies such as nginx not to buffer the streamed fragments
+    response['X-Accel-Buffering'] = 'no'
+    return response
 
 
 @method_decorator(staff_member_required, name='dispatch')
@@ -234,17 +344,12 @@ class DashboardView(TemplateView):
         context = super().get_context_data(**kwargs)
         config = get_dashboard_settings()
         
-        # Get enabled widgets
-        enabled_widgets = widget_registry.get_enabled_widgets()
+        # Initialize the enabled widgets the user may see
+        widgets = _get_permitted_widgets(self.request)
         
-        # Initialize widgets with request context
-        widgets = []
-        for widget_class in enabled_widgets:
-            widget_instance = widget_class(request=self.request)
-            
-            # Check permissions
-            if widget_instance.has_permission(self.request.user):
-                widgets.append(widget_instance)
+        # Read widget data from the cache, evaluating missing entries
+        # concurrently before rendering
+        prefetch_widgets(_get_eager_widgets(widgets), cached=True)
         
         context.update({
             'widgets': widgets,
@@ -255,6 +360,24 @@ class DashboardView(TemplateView):
         })
         
         return context
+    
+    def render_to_response(self, context, **response_kwargs):
+        response = super().render_to_response(context, **response_kwargs)
+        return add_server_timing(response, get_widget_timings(context['widgets']))
+
+
+def render_widget_card(request, widget, error=None, template_name='dashboard/widgets/card.html'):
+    """Render the card of a widget, or an error card if the widget fails."""
+    if error is None:
+        try:
+            return render_to_string(template_name, {'widget': widget}, request=request)
+        except Exception as e:
+            error = e
+    
+    logger.error("Widget %s failed to load", widget.widget_id, exc_info=error)
+    return render_to_string(
+        template_name, {'widget': widget, 'widget_error': error}, request=request
+    )
 
 
 @staff_member_required
@@ -271,26 +394,34 @@ def widget_data_view(request, widget_id):
     if not widget_instance.has_permission(request.user):
         return JsonResponse({'error': 'Permission denied'}, status=403)
     
-    # Check cache first
-    cache_key = f"widget_data_{widget_id}_{request.user.id}"
-    cached_data = cache.get(cache_key)
-    
-    if cached_data is None:
+    if request.GET.get('fragment') == 'card':
+        # Widget card loaded in place of a lazy widget's skeleton
+        try:
+            html = get_cached_card(request, widget_instance)['value']
+        except Exception as e:
+            html = render_widget_card(request, widget_instance, e)
+        response = HttpResponse(html)
+    elif request.headers.get('HX-Request'):
+        # Return rendered HTML for HTMX, served from the fragment cache
         try:
-            data = widget_instance.get_api_data()
-            cache.set(cache_key, data, timeout=widget_instance.cache_timeout)
+            entry = get_cached_fragment(request, widget_instance, 'widget', widget_instance.render)
         except Exception as e:
             return JsonResponse({'error': str(e)}, status=500)
+        response = conditional_response(request, entry, _html_response)
     else:
-        data = cached_data
+        # Return JSON data for API calls, served from cache and recomputed
+        # once when missing or stale
+        cache_key = widget_cache_key(widget_instance)
+        try:
+            entry = widget_cache.get_or_set_entry(
+                cache_key, widget_instance.get_api_data, widget_instance.cache_timeout
+            )
+        except Exception as e:
+            return JsonResponse({'error': str(e)}, status=500)
+        response = conditional_response(request, entry, JsonResponse)
     
-    if request.headers.get('HX-Request'):
-        # Return rendered HTML for HTMX
-        html = widget_instance.render()
-        return JsonResponse({'html': html})
-    else:
-        # Return JSON data for API calls
-        return JsonResponse(data)
+    patch_vary_headers(response, ['HX-Request'])
+    return add_server_timing(response, get_widget_timings([widget_instance]))
 
 
 @staff_member_required
@@ -307,21 +438,28 @@ def refresh_widget_view(request, widget_id):
     if not widget_instance.has_permission(request.user):
         return JsonResponse({'error': 'Permission denied'}, status=403)
     
-    # Clear cache and get fresh data
-    cache_key = f"widget_data_{widget_id}_{request.user.id}"
-    cache.delete(cache_key)
+    # Get fresh data and replace the cached copy
+    cache_key = widget_cache_key(widget_instance)
     
     try:
         data = widget_instance.get_api_data()
-        cache.set(cache_key, data, timeout=widget_instance.cache_timeout)
+        widget_cache.set(cache_key, data, timeout=widget_instance.cache_timeout)
+        widget_cache.set(
+            widget_cache_key(widget_instance, prefix='widget_prefetch'),
+            widget_instance.data,
+            timeout=widget_instance.cache_timeout,
+        )
+        delete_cached_fragments(widget_instance)
         
         if request.headers.get('HX-Request'):
-            # Return rendered HTML for HTMX
-            html = widget_instance.render()
-            return JsonResponse({'html': html})
+            # Return rendered HTML for HTMX, caching it for later refreshes
+            entry = get_cached_fragment(request, widget_instance, 'widget', widget_instance.render)
+            response = _html_response(entry['value'])
         else:
             # Return JSON data
-            return JsonResponse(data)
+            response = JsonResponse(data)
+        
+        return add_server_timing(response, get_widget_timings([widget_instance]))
     
     except Exception as e:
         return JsonResponse({'error': str(e)}, status=500)
@@ -347,34 +485,47 @@ def dashboard_settings_view(request):
     
     # Get current settings
     config = get_dashboard_settings()
-    user_theme = request.session.get('dashboard_theme', config.get('THEME', 'light'))
     
     return JsonResponse({
-        'theme': user_theme,
-        'config': config,
+        'theme': get_user_theme(request),
+        'config': as_dict(config),
     })
 
 
 @staff_member_required
 def export_dashboard_data_view(request):
-    """Export dashboard data as JSON."""
+    """
+    Export dashboard data as JSON, or stream it as NDJSON or CSV with
+    ``?format=ndjson`` or ``?format=csv`` (see dashboard.export).
+    """
     
     config = get_dashboard_settings()
-    enabled_widgets = widget_registry.get_enabled_widgets()
+    export_format = request.GET.get('format', 'json')
+    
+    if export_format in EXPORT_FORMATS:
+        widgets = (
+            spec.widget_class(request=request)
+            for spec in widget_registry.get_enabled_specs()
+            if spec.has_permission(request.user, request=request)
+        )
+        header = {'timestamp': timezone.now().isoformat(), 'config': as_dict(config)}
+        records = iter_export_records(widgets, header, chunk_size=config['EXPORT_CHUNK_SIZE'])
+        return streaming_export_response(request, export_format, records)
+    
+    if export_format != 'json':
+        return JsonResponse({'error': f'Unknown export format: {export_format}'}, status=400)
     
     export_data = {
-        'config': config,
+        'config': as_dict(config),
         'widgets': [],
         'timestamp': timezone.now().isoformat(),
     }
     
-    for widget_class in enabled_widgets:
-        widget_instance = widget_class(request=request)
-        
-        if widget_instance.has_permission(request.user):
+    for spec in widget_registry.get_enabled_specs():
+        if spec.has_permission(request.user, request=request):
             try:
-                widget_data = widget_instance.get_api_data()
-                widget_data['widget_id'] = getattr(widget_class, 'widget_id', widget_class.__name__)
+                widget_data = spec.widget_class(request=request).get_api_data()
+                widget_data['widget_id'] = spec.widget_id
                 export_data['widgets'].append(widget_data)
             except Exception:
                 # Skip widgets that fail to load
@@ -383,3 +534,158 @@ def export_dashboard_data_view(request):
     response = JsonResponse(export_data)
     response['Content-Disposition'] = 'attachment; filename="dashboard_export.json"'
     return response
+
+
+# Async views
+#
+# ASGI-native variants of the dashboard views. Widgets are evaluated with
+# asyncio.gather, so a dashboard load does not pin a worker thread while
+# widgets wait on the database.
+
+def _get_staff_user(request):
+    """Return the request user if it may access the dashboard."""
+    user = request.user
+    if user.is_active and user.is_staff:
+        return user
+    return None
+
+
+async def _aget_staff_user(request):
+    """Async variant of _get_staff_user()."""
+    if hasattr(request, 'auser'):
+        user = await request.auser()
+        return user if user.is_active and user.is_staff else None
+    return await sync_to_async(_get_staff_user)(request)
+
+
+async def async_dashboard_view(request):
+    """Async variant of dashboard_view()."""
+    if await _aget_staff_user(request) is None:
+        return redirect_to_login(request.get_full_path(), 'admin:login')
+    
+    config = get_dashboard_settings()
+    widgets = await sync_to_async(_get_permitted_widgets)(request)
+    await aprefetch_widgets(_get_eager_widgets(widgets), cached=True)
+    
+    context = {
+        'widgets': widgets,
+        'theme': config.get('THEME', 'light'),
+        'title': config.get('TITLE', 'Admin Dashboard'),
+        'logo_url': config.get('LOGO_URL', None),
+        'config': config,
+    }
+    
+    response = await sync_to_async(render)(request, 'dashboard/dashboard.html', context)
+    return add_server_timing(response, get_widget_timings(widgets))
+
+
+async def async_widget_data_view(request, widget_id):
+    """Async variant of widget_data_view()."""
+    user = await _aget_staff_user(request)
+    if user is None:
+        return redirect_to_login(request.get_full_path(), 'admin:login')
+    
+    widget_class = widget_registry.get_widget(widget_id)
+    if not widget_class:
+        return JsonResponse({'error': 'Widget not found'}, status=404)
+    
+    widget_instance = widget_class(request=request)
+    
+    # Check permissions
+    if not await sync_to_async(widget_instance.has_permission)(user):
+        return JsonResponse({'error': 'Permission denied'}, status=403)
+    
+    async def compute():
+        await aprefetch_widgets([widget_instance])
+        return widget_instance.get_api_data()
+    
+    async def render():
+        await aprefetch_widgets([widget_instance])
+        return await sync_to_async(widget_instance.render)()
+    
+    if request.headers.get('HX-Request'):
+        # Return rendered HTML for HTMX, served from the fragment cache
+        try:
+            entry = await aget_cached_fragment(request, widget_instance, 'widget', render)
+        except Exception as e:
+            return JsonResponse({'error': str(e)}, status=500)
+        response = conditional_response(request, entry, _html_response)
+    else:
+        # Return JSON data for API calls, served from cache and recomputed
+        # once when missing or stale
+        cache_key = await sync_to_async(widget_cache_key)(widget_instance)
+        try:
+            entry = await widget_cache.aget_or_set_entry(cache_key, compute, widget_instance.cache_timeout)
+        except Exception as e:
+            return JsonResponse({'error': str(e)}, status=500)
+        response = conditional_response(request, entry, JsonResponse)
+    
+    patch_vary_headers(response, ['HX-Request'])
+    return add_server_timing(response, get_widget_timings([widget_instance]))
+
+
+async def widget_events_view(request):
+    """
+    Server-Sent Events stream pushing the cards of widgets whose data changed.
+    
+    Replaces polling every widget on ``REFRESH_INTERVAL`` with one connection
+    per dashboard page. Serve it under an ASGI server, where an open stream
+    does not hold a worker thread. Streams end after ``PUSH_MAX_AGE``
+    seconds; the browser then reconnects and resumes from the last event ID.
+    """
+    if await _aget_staff_user(request) is None:
+        return JsonResponse({'error': 'Permission denied'}, status=403)
+    
+    widget_config = get_widget_config()
+    if not widget_config['push_updates']:
+        return JsonResponse({'error': 'Push updates are disabled'}, status=404)
+    
+    widgets = await sync_to_async(_get_permitted_widgets)(request)
+    etags = parse_resume_id(request.headers.get('Last-Event-ID'))
+    # Lazy widgets are tracked too: polling is off while updates are pushed,
+    # and the client ignores the ones it has not revealed yet
+    tracker = await sync_to_async(WidgetVersionTracker)(widgets, etags)
+    interval = widget_config['push_interval']
+    max_age = widget_config['push_max_age']
+    
+    def get_updates():
+        updates = []
+        for widget in tracker.get_changed_widgets():
+            try:
+                entry = get_cached_card(request, widget)
+            except Exception:
+                logger.exception("Widget %s failed to load", widget.widget_id)
+                continue
+            if tracker.is_new(widget, entry['etag']):
+                updates.append(format_event(
+                    dumps({'id': widget.widget_id, 'html': entry['value']}),
+                    event='widget',
+                ))
+        return updates
+    
+    async def stream():
+        # Ask the browser to reconnect quickly if the connection drops
+        yield f"retry: {int(interval * 1000)}\n\n"
+        started = heartbeat = time.monotonic()
+        while time.monotonic() - started < max_age:
+            await asyncio.sleep(interval)
+            # Each stream checks from its own thread, instead of queueing
+            # behind every other stream on the shared sync thread
+            updates = await sync_to_async(partial(run_in_worker, get_updates), thread_sensitive=False)()
+            for update in updates:
+                yield update
+            
+            # Comments keep idle connections open through proxies
+            if updates:
+                heartbeat = time.monotonic()
+            elif time.monotonic() - heartbeat >= SSE_HEARTBEAT_INTERVAL:
+                heartbeat = time.monotonic()
+                yield ": keep-alive\n\n"
+        
+        # Sets the client's last event ID without dispatching an event
+        yield f"id: {tracker.get_resume_id()}\n\n"
+    
+    response = StreamingHttpResponse(stream(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
@@ -2,14 +2,118 @@
 Widget system for the custom admin dashboard.
 """
 
-import json
 from abc import ABC, abstractmethod
-from typing import Dict, Any, List, Optional
+from functools import partial, wraps
+from typing import Dict, Any, List, NamedTuple, Optional
+from django.apps import apps
 from django.contrib.auth.models import User
+from django.db.models import Count, DateField, DateTimeField, Sum
+from django.db.models.functions import Trunc
 from django.utils import timezone
-from datetime import timedelta
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
 from django.template.loader import render_to_string
 from django.conf import settings
+from asgiref.sync import sync_to_async
+
+from dashboard_config.settings import get_dashboard_settings, get_resolved_settings
+
+from .cache import CACHE_SCOPE_GLOBAL, CACHE_SCOPE_USER, get_model_label, widget_cache, widget_cache_key
+from .encoders import dumps
+from .engine import run_in_worker
+from .instrumentation import WidgetTiming
+from .models import DailyMetric
+
+
+def check_widget_permissions(requires_permissions, user):
+    """Check if ``user`` may see a widget requiring ``requires_permissions``."""
+    if not requires_permissions:
+        return user.is_staff
+    
+    for permission in requires_permissions:
+        if not user.has_perm(permission):
+            return False
+    return True
+
+
+class WidgetSpec(NamedTuple):
+    """
+    Immutable metadata record of a registered widget class.
+    
+    Lets listing views read widget metadata and check permissions without
+    instantiating widgets.
+    """
+    
+    widget_id: str
+    widget_class: type
+    name: str  # Class name
+    path: str  # Dotted import path
+    title: str
+    description: str
+    widget_type: str
+    icon: str
+    color: str
+    refresh_interval: int
+    requires_permissions: tuple
+    cache_scope: str
+    cache_timeout: int
+    custom_permission: bool  # The class overrides has_permission()
+    
+    @classmethod
+    def from_class(cls, widget_id, widget_class):
+        """Build the record of a widget class."""
+        return cls(
+            widget_id=widget_id,
+            widget_class=widget_class,
+            name=widget_class.__name__,
+            path=f"{widget_class.__module__}.{widget_class.__qualname__}",
+            title=widget_class.title,
+            description=widget_class.description,
+            widget_type=widget_class.widget_type,
+            icon=widget_class.icon,
+            color=widget_class.color,
+            refresh_interval=widget_class.refresh_interval,
+            requires_permissions=tuple(widget_class.requires_permissions),
+            cache_scope=widget_class.cache_scope,
+            cache_timeout=widget_class.cache_timeout,
+            custom_permission=widget_class.has_permission is not BaseWidget.has_permission,
+        )
+    
+    def has_permission(self, user, request=None):
+        """Check if user has permission to view the widget."""
+        if self.custom_permission:
+            return self.widget_class(request=request).has_permission(user)
+        return check_widget_permissions(self.requires_permissions, user)
+    
+    def get_metadata(self):
+        """Return the metadata listed by the API."""
+        return {
+            'id': self.widget_id,
+            'title': self.title,
+            'description': self.description,
+            'type': self.widget_type,
+            'icon': self.icon,
+            'color': self.color,
+            'refresh_interval': self.refresh_interval,
+        }
+
+
+def get_widget_class_id(widget_class):
+    """Get the id of a widget class, instantiating it only if it must."""
+    widget_id = getattr(widget_class, 'widget_id', None)
+    if isinstance(widget_id, str):
+        return widget_id
+    
+    # BaseWidget's property only depends on class attributes
+    if widget_id is BaseWidget.__dict__['widget_id']:
+        return getattr(widget_class, '_widget_id', None) or widget_class.__name__.lower()
+    
+    # Create an instance to get a custom widget_id property
+    try:
+        return widget_class().widget_id
+    except Exception:
+        # Fallback to lowercase class name
+        return widget_class.__name__.lower()
 
 
 class WidgetRegistry:
@@ -17,60 +121,101 @@ class WidgetRegistry:
     
     def __init__(self):
         self._widgets = {}
+        self._specs = {}
+        self._specs_by_name = {}
+        self._specs_by_path = {}
+        self._dependency_labels = None
+        self._enabled = None
+        self._enabled_settings = None
     
     def register(self, widget_class):
         """Register a widget class."""
-        # Try to get the widget_id from a class attribute first
-        if hasattr(widget_class, 'widget_id') and isinstance(widget_class.widget_id, str):
-            widget_id = widget_class.widget_id
-        else:
-            # Create an instance to get the widget_id property
-            try:
-                widget_instance = widget_class()
-                widget_id = widget_instance.widget_id
-            except:
-                # Fallback to lowercase class name
-                widget_id = widget_class.__name__.lower()
+        widget_id = get_widget_class_id(widget_class)
         
         self._widgets[widget_id] = widget_class
+        self._specs[widget_id] = WidgetSpec.from_class(widget_id, widget_class)
+        self._reindex()
+        
+        # Widgets registered before the app is ready are connected by
+        # DashboardConfig.ready()
+        if apps.ready:
+            from .signals import connect_model_signals
+            for model in widget_class.depends_on:
+                connect_model_signals(model)
         return widget_class
     
+    def _reindex(self):
+        # Rebuild the lookup indexes; the first widget registered under a
+        # class name wins, as with the former linear search
+        self._specs_by_name = {}
+        self._specs_by_path = {}
+        for spec in self._specs.values():
+            self._specs_by_name.setdefault(spec.name, spec)
+            self._specs_by_path.setdefault(spec.path, spec)
+        
+        self._dependency_labels = None
+        self._enabled = None
+    
     def get_widget(self, widget_id):
         """Get a widget class by ID."""
         return self._widgets.get(widget_id)
     
+    def get_spec(self, widget_id):
+        """Get the registration record of a widget by ID."""
+        return self._specs.get(widget_id)
+    
     def get_all_widgets(self):
         """Get all registered widgets."""
         return self._widgets.values()
     
-    def get_enabled_widgets(self):
-        """Get widgets enabled in settings."""
+    def get_all_specs(self):
+        """Get the registration records of all registered widgets."""
+        return self._specs.values()
+    
+    def get_dependency_labels(self):
+        """Get the labels of every model a registered widget depends on."""
+        if self._dependency_labels is None:
+            self._dependency_labels = frozenset(
+                get_model_label(model)
+                for widget_class in self._widgets.values()
+                for model in widget_class.depends_on
+            )
+        return self._dependency_labels
+    
+    def find_spec(self, widget_name):
+        """Find a registered widget by dotted path or class name."""
+        spec = self._specs_by_path.get(widget_name)
+        if spec is None:
+            # Support both class name and full path
+            spec = self._specs_by_name.get(widget_name.rsplit('.', 1)[-1])
+        return spec
+    
+    def get_enabled_specs(self):
+        """
+        Get the registration records of the widgets enabled in settings.
+        
+        Computed once, and again after a registration or a settings change.
+        """
+        resolved_settings = get_resolved_settings()
+        if self._enabled is None or self._enabled_settings is not resolved_settings:
+            self._enabled = self._resolve_enabled_specs()
+            self._enabled_settings = resolved_settings
+        return self._enabled
+    
+    def _resolve_enabled_specs(self):
         config = getattr(settings, 'CUSTOM_ADMIN_DASHBOARD_CONFIG', {})
         enabled_widget_names = config.get('WIDGETS', None)
         
-        # If WIDGETS is explicitly set to empty list, return empty list
-        if enabled_widget_names is not None and not enabled_widget_names:
-            return []
-        
         # If WIDGETS is not set, return default widgets
         if enabled_widget_names is None:
-            return list(self._widgets.values())
-        
-        enabled_widgets = []
-        for widget_name in enabled_widget_names:
-            # Support both class name and full path
-            if '.' in widget_name:
-                widget_class_name = widget_name.split('.')[-1]
-            else:
-                widget_class_name = widget_name
-            
-            # Find widget by class name
-            for widget_id, widget_class in self._widgets.items():
-                if widget_class.__name__ == widget_class_name:
-                    enabled_widgets.append(widget_class)
-                    break
+            return tuple(self._specs.values())
         
-        return enabled_widgets
+        specs = (self.find_spec(widget_name) for widget_name in enabled_widget_names)
+        return tuple(spec for spec in specs if spec is not None)
+    
+    def get_enabled_widgets(self):
+        """Get widgets enabled in settings."""
+        return [spec.widget_class for spec in self.get_enabled_specs()]
 
 
 # Global widget registry
@@ -82,6 +227,27 @@ def register_widget(widget_class):
     return widget_registry.register(widget_class)
 
 
+def memoize_widget_method(func):
+    """
+    Cache the result of a widget data method on the widget instance.
+    
+    Results are keyed by the function itself, so an override calling
+    ``super()`` still reaches the parent implementation once.
+    """
+    @wraps(func)
+    def wrapper(self, *args, **kwargs):
+        if args or kwargs:
+            return func(self, *args, **kwargs)
+        
+        memo = self.__dict__.setdefault('_memo', {})
+        if func not in memo:
+            memo[func] = func(self)
+        return memo[func]
+    
+    wrapper._widget_memoized = True
+    return wrapper
+
+
 class BaseWidget(ABC):
     """Base class for all dashboard widgets."""
     
@@ -92,6 +258,7 @@ class BaseWidget(ABC):
     color = "blue"
     widget_type = "base"
     template_name = "dashboard/widgets/base.html"
+    card_template_name = "dashboard/widgets/card.html"  # Dashboard card around the widget
     
     @property
     def widget_id(self):
@@ -101,10 +268,46 @@ class BaseWidget(ABC):
     # Widget configuration
     refresh_interval = 300  # 5 minutes in seconds
     cache_timeout = 60  # 1 minute
+    cache_scope = CACHE_SCOPE_USER  # 'global', 'permissions' or 'user'
+    depends_on = []  # Models (or 'app_label.Model' labels) the widget reads
     requires_permissions = []
+    lazy = False  # Load the widget when it is scrolled into view instead of with the page
+    
+    # Data methods evaluated at most once per widget instance (i.e. per request)
+    memoized_methods = (
+        'get_value',
+        'get_trend',
+        'get_rows',
+        'get_headers',
+        'get_chart_data',
+        'get_context_data',
+        'get_series',
+    )
+    
+    _data = None
+    
+    # Timing of the last evaluation of the widget data (see dashboard.instrumentation)
+    timing = None
+    
+    # Set by the engine when sync data methods may run in separate threads
+    use_worker_threads = False
+    
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        for name in cls.memoized_methods:
+            method = cls.__dict__.get(name)
+            if callable(method) and not getattr(method, '_widget_memoized', False):
+                setattr(cls, name, memoize_widget_method(method))
     
     def __init__(self, request=None):
         self.request = request
+        self._data = None
+        self._memo = {}
+    
+    def invalidate(self):
+        """Discard memoized and prefetched data so it is evaluated again."""
+        self._memo = {}
+        self._data = None
     
     @abstractmethod
     def get_context_data(self):
@@ -119,39 +322,131 @@ class BaseWidget(ABC):
         """Return Chart.js compatible data for chart widgets."""
         return None
     
+    def collect_data(self):
+        """Evaluate every data method used to render the widget."""
+        return {
+            'value': self.get_value(),
+            'chart_data': self.get_chart_data(),
+            'context': self.get_context_data(),
+        }
+    
+    def prefetch(self):
+        """Evaluate and store the widget data ahead of rendering."""
+        self.timing = WidgetTiming(self.widget_id)
+        with self.timing.measure():
+            self._data = self.collect_data()
+        return self._data
+    
+    def prefetch_cached(self):
+        """
+        Like prefetch(), but read the data from the widget cache, where the
+        ``dashboard_worker`` command precomputes it, computing and storing
+        it only when missing or stale.
+        """
+        self.timing = WidgetTiming(self.widget_id)
+        with self.timing.measure():
+            self._data = widget_cache.get_or_set(
+                widget_cache_key(self, prefix='widget_prefetch'), self.collect_data, self.cache_timeout
+            )
+        return self._data
+    
+    # Async widget API. Each method defaults to running its sync counterpart
+    # in a thread; override them to use Django's async ORM instead.
+    
+    async def run_sync(self, func):
+        """Run a sync data method from async code."""
+        if self.timing is not None:
+            func = self.timing.wrap(func)
+        if self.use_worker_threads:
+            return await sync_to_async(partial(run_in_worker, func), thread_sensitive=False)()
+        return await sync_to_async(func)()
+    
+    async def aget_value(self):
+        """Async variant of get_value()."""
+        return await self.run_sync(self.get_value)
+    
+    async def aget_chart_data(self):
+        """Async variant of get_chart_data()."""
+        return await self.run_sync(self.get_chart_data)
+    
+    async def aget_context_data(self):
+        """Async variant of get_context_data()."""
+        return await self.run_sync(self.get_context_data)
+    
+    async def acollect_data(self):
+        """
+        Async variant of collect_data().
+        
+        Data methods call each other (``get_context_data()`` often reads
+        ``get_value()``), so they are awaited one after another: run
+        concurrently, several threads would miss the memoized result and
+        repeat the same query. Widgets are evaluated concurrently instead.
+        """
+        return {
+            'value': await self.aget_value(),
+            'chart_data': await self.aget_chart_data(),
+            'context': await self.aget_context_data(),
+        }
+    
+    async def aprefetch(self):
+        """Async variant of prefetch()."""
+        self.timing = WidgetTiming(self.widget_id)
+        # Queries are recorded by run_sync() in the threads running them
+        with self.timing.measure(record_queries=False):
+            self._data = await self.acollect_data()
+        return self._data
+    
+    async def aprefetch_cached(self):
+        """Async variant of prefetch_cached()."""
+        self.timing = WidgetTiming(self.widget_id)
+        with self.timing.measure(record_queries=False):
+            cache_key = await sync_to_async(widget_cache_key)(self, prefix='widget_prefetch')
+            self._data = await widget_cache.aget_or_set(cache_key, self.acollect_data, self.cache_timeout)
+        return self._data
+    
+    @property
+    def data(self):
+        """Widget data, evaluated on first access unless prefetched."""
+        if self._data is None:
+            self.prefetch()
+        return self._data
+    
     def get_api_data(self):
         """Return data for API endpoints."""
-        context = self.get_context_data()
+        data = self.data
         return {
             'title': self.title,
-            'value': self.get_value(),
-            'chart_data': self.get_chart_data(),
-            'context': context,
+            'value': data['value'],
+            'chart_data': data['chart_data'],
+            'context': data['context'],
         }
     
+    def iter_export_records(self, chunk_size=None):
+        """Yield the records of the widget in a streaming export."""
+        yield {'record': 'widget', 'widget_id': self.widget_id, **self.get_api_data()}
+    
     def render(self):
         """Render the widget HTML."""
+        data = self.data
         context = {
             'widget': self,
             'title': self.title,
             'description': self.description,
             'icon': self.icon,
             'color': self.color,
-            'value': self.get_value(),
-            'chart_data': json.dumps(self.get_chart_data()) if self.get_chart_data() else None,
-            **self.get_context_data()
+            'value': data['value'],
+            'chart_data': dumps(data['chart_data']) if data['chart_data'] else None,
+            **data['context']
         }
         return render_to_string(self.template_name, context, request=self.request)
     
+    def render_card(self):
+        """Render the widget's dashboard card."""
+        return render_to_string(self.card_template_name, {'widget': self}, request=self.request)
+    
     def has_permission(self, user):
         """Check if user has permission to view this widget."""
-        if not self.requires_permissions:
-            return user.is_staff
-        
-        for permission in self.requires_permissions:
-            if not user.has_perm(permission):
-                return False
-        return True
+        return check_widget_permissions(self.requires_permissions, user)
 
 
 class MetricWidget(BaseWidget):
@@ -168,6 +463,26 @@ class MetricWidget(BaseWidget):
         """Return the period for trend calculation."""
         return "vs last period"
     
+    def collect_data(self):
+        data = super().collect_data()
+        data.update({
+            'trend': self.get_trend(),
+            'trend_period': self.get_trend_period(),
+        })
+        return data
+    
+    async def aget_trend(self):
+        """Async variant of get_trend()."""
+        return await self.run_sync(self.get_trend)
+    
+    async def acollect_data(self):
+        data = await super().acollect_data()
+        data.update({
+            'trend': await self.aget_trend(),
+            'trend_period': self.get_trend_period(),
+        })
+        return data
+    
     def get_context_data(self):
         return {
             'trend': self.get_trend(),
@@ -199,9 +514,75 @@ class TableWidget(BaseWidget):
         """Return table headers."""
         return []
     
+    def get_queryset(self):
+        """Return the queryset rows are built from, if rows come from one."""
+        return None
+    
+    def format_row(self, obj):
+        """
+        Return the table row of an object of get_queryset(); defaults to a
+        single column holding ``str(obj)``.
+        """
+        return [str(obj)]
+    
     def get_rows(self):
         """Return table rows."""
-        return []
+        queryset = self.get_queryset()
+        if queryset is None:
+            return []
+        return [self.format_row(obj) for obj in queryset[:self.max_rows]]
+    
+    def iter_rows(self, chunk_size=None):
+        """
+        Yield up to ``max_rows`` rows one at a time.
+        
+        Rows built from get_queryset() are fetched ``chunk_size`` at a time
+        (``EXPORT_CHUNK_SIZE`` by default), so memory use does not grow with
+        ``max_rows``.
+        """
+        queryset = self.get_queryset()
+        if queryset is None:
+            yield from self.get_rows()[:self.max_rows]
+            return
+        if chunk_size is None:
+            chunk_size = get_dashboard_settings()['EXPORT_CHUNK_SIZE']
+        for obj in queryset[:self.max_rows].iterator(chunk_size=chunk_size):
+            yield self.format_row(obj)
+    
+    def collect_data(self):
+        data = super().collect_data()
+        data.update({
+            'headers': self.get_headers(),
+            'rows': self.get_rows()[:self.max_rows],
+        })
+        return data
+    
+    def iter_export_records(self, chunk_size=None):
+        # One record per row, instead of every row in the widget's context
+        yield {
+            'record': 'widget',
+            'widget_id': self.widget_id,
+            'title': self.title,
+            'headers': self.get_headers(),
+        }
+        for row in self.iter_rows(chunk_size):
+            yield {'record': 'row', 'widget_id': self.widget_id, 'row': row}
+    
+    async def aget_headers(self):
+        """Async variant of get_headers()."""
+        return await self.run_sync(self.get_headers)
+    
+    async def aget_rows(self):
+        """Async variant of get_rows()."""
+        return await self.run_sync(self.get_rows)
+    
+    async def acollect_data(self):
+        data = await super().acollect_data()
+        data.update({
+            'headers': await self.aget_headers(),
+            'rows': (await self.aget_rows())[:self.max_rows],
+        })
+        return data
     
     def get_context_data(self):
         return {
@@ -210,6 +591,167 @@ class TableWidget(BaseWidget):
         }
 
 
+class TimeSeriesChartWidget(ChartWidget):
+    """
+    Chart widget aggregating a queryset into time buckets.
+    
+    The whole series is computed with a single ``GROUP BY`` query on the
+    truncated date field; buckets without rows are filled with zeros.
+    """
+    
+    queryset = None  # Model or queryset to aggregate
+    date_field = None
+    bucket = 'day'  # hour, day, week or month
+    aggregate = None  # Defaults to Count('pk')
+    periods = 7  # Number of buckets, ending with the current one
+    label_format = None  # Defaults to the bucket's entry in label_formats
+    label_formats = {
+        'hour': '%H:00',
+        'day': '%m/%d',
+        'week': '%m/%d',
+        'month': '%b %Y',
+    }
+    dataset_label = ""
+    dataset_options = {
+        'borderColor': '#4F46E5',
+        'backgroundColor': 'rgba(79, 70, 229, 0.1)',
+        'tension': 0.4,
+        'fill': True
+    }
+    step_size = None  # y axis tick step, e.g. 1 for counts
+    
+    def get_queryset(self):
+        """Return a fresh copy of the queryset to aggregate."""
+        if hasattr(self.queryset, '_default_manager'):
+            return self.queryset._default_manager.all()
+        return self.queryset.all()
+    
+    def get_aggregate(self):
+        """Return the aggregate computed for each bucket."""
+        return self.aggregate if self.aggregate is not None else Count('pk')
+    
+    def get_buckets(self):
+        """Return the start of each bucket, oldest first."""
+        now = timezone.localtime()
+        
+        if self.bucket == 'hour':
+            current = now.replace(tzinfo=None, minute=0, second=0, microsecond=0)
+            return [current - timedelta(hours=i) for i in range(self.periods - 1, -1, -1)]
+        
+        today = now.date()
+        if self.bucket == 'day':
+            return [today - timedelta(days=i) for i in range(self.periods - 1, -1, -1)]
+        if self.bucket == 'week':
+            monday = today - timedelta(days=today.weekday())
+            return [monday - timedelta(weeks=i) for i in range(self.periods - 1, -1, -1)]
+        if self.bucket == 'month':
+            months = today.year * 12 + today.month - 1
+            return [
+                date(month // 12, month % 12 + 1, 1)
+                for month in range(months - self.periods + 1, months + 1)
+            ]
+        
+        raise ValueError(f"Unsupported time series bucket: {self.bucket!r}")
+    
+    def get_series(self):
+        """Return ``(labels, data)`` for every bucket, zero-filled."""
+        buckets = self.get_buckets()
+        queryset = self.get_queryset()
+        field = queryset.model._meta.get_field(self.date_field)
+        is_datetime = field.get_internal_type() == 'DateTimeField'
+        
+        start = buckets[0]
+        if is_datetime and not isinstance(start, datetime):
+            start = datetime.combine(start, time.min)
+        if is_datetime and settings.USE_TZ:
+            start = timezone.make_aware(start)
+        
+        output_field = DateTimeField() if self.bucket == 'hour' else DateField()
+        rows = (
+            queryset
+            .filter(**{f"{self.date_field}__gte": start})
+            .annotate(time_bucket=Trunc(self.date_field, self.bucket, output_field=output_field))
+            .order_by()
+            .values('time_bucket')
+            .annotate(time_bucket_value=self.get_aggregate())
+            .values_list('time_bucket', 'time_bucket_value')
+        )
+        
+        values = {}
+        for bucket, value in rows:
+            if isinstance(bucket, datetime) and timezone.is_aware(bucket):
+                bucket = timezone.localtime(bucket).replace(tzinfo=None)
+            if isinstance(value, Decimal):
+                value = float(value)
+            values[bucket] = value or 0
+        
+        label_format = self.label_format or self.label_formats[self.bucket]
+        labels = [bucket.strftime(label_format) for bucket in buckets]
+        data = [values.get(bucket, 0) for bucket in buckets]
+        return labels, data
+    
+    def get_dataset(self, data):
+        """Return the Chart.js dataset for the series."""
+        dataset = {
+            'label': self.dataset_label or self.title,
+            'data': data,
+        }
+        dataset.update(self.dataset_options)
+        return dataset
+    
+    def get_chart_options(self):
+        """Return the Chart.js options."""
+        y_axis = {
+            'beginAtZero': True
+        }
+        if self.step_size:
+            y_axis['ticks'] = {
+                'stepSize': self.step_size
+            }
+        
+        return {
+            'responsive': True,
+            'plugins': {
+                'legend': {
+                    'display': False
+                }
+            },
+            'scales': {
+                'y': y_axis
+            }
+        }
+    
+    def get_chart_data(self):
+        labels, data = self.get_series()
+        return {
+            'type': self.chart_type,
+            'data': {
+                'labels': labels,
+                'datasets': [self.get_dataset(data)]
+            },
+            'options': self.get_chart_options()
+        }
+
+
+class RollupChartWidget(TimeSeriesChartWidget):
+    """
+    Time series chart reading a daily rollup metric (see ``dashboard.rollups``).
+    
+    Reads pre-aggregated daily rows instead of querying the source table,
+    so it stays cheap on large tables. The rollups must be kept up to date
+    with the ``dashboard_rollup`` management command.
+    """
+    
+    rollup_key = None
+    date_field = 'date'
+    aggregate = Sum('value')
+    cache_scope = CACHE_SCOPE_GLOBAL
+    depends_on = [DailyMetric]
+    
+    def get_queryset(self):
+        return DailyMetric.objects.filter(key=self.rollup_key)
+
+
 # Built-in widgets
 
 @register_widget
@@ -217,6 +759,8 @@ class UserCountWidget(MetricWidget):
     """Widget showing total user count."""
     
     widget_id = "user_count"
+    cache_scope = CACHE_SCOPE_GLOBAL
+    depends_on = [User]
     title = "Total Users"
     description = "Total number of registered users"
     icon = "users"
@@ -228,7 +772,7 @@ class UserCountWidget(MetricWidget):
     def get_trend(self):
         # Calculate trend compared to last week
         week_ago = timezone.now() - timedelta(days=7)
-        current_count = User.objects.count()
+        current_count = self.get_value()
         previous_count = User.objects.filter(date_joined__lt=week_ago).count()
         
         if previous_count == 0:
@@ -252,6 +796,8 @@ class RecentLoginsWidget(TableWidget):
     """Widget showing recent user logins."""
     
     widget_id = "recent_logins"
+    cache_scope = CACHE_SCOPE_GLOBAL
+    depends_on = [User]
     title = "Recent Logins"
     description = "Latest user login activity"
     icon = "login"
@@ -261,81 +807,47 @@ class RecentLoginsWidget(TableWidget):
     def get_headers(self):
         return ['Username', 'Email', 'Last Login', 'Status']
     
-    def get_rows(self):
-        recent_users = User.objects.filter(
+    def get_queryset(self):
+        return User.objects.filter(
             last_login__isnull=False
-        ).order_by('-last_login')[:self.max_rows]
-        
-        rows = []
-        for user in recent_users:
-            status = "Active" if user.is_active else "Inactive"
-            last_login = user.last_login.strftime('%Y-%m-%d %H:%M') if user.last_login else 'Never'
-            rows.append([
-                user.username,
-                user.email,
-                last_login,
-                status
-            ])
-        
-        return rows
+        ).order_by('-last_login')
+    
+    def format_row(self, user):
+        status = "Active" if user.is_active else "Inactive"
+        last_login = user.last_login.strftime('%Y-%m-%d %H:%M') if user.last_login else 'Never'
+        return [
+            user.username,
+            user.email,
+            last_login,
+            status
+        ]
 
 
 @register_widget
-class LoginActivityChartWidget(ChartWidget):
+class LoginActivityChartWidget(TimeSeriesChartWidget):
     """Widget showing login activity over time."""
     
     widget_id = "login_activity_chart"
+    cache_scope = CACHE_SCOPE_GLOBAL
+    depends_on = [User]
     title = "Login Activity"
     description = "Daily login activity for the past week"
     icon = "chart-line"
     color = "purple"
     chart_type = "line"
     
-    def get_chart_data(self):
-        # Generate daily login data for the past 7 days
-        labels = []
-        data = []
-        
-        for i in range(6, -1, -1):
-            date = timezone.now().date() - timedelta(days=i)
-            labels.append(date.strftime('%m/%d'))
-            
-            # Count users who logged in on this date
-            daily_logins = User.objects.filter(
-                last_login__date=date
-            ).count()
-            data.append(daily_logins)
-        
-        return {
-            'type': 'line',
-            'data': {
-                'labels': labels,
-                'datasets': [{
-                    'label': 'Daily Logins',
-                    'data': data,
-                    'borderColor': '#8B5CF6',
-                    'backgroundColor': 'rgba(139, 92, 246, 0.1)',
-                    'tension': 0.4,
-                    'fill': True
-                }]
-            },
-            'options': {
-                'responsive': True,
-                'plugins': {
-                    'legend': {
-                        'display': False
-                    }
-                },
-                'scales': {
-                    'y': {
-                        'beginAtZero': True,
-                        'ticks': {
-                            'stepSize': 1
-                        }
-                    }
-                }
-            }
-        }
+    queryset = User
+    date_field = 'last_login'
+    bucket = 'day'
+    periods = 7
+    dataset_label = 'Daily Logins'
+    dataset_options = {
+        'borderColor': '#8B5CF6',
+        'backgroundColor': 'rgba(139, 92, 246, 0.1)',
+        'tension': 0.4,
+        'fill': True
+    }
+    step_size = 1
 
 
 @register_widget
@@ -343,6 +855,7 @@ class SystemStatusWidget(MetricWidget):
     """Widget showing system status."""
     
     widget_id = "system_status"
+    cache_scope = CACHE_SCOPE_GLOBAL
     title = "System Status"
     description = "Overall system health"
     icon = "server"
@@ -362,82 +875,38 @@ class SystemStatusWidget(MetricWidget):
 
 
 @register_widget
-class UserRegistrationChartWidget(ChartWidget):
+class UserRegistrationChartWidget(TimeSeriesChartWidget):
     """Widget showing user registration trends."""
     
     widget_id = "user_registration_chart"
+    cache_scope = CACHE_SCOPE_GLOBAL
+    depends_on = [User]
     title = "User Registrations"
     description = "Monthly user registration trends"
     icon = "user-plus"
     color = "indigo"
     chart_type = "bar"
     
-    def get_chart_data(self):
-        # Get registration data for the past 6 months
-        labels = []
-        data = []
-        
-        for i in range(5, -1, -1):
-            date = timezone.now().replace(day=1) - timedelta(days=32*i)
-            month_start = date.replace(day=1)
-            month_end = (month_start + timedelta(days=32)).replace(day=1) - timedelta(days=1)
-            
-            labels.append(month_start.strftime('%b %Y'))
-            
-            monthly_registrations = User.objects.filter(
-                date_joined__gte=month_start,
-                date_joined__lte=month_end
-            ).count()
-            data.append(monthly_registrations)
-        
-        return {
-            'type': 'bar',
-            'data': {
-                'labels': labels,
-                'datasets': [{
-                    'label': 'New Users',
-                    'data': data,
-                    'backgroundColor': '#6366F1',
-                    'borderColor': '#4F46E5',
-                    'borderWidth': 1
-                }]
-            },
-            'options': {
-                'responsive': True,
-                'plugins': {
-                    'legend': {
-                        'display': False
-                    }
-                },
-                'scales': {
-                    'y': {
-                        'beginAtZero': True,
-                        'ticks': {
-                            'stepSize': 1
-                        }
-                    }
-                }
-            }
-        }
+    queryset = User
+    date_field = 'date_joined'
+    bucket = 'month'
+    periods = 6
+    dataset_label = 'New Users'
+    dataset_options = {
+        'backgroundColor': '#6366F1',
+        'borderColor': '#4F46E5',
+        'borderWidth': 1
+    }
+    step_size = 1
     
     def get_context_data(self):
         context = super().get_context_data()
         
-        # Add summary stats
-        this_month = User.objects.filter(
-            date_joined__gte=timezone.now().replace(day=1)
-        ).count()
-        
-        last_month_start = (timezone.now().replace(day=1) - timedelta(days=1)).replace(day=1)
-        last_month_end = timezone.now().replace(day=1) - timedelta(days=1)
-        last_month = User.objects.filter(
-            date_joined__gte=last_month_start,
-            date_joined__lte=last_month_end
-        ).count()
-        
+        # Summary stats come from the last two buckets of the series
+        labels, data = self.get_series()
         context.update({
-            'this_month': this_month,
-            'last_month': last_month,
+            'this_month': data[-1],
+            'last_month': data[-2],
         })
         
         return context
@@ -448,6 +917,7 @@ class QuickActionsWidget(BaseWidget):
     """Quick actions widget for common admin tasks."""
     
     widget_id = "quick_actions"
+    cache_scope = CACHE_SCOPE_GLOBAL
     title = "Quick Actions"
     description = "Common administrative actions"
     icon = "lightning-bolt"
@@ -2,7 +2,12 @@
 Configuration management for the custom admin dashboard.
 """
 
+from collections.abc import Mapping
+from types import MappingProxyType
+
 from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
 
 
 # Default configuration
@@ -36,6 +41,24 @@ DEFAULT_CONFIG = {
     'ENABLE_API': True,
     'API_PERMISSIONS': ['rest_framework.permissions.IsAdminUser'],
     'CACHE_TIMEOUT': 300,  # 5 minutes
+    'CACHE_STALE_TIMEOUT': 300,  # Seconds stale widget data may be served while it is recomputed
+    'CACHE_LOCK_TIMEOUT': 30,  # Lease of the lock held while recomputing widget data
+    'CACHE_JITTER': 0.1,  # Random +/- fraction applied to widget cache timeouts
+    'CACHE_CODEC': 'pickle',  # Serializer of cached widget data: 'pickle', 'json', 'msgpack' or a dotted path
+    'CACHE_COMPRESS_MIN_SIZE': 4096,  # Bytes above which cached widget data is zlib compressed (None to disable)
+    'CACHE_COMPRESS_LEVEL': 1,  # zlib compression level, from 1 (fastest) to 9 (smallest)
+    'LOCAL_CACHE_MAX_ENTRIES': 0,  # Widget cache entries kept in process memory (0 to disable)
+    'LOCAL_CACHE_MAX_BYTES': 16 * 1024 * 1024,  # Memory used by the in-process widget cache
+    'LOCAL_CACHE_TIMEOUT': 30,  # Seconds an entry is kept in process memory
+    'WIDGET_MAX_WORKERS': 4,  # Threads used to evaluate widgets concurrently
+    'WIDGET_TIME_BUDGET': 500,  # Milliseconds; slower widgets are logged (None to disable)
+    'WIDGET_QUERY_BUDGET': 20,  # Queries; widgets running more are logged (None to disable)
+    'SERVER_TIMING': True,  # Report per-widget timings in Server-Timing response headers
+    'STREAMING_RENDER': False,  # Stream the dashboard page, sending each widget as it completes
+    'EXPORT_CHUNK_SIZE': 2000,  # Rows fetched from the database at a time by streaming exports
+    'PUSH_UPDATES': False,  # Push changed widgets over Server-Sent Events instead of polling
+    'PUSH_INTERVAL': 2,  # Seconds between checks for changed widgets on each event stream
+    'PUSH_MAX_AGE': 300,  # Seconds an event stream stays open before the browser reconnects
     'AUTO_REFRESH': True,
     'REFRESH_INTERVAL': 30000,  # 30 seconds in milliseconds
     'SIDEBAR_ENABLED': True,
@@ -67,13 +90,10 @@ DEFAULT_CONFIG = {
 }
 
 
-def get_dashboard_settings():
+def merge_config(user_config):
     """
-    Get dashboard configuration merged with user settings.
+    Merge user settings into the default configuration.
     """
-    user_config = getattr(settings, 'CUSTOM_ADMIN_DASHBOARD_CONFIG', {})
-    
-    # Deep merge configurations
     config = DEFAULT_CONFIG.copy()
     
     for key, value in user_config.items():
@@ -87,58 +107,164 @@ def get_dashboard_settings():
     return config
 
 
+def freeze(value):
+    """
+    Return a read-only copy of a configuration value.
+    """
+    if isinstance(value, Mapping):
+        return MappingProxyType({key: freeze(item) for key, item in value.items()})
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(item) for item in value)
+    return value
+
+
+def as_dict(value):
+    """
+    Return a plain (JSON serializable) copy of a frozen configuration value.
+    """
+    if isinstance(value, Mapping):
+        return {key: as_dict(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [as_dict(item) for item in value]
+    return value
+
+
+THEMES = {
+    'dark': {
+        'bg_primary': 'bg-gray-900',
+        'bg_secondary': 'bg-gray-800',
+        'bg_card': 'bg-gray-800',
+        'text_primary': 'text-white',
+        'text_secondary': 'text-gray-300',
+        'text_muted': 'text-gray-400',
+        'border': 'border-gray-700',
+        'hover': 'hover:bg-gray-700',
+        'ring': 'ring-gray-700',
+    },
+    'light': {
+        'bg_primary': 'bg-white',
+        'bg_secondary': 'bg-gray-50',
+        'bg_card': 'bg-white',
+        'text_primary': 'text-gray-900',
+        'text_secondary': 'text-gray-700',
+        'text_muted': 'text-gray-500',
+        'border': 'border-gray-200',
+        'hover': 'hover:bg-gray-50',
+        'ring': 'ring-gray-200',
+    },
+}
+
+
+class DashboardSettings:
+    """
+    Resolved dashboard configuration and the views derived from it.
+    
+    Every attribute is read-only, so one instance is shared by the whole
+    process (see get_resolved_settings()).
+    """
+    
+    def __init__(self, user_config):
+        config = merge_config(user_config)
+        self.config = freeze(config)
+        self.chart_colors = freeze(config.get('CHART_COLORS', DEFAULT_CONFIG['CHART_COLORS']))
+        self.themes = freeze(THEMES)
+        self.widget = freeze({
+            'refresh_interval': config.get('REFRESH_INTERVAL', 30000),
+            'cache_timeout': config.get('CACHE_TIMEOUT', 300),
+            'cache_stale_timeout': config.get('CACHE_STALE_TIMEOUT', DEFAULT_CONFIG['CACHE_STALE_TIMEOUT']),
+            'cache_lock_timeout': config.get('CACHE_LOCK_TIMEOUT', DEFAULT_CONFIG['CACHE_LOCK_TIMEOUT']),
+            'cache_jitter': config.get('CACHE_JITTER', DEFAULT_CONFIG['CACHE_JITTER']),
+            'cache_codec': config.get('CACHE_CODEC', DEFAULT_CONFIG['CACHE_CODEC']),
+            'cache_compress_min_size': config.get('CACHE_COMPRESS_MIN_SIZE', DEFAULT_CONFIG['CACHE_COMPRESS_MIN_SIZE']),
+            'cache_compress_level': config.get('CACHE_COMPRESS_LEVEL', DEFAULT_CONFIG['CACHE_COMPRESS_LEVEL']),
+            'local_cache_max_entries': config.get('LOCAL_CACHE_MAX_ENTRIES', DEFAULT_CONFIG['LOCAL_CACHE_MAX_ENTRIES']),
+            'local_cache_max_bytes': config.get('LOCAL_CACHE_MAX_BYTES', DEFAULT_CONFIG['LOCAL_CACHE_MAX_BYTES']),
+            'local_cache_timeout': config.get('LOCAL_CACHE_TIMEOUT', DEFAULT_CONFIG['LOCAL_CACHE_TIMEOUT']),
+            'auto_refresh': config.get('AUTO_REFRESH', True),
+            'grid': config.get('WIDGET_GRID', DEFAULT_CONFIG['WIDGET_GRID']),
+            'max_workers': config.get('WIDGET_MAX_WORKERS', DEFAULT_CONFIG['WIDGET_MAX_WORKERS']),
+            'time_budget': config.get('WIDGET_TIME_BUDGET', DEFAULT_CONFIG['WIDGET_TIME_BUDGET']),
+            'query_budget': config.get('WIDGET_QUERY_BUDGET', DEFAULT_CONFIG['WIDGET_QUERY_BUDGET']),
+            'server_timing': config.get('SERVER_TIMING', DEFAULT_CONFIG['SERVER_TIMING']),
+            'push_updates': config.get('PUSH_UPDATES', DEFAULT_CONFIG['PUSH_UPDATES']),
+            'push_interval': config.get('PUSH_INTERVAL', DEFAULT_CONFIG['PUSH_INTERVAL']),
+            'push_max_age': config.get('PUSH_MAX_AGE', DEFAULT_CONFIG['PUSH_MAX_AGE']),
+        })
+        self.api = freeze({
+            'enabled': config.get('ENABLE_API', True),
+            'permissions': config.get('API_PERMISSIONS', ['rest_framework.permissions.IsAdminUser']),
+            'cache_timeout': config.get('CACHE_TIMEOUT', 300),
+        })
+    
+    def get_theme(self, theme=None):
+        """Get the CSS classes of a theme (the configured one by default)."""
+        current_theme = theme or self.config.get('THEME', 'light')
+        return self.themes['dark' if current_theme == 'dark' else 'light']
+
+
+_resolved_settings = None
+
+
+def get_resolved_settings():
+    """
+    Get the resolved dashboard configuration.
+    
+    It is computed on first use and reused until ``CUSTOM_ADMIN_DASHBOARD_CONFIG``
+    changes (e.g. through ``override_settings``).
+    """
+    global _resolved_settings
+    resolved = _resolved_settings
+    if resolved is None:
+        user_config = getattr(settings, 'CUSTOM_ADMIN_DASHBOARD_CONFIG', {})
+        resolved = _resolved_settings = DashboardSettings(user_config)
+    return resolved
+
+
+def clear_settings_cache():
+    """
+    Discard the resolved configuration so it is computed again.
+    """
+    global _resolved_settings
+    _resolved_settings = None
+
+
+@receiver(setting_changed)
+def settings_changed(setting, **kwargs):
+    """
+    Invalidate the resolved configuration when the dashboard settings change.
+    """
+    if setting == 'CUSTOM_ADMIN_DASHBOARD_CONFIG':
+        clear_settings_cache()
+
+
+def get_dashboard_settings():
+    """
+    Get dashboard configuration merged with user settings.
+    
+    The returned mapping is read-only; use as_dict() for a mutable copy.
+    """
+    return get_resolved_settings().config
+
+
 def get_theme_config(theme=None):
     """
     Get theme-specific configuration.
     """
-    config = get_dashboard_settings()
-    current_theme = theme or config.get('THEME', 'light')
-    
-    if current_theme == 'dark':
-        return {
-            'bg_primary': 'bg-gray-900',
-            'bg_secondary': 'bg-gray-800',
-            'bg_card': 'bg-gray-800',
-            'text_primary': 'text-white',
-            'text_secondary': 'text-gray-300',
-            'text_muted': 'text-gray-400',
-            'border': 'border-gray-700',
-            'hover': 'hover:bg-gray-700',
-            'ring': 'ring-gray-700',
-        }
-    else:
-        return {
-            'bg_primary': 'bg-white',
-            'bg_secondary': 'bg-gray-50',
-            'bg_card': 'bg-white',
-            'text_primary': 'text-gray-900',
-            'text_secondary': 'text-gray-700',
-            'text_muted': 'text-gray-500',
-            'border': 'border-gray-200',
-            'hover': 'hover:bg-gray-50',
-            'ring': 'ring-gray-200',
-        }
+    return get_resolved_settings().get_theme(theme)
 
 
 def get_chart_colors():
     """
     Get chart color palette.
     """
-    config = get_dashboard_settings()
-    return config.get('CHART_COLORS', DEFAULT_CONFIG['CHART_COLORS'])
+    return get_resolved_settings().chart_colors
 
 
 def get_widget_config():
     """
     Get widget-specific configuration.
     """
-    config = get_dashboard_settings()
-    return {
-        'refresh_interval': config.get('REFRESH_INTERVAL', 30000),
-        'cache_timeout': config.get('CACHE_TIMEOUT', 300),
-        'auto_refresh': config.get('AUTO_REFRESH', True),
-        'grid': config.get('WIDGET_GRID', DEFAULT_CONFIG['WIDGET_GRID']),
-    }
+    return get_resolved_settings().widget
 
 
 def is_feature_enabled(feature):
@@ -154,9 +280,4 @@ def get_api_config():
     """
     Get API-specific configuration.
     """
-    config = get_dashboard_settings()
-    return {
-        'enabled': config.get('ENABLE_API', True),
-        'permissions': config.get('API_PERMISSIONS', ['rest_framework.permissions.IsAdminUser']),
-        'cache_timeout': config.get('CACHE_TIMEOUT', 300),
-    }
+    return get_resolved_settings().api
@@ -28,6 +28,9 @@ setup(
             'flake8>=4.0.0',
             'isort>=5.0.0',
         ],
+        'fast': [
+            'orjson>=3.6.0',
+        ],
     },
     description='A modern, responsive Django admin dashboard with widgets, charts, and REST API',
     long_description=long_description,
@@ -5,11 +5,13 @@ Custom widgets for the test app.
 from django.utils import timezone
 from django.db import models
 from datetime import timedelta
+from dashboard.cache import CACHE_SCOPE_GLOBAL
 from dashboard.widgets import (
     register_widget, 
     MetricWidget, 
     ChartWidget, 
-    TableWidget
+    TableWidget,
+    TimeSeriesChartWidget,
 )
 from .models import Order, Product
 
@@ -19,6 +21,8 @@ class OrderCountWidget(MetricWidget):
     """Widget showing total order count."""
     
     widget_id = "order_count"
+    cache_scope = CACHE_SCOPE_GLOBAL
+    depends_on = [Order]
     title = "Total Orders"
     description = "Total number of orders in the system"
     icon = "cart"
@@ -54,6 +58,8 @@ class RecentOrdersWidget(TableWidget):
     """Widget showing recent orders."""
     
     widget_id = "recent_orders"
+    cache_scope = CACHE_SCOPE_GLOBAL
+    depends_on = [Order, 'auth.User']
     title = "Recent Orders"
     description = "Latest order activity"
     icon = "list"
@@ -82,72 +88,55 @@ class RecentOrdersWidget(TableWidget):
 
 
 @register_widget
-class SalesChartWidget(ChartWidget):
+class SalesChartWidget(TimeSeriesChartWidget):
     """Widget showing sales trends."""
     
     widget_id = "sales_chart"
+    cache_scope = CACHE_SCOPE_GLOBAL
+    depends_on = [Order]
     title = "Sales Trends"
     description = "Daily sales for the past week"
     icon = "chart-line"
     color = "purple"
     chart_type = "line"
     
-    def get_chart_data(self):
-        # Generate daily sales data for the past 7 days
-        labels = []
-        data = []
-        
-        for i in range(6, -1, -1):
-            date = timezone.now().date() - timedelta(days=i)
-            labels.append(date.strftime('%m/%d'))
-            
-            # Calculate total sales for this date
-            daily_sales = Order.objects.filter(
-                created_at__date=date,
-                status__in=['shipped', 'delivered']
-            ).aggregate(
-                total=models.Sum('amount')
-            )['total'] or 0
-            
-            data.append(float(daily_sales))
-        
+    queryset = Order.objects.filter(status__in=['shipped', 'delivered'])
+    date_field = 'created_at'
+    bucket = 'day'
+    periods = 7
+    aggregate = models.Sum('amount')
+    dataset_label = 'Daily Sales ($)'
+    dataset_options = {
+        'borderColor': '#8B5CF6',
+        'backgroundColor': 'rgba(139, 92, 246, 0.1)',
+        'tension': 0.4,
+        'fill': True
+    }
+    
+    def get_chart_options(self):
         return {
-            'type': 'line',
-            'data': {
-                'labels': labels,
-                'datasets': [{
-                    'label': 'Daily Sales ($)',
-                    'data': data,
-                    'borderColor': '#8B5CF6',
-                    'backgroundColor': 'rgba(139, 92, 246, 0.1)',
-                    'tension': 0.4,
-                    'fill': True
-                }]
-            },
-            'options': {
-                'responsive': True,
-                'plugins': {
-                    'legend': {
-                        'display': True,
-                        'position': 'top'
-                    },
-                    'title': {
-                        'display': True,
-                        'text': 'Daily Sales Trend'
-                    }
+            'responsive': True,
+            'plugins': {
+                'legend': {
+                    'display': True,
+                    'position': 'top'
                 },
-                'scales': {
-                    'y': {
-                        'beginAtZero': True,
-                        'ticks': {
-                            'callback': 'function(value, index, values) { return "$" + value; }'
-                        }
+                'title': {
+                    'display': True,
+                    'text': 'Daily Sales Trend'
+                }
+            },
+            'scales': {
+                'y': {
+                    'beginAtZero': True,
+                    'ticks': {
+                        'callback': 'function(value, index, values) { return "$" + value; }'
                     }
-                },
-                'interaction': {
-                    'intersect': False,
-                    'mode': 'index'
                 }
+            },
+            'interaction': {
+                'intersect': False,
+                'mode': 'index'
             }
         }
 
@@ -157,6 +146,8 @@ class ProductStockWidget(MetricWidget):
     """Widget showing low stock products."""
     
     widget_id = "product_stock"
+    cache_scope = CACHE_SCOPE_GLOBAL
+    depends_on = [Product]
     title = "Low Stock Alert"
     description = "Products with low inventory"
     icon = "warning"
@@ -185,6 +176,8 @@ class OrderStatusChartWidget(ChartWidget):
     """Widget showing order status distribution."""
     
     widget_id = "order_status_chart"
+    cache_scope = CACHE_SCOPE_GLOBAL
+    depends_on = [Order]
     title = "Order Status Distribution"
     description = "Current orders by status"
     icon = "chart-pie"
@@ -250,6 +243,8 @@ class RevenueWidget(MetricWidget):
     """Widget showing total revenue."""
     
     widget_id = "revenue"
+    cache_scope = CACHE_SCOPE_GLOBAL
+    depends_on = [Order]
     title = "Total Revenue"
     description = "Revenue from completed orders"
     icon = "currency"
@@ -114,6 +114,162 @@ class TestDashboardAPI(TestCase):
         data = json.loads(response.content)
         self.assertIn('error', data)
     
+    def test_chart_data_api_error(self):
+        """Test chart data API reports widget errors."""
+        from unittest import mock
+        from django.core.cache import cache
+        from dashboard.widgets import LoginActivityChartWidget
+        
+        self.client.login(username='staffuser', password='testpass123')
+        
+        for name in ['chart_data', 'chart_data_async']:
+            cache.clear()
+            with mock.patch.object(
+                LoginActivityChartWidget, 'get_chart_data', side_effect=RuntimeError('Chart failed')
+            ):
+                response = self.client.get(
+                    reverse(f'dashboard:api:{name}', kwargs={'widget_id': 'login_activity_chart'})
+                )
+            self.assertEqual(response.status_code, 500)
+            self.assertEqual(json.loads(response.content)['error'], 'Chart failed')
+    
+    def test_conditional_requests(self):
+        """Test unchanged widget and chart data is answered with 304 Not Modified."""
+        self.client.login(username='staffuser', password='testpass123')
+        
+        for url in [
+            reverse('dashboard:api:widget_detail', kwargs={'widget_id': 'user_count'}),
+            reverse('dashboard:api:chart_data', kwargs={'widget_id': 'login_activity_chart'}),
+        ]:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertIn('ETag', response)
+            self.assertIn('Last-Modified', response)
+            
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+            self.assertEqual(response.status_code, 304)
+            self.assertEqual(response.content, b'')
+            
+            response = self.client.get(url, HTTP_IF_NONE_MATCH='"outdated"')
+            self.assertEqual(response.status_code, 200)
+    
+    def test_widget_batch_api(self):
+        """Test batch API returns several widgets in one response."""
+        self.client.login(username='staffuser', password='testpass123')
+        
+        response = self.client.get(
+            reverse('dashboard:api:widget_batch'),
+            {'ids': 'user_count,login_activity_chart,invalid,user_count'}
+        )
+        self.assertEqual(response.status_code, 200)
+        
+        data = json.loads(response.content)
+        self.assertEqual(list(data['widgets']), ['user_count', 'login_activity_chart'])
+        self.assertEqual(data['count'], 2)
+        self.assertEqual(data['widgets']['user_count']['value'], User.objects.count())
+        self.assertIn('chart_data', data['widgets']['login_activity_chart'])
+        self.assertEqual(data['errors']['invalid']['status'], 404)
+    
+    def test_widget_batch_api_all_widgets(self):
+        """Test batch API returns every enabled widget without ids."""
+        self.client.login(username='staffuser', password='testpass123')
+        
+        response = self.client.get(reverse('dashboard:api:widget_batch'))
+        self.assertEqual(response.status_code, 200)
+        
+        data = json.loads(response.content)
+        self.assertIn('user_count', data['widgets'])
+        self.assertEqual(data['errors'], {})
+    
+    def test_widget_batch_api_cards(self):
+        """Test batch API can return the rendered dashboard cards of several widgets."""
+        self.client.login(username='staffuser', password='testpass123')
+        
+        response = self.client.get(
+            reverse('dashboard:api:widget_batch'),
+            {'ids': 'user_count,login_activity_chart', 'fragment': 'card'}
+        )
+        self.assertEqual(response.status_code, 200)
+        
+        data = json.loads(response.content)
+        self.assertEqual(list(data['widgets']), ['user_count', 'login_activity_chart'])
+        card = data['widgets']['user_count']
+        self.assertIn('data-widget-id="user_count"', card['html'])
+        self.assertTrue(card['etag'])
+        
+        response = self.client.get(reverse('dashboard:api:widget_batch'), {'fragment': 'widget'})
+        self.assertEqual(response.status_code, 400)
+    
+    def test_widget_batch_api_permission_denied(self):
+        """Test batch API rejects non-staff users."""
+        self.client.login(username='regularuser', password='testpass123')
+        
+        response = self.client.get(reverse('dashboard:api:widget_batch'), {'ids': 'user_count'})
+        self.assertEqual(response.status_code, 403)
+    
+    def test_widget_detail_api_server_timing(self):
+        """Test widget detail API reports widget timings."""
+        from django.core.cache import cache
+        
+        cache.clear()
+        self.client.login(username='staffuser', password='testpass123')
+        
+        response = self.client.get(
+            reverse('dashboard:api:widget_detail', kwargs={'widget_id': 'user_count'})
+        )
+        self.assertTrue(response['Server-Timing'].startswith('user_count;dur='))
+    
+    def test_async_widget_detail_api(self):
+        """Test async widget detail API returns the same data as the sync one."""
+        self.client.login(username='staffuser', password='testpass123')
+        
+        response = self.client.get(
+            reverse('dashboard:api:widget_detail_async', kwargs={'widget_id': 'user_count'})
+        )
+        self.assertEqual(response.status_code, 200)
+        
+        data = json.loads(response.content)
+        self.assertEqual(data['widget_id'], 'user_count')
+        self.assertEqual(data['value'], User.objects.count())
+    
+    def test_async_widget_detail_api_permissions_scope(self):
+        """Test the async endpoint builds permission-scoped cache keys off the event loop."""
+        from unittest import mock
+        from dashboard.widgets import UserCountWidget
+        
+        self.client.login(username='staffuser', password='testpass123')
+        
+        with mock.patch.object(UserCountWidget, 'cache_scope', 'permissions'):
+            response = self.client.get(
+                reverse('dashboard:api:widget_detail_async', kwargs={'widget_id': 'user_count'})
+            )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(json.loads(response.content)['value'], User.objects.count())
+    
+    def test_async_widget_detail_api_permission_denied(self):
+        """Test async widget detail API rejects non-staff users."""
+        self.client.login(username='regularuser', password='testpass123')
+        
+        response = self.client.get(
+            reverse('dashboard:api:widget_detail_async', kwargs={'widget_id': 'user_count'})
+        )
+        self.assertEqual(response.status_code, 403)
+    
+    def test_async_chart_data_api(self):
+        """Test async chart data API."""
+        self.client.login(username='staffuser', password='testpass123')
+        
+        response = self.client.get(
+            reverse('dashboard:api:chart_data_async', kwargs={'widget_id': 'login_activity_chart'})
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('chart_data', json.loads(response.content))
+        
+        response = self.client.get(
+            reverse('dashboard:api:chart_data_async', kwargs={'widget_id': 'user_count'})
+        )
+        self.assertEqual(response.status_code, 404)
+    
     def test_dashboard_stats_api(self):
         """Test dashboard statistics API."""
         self.client.login(username='staffuser', password='testpass123')
@@ -322,3 +478,32 @@ class TestAPIErrorHandling(TestCase):
             
             response = self.client.get(reverse('dashboard:api:widget_list'))
             self.assertEqual(response.status_code, 403)
+    
+    def test_permission_classes_compiled_once(self):
+        """Test API permission classes are imported once, not per request."""
+        from unittest import mock
+        from dashboard.api import views
+        
+        self.client.login(username='staffuser', password='testpass123')
+        views.compile_api_permissions.cache_clear()
+        
+        with mock.patch.object(views, 'import_string', wraps=views.import_string) as import_string:
+            for _ in range(3):
+                response = self.client.get(reverse('dashboard:api:widget_list'))
+                self.assertEqual(response.status_code, 200)
+        
+        self.assertEqual(import_string.call_count, 1)
+    
+    def test_invalid_permission_path_check(self):
+        """Test invalid API_PERMISSIONS entries fail the system check."""
+        from django.test import override_settings
+        from dashboard.checks import check_api_permissions
+        
+        self.assertEqual(check_api_permissions(None), [])
+        
+        with override_settings(CUSTOM_ADMIN_DASHBOARD_CONFIG={
+            'API_PERMISSIONS': ['missing.module.Permission', 'json.dumps'],
+        }):
+            errors = check_api_permissions(None)
+        
+        self.assertEqual([error.id for error in errors], ['dashboard.E001', 'dashboard.E002'])
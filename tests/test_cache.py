@@ -0,0 +1,467 @@
+"""
+Tests for the dashboard widget cache.
+"""
+
+import datetime
+import json
+import time
+from decimal import Decimal
+
+import pytest
+from django.core.cache import cache
+from django.test import TestCase
+
+from dashboard import cache as cache_module
+from dashboard.cache import WidgetCache
+
+
+class Counter:
+    """Callable counting how many times it computed a value."""
+    
+    def __init__(self, value='fresh'):
+        self.value = value
+        self.calls = 0
+    
+    def __call__(self):
+        self.calls += 1
+        return self.value
+
+
+class TestWidgetCache:
+    """Test stale-while-revalidate widget caching."""
+    
+    def setup_method(self):
+        """Set up a clean cache."""
+        cache.clear()
+        self.widget_cache = WidgetCache()
+    
+    def test_get_or_set_computes_once(self):
+        """Test fresh entries are served without recomputing."""
+        compute = Counter()
+        
+        assert self.widget_cache.get_or_set('key', compute, 60) == 'fresh'
+        assert self.widget_cache.get_or_set('key', compute, 60) == 'fresh'
+        assert compute.calls == 1
+    
+    def test_stale_entry_recomputed_by_lock_holder(self):
+        """Test a stale entry is recomputed when the lock is free."""
+        self.widget_cache.set('key', 'stale', 60)
+        entry = cache.get('key')
+        entry['fresh_until'] = time.time() - 1
+        cache.set('key', entry)
+        
+        compute = Counter()
+        assert self.widget_cache.get_or_set('key', compute, 60) == 'fresh'
+        assert compute.calls == 1
+        assert cache.get('key:lock') is None
+    
+    def test_stale_entry_served_while_locked(self):
+        """Test a stale entry is served while another process recomputes it."""
+        self.widget_cache.set('key', 'stale', 60)
+        entry = cache.get('key')
+        entry['fresh_until'] = time.time() - 1
+        cache.set('key', entry)
+        
+        assert self.widget_cache.acquire_lock('key')
+        
+        compute = Counter()
+        assert self.widget_cache.get_or_set('key', compute, 60) == 'stale'
+        assert compute.calls == 0
+    
+    def test_missing_entry_waits_for_lock_holder(self):
+        """Test a missing entry is computed anyway once the wait times out."""
+        self.widget_cache.lock_wait = 0.1
+        assert self.widget_cache.acquire_lock('key')
+        
+        compute = Counter()
+        assert self.widget_cache.get_or_set('key', compute, 60) == 'fresh'
+        assert compute.calls == 1
+    
+    def test_timeout_jitter(self):
+        """Test soft timeouts are jittered around the requested timeout."""
+        expiries = {
+            round(self.widget_cache.make_entry('value', 100)['fresh_until'] - time.time())
+            for _ in range(20)
+        }
+        
+        assert all(85 <= expiry <= 115 for expiry in expiries)
+        assert len(expiries) > 1
+    
+    def test_entries_have_etags(self):
+        """Test entries carry an ETag that only depends on their value."""
+        entry = self.widget_cache.get_or_set_entry('key', Counter(), 60)
+        
+        assert entry['value'] == 'fresh'
+        assert entry['etag'] == self.widget_cache.make_entry('fresh', 60)['etag']
+        assert entry['etag'] != self.widget_cache.make_entry('other', 60)['etag']
+    
+    def test_raw_values_are_ignored(self):
+        """Test values not written by the widget cache are treated as missing."""
+        cache.set('key', {'cached': True})
+        
+        assert self.widget_cache.get_entry('key') is None
+        assert self.widget_cache.get_or_set('key', Counter(), 60) == 'fresh'
+
+
+class TestLocalCache:
+    """Test the in-process LRU cache in front of the shared cache."""
+    
+    @pytest.fixture(autouse=True)
+    def setup_local_cache(self, settings):
+        """Set up a clean cache with a small local cache enabled."""
+        settings.CUSTOM_ADMIN_DASHBOARD_CONFIG = {
+            'LOCAL_CACHE_MAX_ENTRIES': 2,
+            'LOCAL_CACHE_MAX_BYTES': 1024,
+        }
+        cache.clear()
+        cache_module._local_versions.clear()
+        self.widget_cache = WidgetCache()
+    
+    def test_served_without_shared_read(self):
+        """Test fresh entries are served from process memory."""
+        self.widget_cache.set('key', 'value', 60)
+        cache.delete('key')
+        
+        assert self.widget_cache.get_entry('key')['value'] == 'value'
+    
+    def test_readers_get_copies(self):
+        """Test local values cannot be mutated by their readers."""
+        self.widget_cache.set('key', {'items': [1]}, 60)
+        self.widget_cache.get_entry('key')['value']['items'].append(2)
+        
+        assert self.widget_cache.get_entry('key')['value'] == {'items': [1]}
+    
+    def test_evicts_least_recently_used(self):
+        """Test the oldest entries are evicted beyond the entry limit."""
+        for key in ('a', 'b', 'c'):
+            self.widget_cache.set(key, key, 60)
+        
+        assert list(self.widget_cache.local.entries) == ['b', 'c']
+        
+        self.widget_cache.local.get('b')
+        self.widget_cache.set('d', 'd', 60)
+        assert list(self.widget_cache.local.entries) == ['b', 'd']
+    
+    def test_evicts_beyond_byte_limit(self):
+        """Test entries are evicted to stay under the memory limit."""
+        self.widget_cache.set('a', 'x' * 600, 60)
+        self.widget_cache.set('b', 'x' * 600, 60)
+        self.widget_cache.set('huge', 'x' * 2000, 60)
+        
+        assert list(self.widget_cache.local.entries) == ['b']
+        assert self.widget_cache.local.size <= 1024
+        assert self.widget_cache.get_entry('huge')['value'] == 'x' * 2000
+    
+    def test_stale_entries_read_from_shared_cache(self):
+        """Test entries no longer fresh locally are read again from the shared cache."""
+        entry = self.widget_cache.set('key', 'old', 60)
+        self.widget_cache.local.set('key', {**entry, 'fresh_until': time.time() - 1})
+        cache.set('key', self.widget_cache.make_entry('new', 60))
+        
+        assert self.widget_cache.get_entry('key')['value'] == 'new'
+    
+    def test_delete(self):
+        """Test deleting drops the local copy of that key only."""
+        self.widget_cache.set('a', 'a', 60)
+        self.widget_cache.set('b', 'b', 60)
+        
+        self.widget_cache.delete('a')
+        
+        assert self.widget_cache.get_entry('a') is None
+        assert list(self.widget_cache.local.entries) == ['b']
+    
+    def test_delete_in_other_process(self, monkeypatch):
+        """Test deleting an entry drops the local copies of other processes."""
+        other_process = WidgetCache()
+        self.widget_cache.set('key', 'old', 60)
+        other_process.delete('key')
+        cache.set('key', self.widget_cache.pack_entry(self.widget_cache.make_entry('new', 60)))
+        
+        # Copies are checked against the shared version key once per interval
+        assert self.widget_cache.get_entry('key')['value'] == 'old'
+        monkeypatch.setattr(cache_module, 'VERSION_CHECK_INTERVAL', 0)
+        assert self.widget_cache.get_entry('key')['value'] == 'new'
+    
+    @pytest.mark.django_db
+    def test_model_versions_kept_locally(self):
+        """Test local hits do not read model versions from the shared cache."""
+        from unittest import mock
+        from django.contrib.auth.models import User
+        from django.test import RequestFactory
+        from dashboard.cache import bump_model_version, widget_cache_key
+        from dashboard.widgets import UserCountWidget
+        
+        request = RequestFactory().get('/')
+        request.user = User(username='staff', is_staff=True)
+        key = widget_cache_key(UserCountWidget(request=request))
+        
+        with mock.patch.object(cache, 'get_many', wraps=cache.get_many) as get_many:
+            assert widget_cache_key(UserCountWidget(request=request)) == key
+        assert get_many.call_count == 0
+        
+        # Writes in this process are seen straight away...
+        bump_model_version(User)
+        bumped_key = widget_cache_key(UserCountWidget(request=request))
+        assert bumped_key != key
+        
+        # ...and writes in other processes once the local copy expires
+        cache.incr('dashboard_model_version_auth.user')
+        assert widget_cache_key(UserCountWidget(request=request)) == bumped_key
+        cache_module._local_versions.clear()
+        assert widget_cache_key(UserCountWidget(request=request)) != bumped_key
+    
+    def test_disabled_by_default(self, settings):
+        """Test nothing is kept in process memory unless configured."""
+        settings.CUSTOM_ADMIN_DASHBOARD_CONFIG = {}
+        self.widget_cache.set('key', 'value', 60)
+        
+        assert not self.widget_cache.local.entries
+
+
+class TestCacheCodecs:
+    """Test cached values are serialized and compressed by the configured codec."""
+    
+    def setup_method(self):
+        """Set up a clean cache."""
+        cache.clear()
+        self.widget_cache = WidgetCache()
+        self.chart = {
+            'labels': [f'Day {day}' for day in range(365)],
+            'datasets': [{'label': 'Logins', 'data': list(range(365)), 'borderWidth': 2}],
+        }
+    
+    @pytest.mark.parametrize('codec', ['pickle', 'json'])
+    def test_round_trip(self, codec, settings):
+        """Test values read back equal the values stored."""
+        settings.CUSTOM_ADMIN_DASHBOARD_CONFIG = {'CACHE_CODEC': codec}
+        entry = self.widget_cache.set('key', self.chart, 60)
+        
+        assert cache.get('key')['codec'] == codec
+        assert self.widget_cache.get_entry('key') == entry
+    
+    def test_large_values_compressed(self, settings):
+        """Test values over the size threshold are compressed."""
+        settings.CUSTOM_ADMIN_DASHBOARD_CONFIG = {'CACHE_CODEC': 'json'}
+        self.widget_cache.set('key', self.chart, 60)
+        self.widget_cache.set('small', {'value': 1}, 60)
+        
+        stored = cache.get('key')
+        assert stored['compressed']
+        assert len(stored['value']) < len(json.dumps(self.chart)) / 2
+        assert not cache.get('small')['compressed']
+        
+        settings.CUSTOM_ADMIN_DASHBOARD_CONFIG = {'CACHE_COMPRESS_MIN_SIZE': None}
+        self.widget_cache.set('key', self.chart, 60)
+        assert not cache.get('key')['compressed']
+    
+    def test_json_codec_stores_strings(self, settings):
+        """Test the JSON codec stores dates and decimals as strings."""
+        settings.CUSTOM_ADMIN_DASHBOARD_CONFIG = {'CACHE_CODEC': 'json'}
+        self.widget_cache.set('key', {'day': datetime.date(2024, 1, 2), 'total': Decimal('1.50')}, 60)
+        
+        assert self.widget_cache.get_entry('key')['value'] == {'day': '2024-01-02', 'total': '1.50'}
+    
+    def test_entries_readable_after_codec_change(self, settings):
+        """Test entries are read back with the codec that wrote them."""
+        settings.CUSTOM_ADMIN_DASHBOARD_CONFIG = {'CACHE_CODEC': 'json'}
+        self.widget_cache.set('key', self.chart, 60)
+        
+        settings.CUSTOM_ADMIN_DASHBOARD_CONFIG = {'CACHE_CODEC': 'pickle'}
+        assert self.widget_cache.get_entry('key')['value'] == self.chart
+    
+    def test_invalid_codec_check(self, settings):
+        """Test an unknown CACHE_CODEC fails the system check."""
+        from dashboard.checks import check_cache_codec
+        
+        assert check_cache_codec(None) == []
+        
+        settings.CUSTOM_ADMIN_DASHBOARD_CONFIG = {'CACHE_CODEC': 'missing.module.Codec'}
+        assert [error.id for error in check_cache_codec(None)] == ['dashboard.E003']
+
+
+@pytest.mark.django_db
+class TestWidgetCacheKeys:
+    """Test widget cache keys follow the widget's cache scope."""
+    
+    def setup_method(self):
+        """Set up users with different permissions."""
+        from django.contrib.auth.models import Permission, User
+        
+        self.staff1 = User.objects.create_user(username='staff1', is_staff=True)
+        self.staff2 = User.objects.create_user(username='staff2', is_staff=True)
+        self.viewer = User.objects.create_user(username='viewer', is_staff=True)
+        self.viewer.user_permissions.add(Permission.objects.get(codename='view_user'))
+    
+    def make_key(self, cache_scope, user, **kwargs):
+        from dashboard.cache import make_widget_cache_key
+        return make_widget_cache_key('widget_data', 'test', cache_scope, user, **kwargs)
+    
+    def test_global_scope(self):
+        """Test global widgets share one key across users."""
+        assert self.make_key('global', self.staff1) == self.make_key('global', self.viewer)
+    
+    def test_permissions_scope(self):
+        """Test permission-scoped widgets share keys between equal permission sets."""
+        kwargs = {'requires_permissions': ['auth.view_user']}
+        assert self.make_key('permissions', self.staff1, **kwargs) == self.make_key('permissions', self.staff2, **kwargs)
+        assert self.make_key('permissions', self.staff1, **kwargs) != self.make_key('permissions', self.viewer, **kwargs)
+    
+    def test_permissions_scope_ignores_unrelated_permissions(self):
+        """Test only the widget's required permissions and model permissions split keys."""
+        from django.contrib.auth.models import Group
+        
+        assert self.make_key('permissions', self.staff1) == self.make_key('permissions', self.viewer)
+        assert (
+            self.make_key('permissions', self.staff1, depends_on=[Group])
+            == self.make_key('permissions', self.viewer, depends_on=[Group])
+        )
+        assert (
+            self.make_key('permissions', self.staff1, depends_on=['auth.User'])
+            != self.make_key('permissions', self.viewer, depends_on=['auth.User'])
+        )
+    
+    def test_user_scope(self):
+        """Test user-scoped widgets get one key per user."""
+        assert self.make_key('user', self.staff1) != self.make_key('user', self.staff2)
+
+
+# Versions are bumped on commit, so writes must really be committed
+@pytest.mark.django_db(transaction=True)
+class TestModelVersionInvalidation:
+    """Test model writes invalidate the cached data of dependent widgets."""
+    
+    def setup_method(self):
+        """Set up a staff request."""
+        from django.contrib.auth.models import User
+        from django.test import RequestFactory
+        
+        cache.clear()
+        self.request = RequestFactory().get('/')
+        self.request.user = User.objects.create_user(username='staff', is_staff=True)
+    
+    def test_model_save_changes_cache_key(self):
+        """Test saving a model changes the keys of widgets depending on it."""
+        from django.contrib.auth.models import User
+        from dashboard.cache import widget_cache_key
+        from dashboard.widgets import SystemStatusWidget, UserCountWidget
+        
+        user_count_key = widget_cache_key(UserCountWidget(request=self.request))
+        system_status_key = widget_cache_key(SystemStatusWidget(request=self.request))
+        
+        User.objects.create_user(username='new')
+        
+        assert widget_cache_key(UserCountWidget(request=self.request)) != user_count_key
+        assert widget_cache_key(SystemStatusWidget(request=self.request)) == system_status_key
+    
+    def test_fresh_data_after_write(self):
+        """Test cached widget data reflects writes immediately."""
+        from django.contrib.auth.models import User
+        from dashboard.cache import widget_cache, widget_cache_key
+        from dashboard.widgets import UserCountWidget
+        
+        def cached_value():
+            widget = UserCountWidget(request=self.request)
+            return widget_cache.get_or_set(
+                widget_cache_key(widget), widget.get_api_data, 3600
+            )['value']
+        
+        assert cached_value() == 1
+        User.objects.create_user(username='new')
+        assert cached_value() == 2
+        
+        User.objects.filter(username='new').delete()
+        assert cached_value() == 1
+    
+    def test_fragment_cache_key(self):
+        """Test rendered HTML is keyed by theme and fragment, and follows data versions."""
+        from django.contrib.auth.models import User
+        from dashboard.cache import widget_cache_key, widget_fragment_cache_key
+        from dashboard.widgets import UserCountWidget
+        
+        widget = UserCountWidget(request=self.request)
+        light_key = widget_fragment_cache_key(widget, 'light')
+        
+        assert light_key != widget_cache_key(widget)
+        assert light_key != widget_fragment_cache_key(widget, 'dark')
+        assert light_key != widget_fragment_cache_key(widget, 'light', 'card')
+        
+        User.objects.create_user(username='new')
+        assert widget_fragment_cache_key(widget, 'light') != light_key
+    
+    def test_m2m_change_bumps_version(self):
+        """Test many-to-many changes bump the versions of both models."""
+        from django.contrib.auth.models import Group
+        from dashboard.cache import get_model_versions
+        
+        before = get_model_versions(['auth.User'])
+        self.request.user.groups.add(Group.objects.create(name='editors'))
+        
+        assert get_model_versions(['auth.User']) != before
+
+
+class TestModelVersionOnCommit(TestCase):
+    """Test model versions are bumped once the write is committed."""
+    
+    def setUp(self):
+        cache.clear()
+    
+    def test_bumped_on_commit(self):
+        """Test readers keep the old version until the transaction commits."""
+        from django.contrib.auth.models import User
+        from dashboard.cache import get_model_versions
+        
+        before = get_model_versions(['auth.User'])
+        
+        with self.captureOnCommitCallbacks() as callbacks:
+            User.objects.create_user(username='new')
+            self.assertEqual(get_model_versions(['auth.User']), before)
+        
+        self.assertEqual(len(callbacks), 1)
+        callbacks[0]()
+        self.assertNotEqual(get_model_versions(['auth.User']), before)
+    
+    def test_untracked_models_not_bumped(self):
+        """Test writes to models no widget depends on register nothing."""
+        from django.contrib.auth.models import Permission
+        from django.contrib.contenttypes.models import ContentType
+        
+        with self.captureOnCommitCallbacks() as callbacks:
+            Permission.objects.create(
+                codename='export_user',
+                name='Can export users',
+                content_type=ContentType.objects.get_for_model(Permission),
+            )
+        
+        self.assertEqual(callbacks, [])
+    
+    def test_untracked_models_fast_delete(self):
+        """Test models no widget depends on keep Django's fast deletes."""
+        from django.contrib.admin.models import LogEntry
+        from django.contrib.auth.models import User
+        from django.contrib.sessions.models import Session
+        from django.db.models.deletion import Collector
+        
+        collector = Collector(using='default')
+        self.assertTrue(collector.can_fast_delete(Session.objects.all()))
+        self.assertTrue(collector.can_fast_delete(LogEntry.objects.all()))
+        self.assertFalse(collector.can_fast_delete(User.objects.all()))
+    
+    def test_widgets_registered_late_are_tracked(self):
+        """Test widgets registered once the app is ready connect their models."""
+        from django.contrib.auth.models import Group
+        from django.db.models.signals import m2m_changed, post_delete, post_save
+        from dashboard.widgets import MetricWidget, WidgetRegistry
+        
+        class GroupCountWidget(MetricWidget):
+            title = "Groups"
+            depends_on = [Group]
+        
+        WidgetRegistry().register(GroupCountWidget)
+        try:
+            with self.captureOnCommitCallbacks() as callbacks:
+                Group.objects.create(name='editors')
+            self.assertEqual(len(callbacks), 1)
+        finally:
+            post_save.disconnect(sender=Group, dispatch_uid='dashboard_model_saved')
+            post_delete.disconnect(sender=Group, dispatch_uid='dashboard_model_deleted')
+            m2m_changed.disconnect(sender=Group.permissions.through, dispatch_uid='dashboard_m2m_changed')
@@ -0,0 +1,64 @@
+"""
+Tests for the dashboard configuration.
+"""
+
+import json
+
+import pytest
+from django.test import override_settings
+
+from dashboard_config.settings import (
+    as_dict,
+    get_api_config,
+    get_chart_colors,
+    get_dashboard_settings,
+    get_theme_config,
+    get_widget_config,
+)
+
+
+class TestDashboardSettings:
+    """Test the memoized dashboard configuration."""
+
+    def test_settings_are_memoized(self):
+        """Test the configuration is resolved once and reused."""
+        assert get_dashboard_settings() is get_dashboard_settings()
+        assert get_widget_config() is get_widget_config()
+
+    def test_settings_are_read_only(self):
+        """Test the shared configuration cannot be modified."""
+        config = get_dashboard_settings()
+
+        with pytest.raises(TypeError):
+            config['THEME'] = 'dark'
+        with pytest.raises(TypeError):
+            config['WIDGET_GRID']['gap'] = 8
+
+    def test_setting_changed_invalidates(self):
+        """Test overriding the settings resolves the configuration again."""
+        with override_settings(CUSTOM_ADMIN_DASHBOARD_CONFIG={
+            'THEME': 'dark',
+            'WIDGET_MAX_WORKERS': 2,
+            'WIDGET_GRID': {'gap': 8},
+            'CHART_COLORS': {'primary': '#000000'},
+            'ENABLE_API': False,
+        }):
+            config = get_dashboard_settings()
+            assert config['THEME'] == 'dark'
+            assert config['WIDGET_GRID']['gap'] == 8
+            assert config['WIDGET_GRID']['cols']['md'] == 2
+            assert get_widget_config()['max_workers'] == 2
+            assert get_chart_colors()['primary'] == '#000000'
+            assert get_theme_config()['bg_primary'] == 'bg-gray-900'
+            assert get_api_config()['enabled'] is False
+
+        assert get_dashboard_settings()['THEME'] == 'light'
+        assert get_theme_config()['bg_primary'] == 'bg-white'
+
+    def test_as_dict(self):
+        """Test the configuration can be serialized as a plain dict."""
+        config = as_dict(get_dashboard_settings())
+
+        assert isinstance(config['WIDGET_GRID'], dict)
+        assert isinstance(config['WIDGETS'], list)
+        json.dumps(config)
@@ -0,0 +1,129 @@
+"""
+Tests for the dashboard JSON encoding.
+"""
+
+import datetime
+import json
+from decimal import Decimal
+
+import pytest
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+from django.utils.translation import gettext_lazy
+from rest_framework.renderers import JSONRenderer
+
+from dashboard import encoders
+from dashboard.api.renderers import DashboardJSONRenderer
+from dashboard.encoders import JsonResponse, dumps, dumps_bytes
+from dashboard.templatetags.dashboard_tags import to_json
+
+
+PAYLOAD = {
+    'total': Decimal('12.50'),
+    'day': datetime.date(2024, 1, 2),
+    'updated': datetime.datetime(2024, 1, 2, 3, 4, 5, 678901, tzinfo=datetime.timezone.utc),
+    'label': gettext_lazy('Users'),
+    'series': (1, 2.5, None, True),
+    'name': 'Zoë\u2028',
+    1: 'one',
+}
+
+
+@pytest.fixture(params=['orjson', 'json'])
+def encoder(request, monkeypatch):
+    """Run a test with orjson, then with the standard library fallback."""
+    if request.param == 'json':
+        monkeypatch.setattr(encoders, 'orjson', None)
+    elif encoders.orjson is None:
+        pytest.skip('orjson is not installed')
+    return request.param
+
+
+class TestDumps:
+    """Test JSON encoding with and without orjson."""
+
+    def test_dumps(self, encoder):
+        """Test Django types are encoded like DjangoJSONEncoder encodes them."""
+        assert json.loads(dumps(PAYLOAD)) == {
+            'total': '12.50',
+            'day': '2024-01-02',
+            'updated': '2024-01-02T03:04:05.678Z',
+            'label': 'Users',
+            'series': [1, 2.5, None, True],
+            'name': 'Zoë\u2028',
+            '1': 'one',
+        }
+
+    def test_output_is_identical(self, monkeypatch):
+        """Test orjson and the fallback produce the same bytes."""
+        if encoders.orjson is None:
+            pytest.skip('orjson is not installed')
+
+        fast = dumps_bytes(PAYLOAD)
+        monkeypatch.setattr(encoders, 'orjson', None)
+        assert dumps_bytes(PAYLOAD) == fast
+
+    def test_big_integers(self, encoder):
+        """Test integers orjson cannot encode fall back to the standard library."""
+        assert dumps({'value': 2 ** 70}) == '{"value":%d}' % 2 ** 70
+
+    def test_unsupported_types(self, encoder):
+        """Test objects without a JSON representation are rejected."""
+        with pytest.raises(TypeError):
+            dumps({'value': object()})
+
+    def test_json_response(self, encoder):
+        """Test JsonResponse encodes with dumps_bytes()."""
+        response = JsonResponse({'total': Decimal('1.5')})
+
+        assert response['Content-Type'] == 'application/json'
+        assert response.content == b'{"total":"1.5"}'
+
+        with pytest.raises(TypeError):
+            JsonResponse([1, 2])
+        assert JsonResponse([1, 2], safe=False).content == b'[1,2]'
+
+    def test_json_response_custom_encoding(self, encoder):
+        """Test JsonResponse honours a custom encoder and json.dumps() parameters."""
+        class UpperEncoder(DjangoJSONEncoder):
+            def default(self, o):
+                if isinstance(o, Decimal):
+                    return 'DECIMAL'
+                return super().default(o)
+
+        response = JsonResponse({'total': Decimal('1.5')}, encoder=UpperEncoder)
+        assert response.content == b'{"total": "DECIMAL"}'
+
+        response = JsonResponse({'b': 1, 'a': 2}, json_dumps_params={'sort_keys': True, 'indent': 1})
+        assert response.content == b'{\n "a": 2,\n "b": 1\n}'
+
+        with pytest.raises(TypeError):
+            JsonResponse([1, 2], encoder=UpperEncoder)
+
+    def test_to_json_filter(self, encoder):
+        """Test the to_json template filter handles Django types."""
+        assert to_json({'day': datetime.date(2024, 1, 2)}) == '{"day":"2024-01-02"}'
+
+    def test_read_only_settings(self, encoder):
+        """Test resolved dashboard settings, which are read-only mappings, can be encoded."""
+        from dashboard_config.settings import as_dict, get_chart_colors, get_dashboard_settings
+
+        assert json.loads(to_json(get_chart_colors())) == as_dict(get_chart_colors())
+        assert json.loads(dumps(get_dashboard_settings())) == as_dict(get_dashboard_settings())
+
+
+class TestDashboardJSONRenderer:
+    """Test the API renderer matches Django REST framework's output."""
+
+    def test_matches_json_renderer(self, encoder):
+        """Test responses are rendered exactly like JSONRenderer renders them."""
+        data = {**PAYLOAD, 'now': timezone.now()}
+        del data[1]
+
+        assert DashboardJSONRenderer().render(data) == JSONRenderer().render(data)
+
+    def test_indented_responses(self):
+        """Test pretty printed responses are left to JSONRenderer."""
+        rendered = DashboardJSONRenderer().render({'a': 1}, 'application/json; indent=2')
+
+        assert rendered == b'{\n  "a": 1\n}'
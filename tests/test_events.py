@@ -0,0 +1,172 @@
+"""
+Tests for the dashboard Server-Sent Events channel.
+"""
+
+import asyncio
+import json
+from unittest import mock
+
+import django
+import pytest
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import AsyncClient, override_settings
+from django.urls import reverse
+
+from dashboard.cache import bump_model_version
+from dashboard.events import WidgetVersionTracker, format_event, parse_resume_id
+from dashboard.widgets import MetricWidget, UserCountWidget
+
+
+class TestFormatEvent:
+    """Test Server-Sent Events message formatting."""
+
+    def test_format_event(self):
+        """Test events carry their name, id and one data line per line."""
+        assert format_event('{"id": 1}', event='widget', event_id='abc') == (
+            'id: abc\nevent: widget\ndata: {"id": 1}\n\n'
+        )
+        assert format_event('a\nb') == 'data: a\ndata: b\n\n'
+
+
+@pytest.mark.django_db
+class TestWidgetVersionTracker:
+    """Test detection of widgets whose data changed."""
+
+    def setup_method(self):
+        cache.clear()
+
+    def test_model_version_change(self):
+        """Test widgets are reported once after a model they depend on changes."""
+        tracker = WidgetVersionTracker([UserCountWidget()])
+        assert tracker.get_changed_widgets() == []
+
+        bump_model_version(User)
+        assert [widget.widget_id for widget in tracker.get_changed_widgets()] == ['user_count']
+        assert tracker.get_changed_widgets() == []
+
+    def test_refresh_interval(self):
+        """Test widgets without model dependencies are checked on their refresh interval."""
+        class ClockWidget(MetricWidget):
+            refresh_interval = 0
+
+        class SlowClockWidget(MetricWidget):
+            refresh_interval = 3600
+
+        tracker = WidgetVersionTracker([ClockWidget(), SlowClockWidget()])
+        assert [widget.widget_id for widget in tracker.get_changed_widgets()] == ['clockwidget']
+
+    def test_is_new(self):
+        """Test unchanged payloads are not sent twice."""
+        widget = UserCountWidget()
+        tracker = WidgetVersionTracker([widget])
+
+        assert tracker.is_new(widget, 'a')
+        assert not tracker.is_new(widget, 'a')
+        assert tracker.is_new(widget, 'b')
+
+    def test_resume(self):
+        """Test a resumed stream checks every widget and skips payloads the client has."""
+        widget = UserCountWidget()
+        tracker = WidgetVersionTracker([widget])
+        tracker.is_new(widget, 'a')
+
+        resumed = WidgetVersionTracker([UserCountWidget()], parse_resume_id(tracker.get_resume_id()))
+        assert [widget.widget_id for widget in resumed.get_changed_widgets()] == ['user_count']
+        assert not resumed.is_new(widget, 'a')
+        assert resumed.get_changed_widgets() == []
+
+    def test_parse_resume_id(self):
+        """Test malformed event IDs are ignored."""
+        assert parse_resume_id('{"user_count": "a"}') == {'user_count': 'a'}
+        assert parse_resume_id(None) is None
+        assert parse_resume_id('not json') is None
+        assert parse_resume_id('[1]') is None
+        assert parse_resume_id('{"user_count": 1}') is None
+
+
+@pytest.mark.skipif(django.VERSION < (4, 2), reason='Async streaming responses need Django 4.2')
+@pytest.mark.django_db(transaction=True)
+class TestWidgetEventsView:
+    """Test the widget event stream."""
+
+    def setup_method(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            username='staffuser', password='testpass123', is_staff=True
+        )
+
+    def test_disabled_by_default(self):
+        """Test the stream is only served when push updates are enabled."""
+        async def get():
+            client = AsyncClient()
+            await sync_to_async(client.force_login)(self.user)
+            return await client.get(reverse('dashboard:widget_events'))
+
+        assert asyncio.run(get()).status_code == 404
+
+    @override_settings(CUSTOM_ADMIN_DASHBOARD_CONFIG={
+        'PUSH_UPDATES': True,
+        'PUSH_INTERVAL': 0.01,
+        'WIDGETS': ['dashboard.widgets.UserCountWidget'],
+    })
+    @pytest.mark.parametrize('lazy', [False, True])
+    def test_pushes_changed_widgets(self, lazy):
+        """Test a widget, lazy or not, is pushed once the data it depends on changes."""
+        async def stream():
+            client = AsyncClient()
+            await sync_to_async(client.force_login)(self.user)
+            response = await client.get(reverse('dashboard:widget_events'))
+            assert response['Content-Type'] == 'text/event-stream'
+
+            events = response.streaming_content
+            assert (await events.__anext__()).startswith(b'retry: ')
+
+            await User.objects.acreate(username='newuser')
+            event = (await asyncio.wait_for(events.__anext__(), timeout=5)).decode()
+            await events.aclose()
+            return event
+
+        with mock.patch.object(UserCountWidget, 'lazy', lazy):
+            event = asyncio.run(stream())
+        assert event.startswith('event: widget\n')
+        update = json.loads(event.split('data: ', 1)[1])
+        assert update['id'] == 'user_count'
+        assert 'data-widget-id="user_count"' in update['html']
+
+    @override_settings(CUSTOM_ADMIN_DASHBOARD_CONFIG={
+        'PUSH_UPDATES': True,
+        'PUSH_INTERVAL': 0.01,
+        'PUSH_MAX_AGE': 0.05,
+        'WIDGETS': ['dashboard.widgets.UserCountWidget'],
+    })
+    def test_stream_ends_after_max_age(self):
+        """Test streams end with a resumable event ID once they reach their maximum age."""
+        async def stream():
+            client = AsyncClient()
+            await sync_to_async(client.force_login)(self.user)
+            response = await client.get(reverse('dashboard:widget_events'))
+            return [chunk.decode() async for chunk in response.streaming_content]
+
+        chunks = asyncio.run(asyncio.wait_for(stream(), timeout=5))
+        assert chunks[0].startswith('retry: ')
+        assert chunks[-1] == 'id: {}\n\n'
+
+
+class TestPushUpdatesCheck:
+    """Test the system check guarding push updates."""
+
+    def test_requires_django_42(self, settings, monkeypatch):
+        """Test push updates are rejected on Django versions without async streaming."""
+        from dashboard.checks import check_push_updates
+
+        settings.CUSTOM_ADMIN_DASHBOARD_CONFIG = {'PUSH_UPDATES': True}
+        monkeypatch.setattr(django, 'VERSION', (4, 2, 0, 'final', 0))
+        assert check_push_updates(None) == []
+
+        monkeypatch.setattr(django, 'VERSION', (4, 1, 0, 'final', 0))
+        assert [error.id for error in check_push_updates(None)] == ['dashboard.E004']
+
+        settings.CUSTOM_ADMIN_DASHBOARD_CONFIG = {}
+        assert check_push_updates(None) == []
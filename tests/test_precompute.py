@@ -0,0 +1,153 @@
+"""
+Tests for the dashboard background precomputation.
+"""
+
+import time
+from io import StringIO
+
+import pytest
+from django.contrib.auth.models import Permission, User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+from dashboard.cache import widget_cache, widget_cache_key
+from dashboard.precompute import (
+    PrecomputeScheduler,
+    get_representative_users,
+    get_widget_classes,
+    make_request,
+    precompute_widgets,
+)
+from dashboard.widgets import RecentLoginsWidget, UserCountWidget
+
+
+@pytest.mark.django_db
+class TestPrecompute:
+    """Test widget data is precomputed into the widget cache."""
+
+    def setup_method(self):
+        cache.clear()
+        self.admin = User.objects.create_user(username='admin', is_staff=True, is_superuser=True)
+        self.staff = User.objects.create_user(username='staff', is_staff=True)
+        self.viewer = User.objects.create_user(username='viewer', is_staff=True)
+        self.viewer.user_permissions.add(Permission.objects.get(codename='view_user'))
+        User.objects.create_user(username='customer')
+
+    def test_representative_users(self):
+        """Test one user is picked per cache entry of each scope, by relevant permissions."""
+        permissions = frozenset({'auth.view_user'})
+        assert get_representative_users('global') == [self.admin]
+        assert get_representative_users('permissions', permissions) == [self.admin, self.staff, self.viewer]
+        assert get_representative_users('permissions') == [self.admin, self.staff]
+        assert get_representative_users('user') == [self.admin, self.staff, self.viewer]
+
+        self.viewer.user_permissions.clear()
+        self.viewer = User.objects.get(pk=self.viewer.pk)
+        assert get_representative_users('permissions', permissions) == [self.admin, self.staff]
+
+    def test_precompute_widgets(self):
+        """Test precomputed data is served to requests without recomputing."""
+        results = precompute_widgets([UserCountWidget, RecentLoginsWidget])
+
+        assert {result.status for result in results} == {'computed'}
+        assert [result.widget_id for result in results].count('user_count') == 1
+
+        widget = UserCountWidget(request=make_request(self.staff))
+        entry = widget_cache.get_entry(widget_cache_key(widget))
+        assert entry['value']['value'] == User.objects.count()
+
+        api_entry = widget_cache.get_entry(widget_cache_key(widget, prefix='api_widget_data'))
+        assert api_entry['value']['widget_id'] == 'user_count'
+
+        chart_widget = RecentLoginsWidget(request=make_request(self.staff))
+        chart_entry = widget_cache.get_entry(widget_cache_key(chart_widget, prefix='api_chart_data'))
+        assert chart_entry is not None
+
+    def test_pages_read_precomputed_data(self):
+        """Test page prefetching reads the precomputed data instead of evaluating widgets."""
+        from unittest import mock
+
+        from dashboard.engine import prefetch_widgets
+
+        precompute_widgets([UserCountWidget])
+
+        widget = UserCountWidget(request=make_request(self.staff))
+        with mock.patch.object(UserCountWidget, 'collect_data') as collect_data:
+            prefetch_widgets([widget], cached=True)
+        collect_data.assert_not_called()
+        assert widget.data['value'] == User.objects.count()
+
+    def test_precompute_timeout_covers_next_run(self, settings):
+        """Test precomputed entries stay fresh past the latest jittered run."""
+        settings.CUSTOM_ADMIN_DASHBOARD_CONFIG = {'CACHE_JITTER': 0.1, 'CACHE_LOCK_TIMEOUT': 30}
+        before = time.time()
+        precompute_widgets([UserCountWidget])
+
+        widget = UserCountWidget(request=make_request(self.staff))
+        expected = UserCountWidget.refresh_interval * 1.1 + 30
+        for prefix in ('widget_data', 'widget_prefetch', 'api_widget_data', 'api_chart_data'):
+            entry = widget_cache.get_entry(widget_cache_key(widget, prefix=prefix))
+            assert entry['fresh_until'] - before >= expected
+
+    def test_locked_entries_are_skipped(self):
+        """Test entries being computed by another process are left alone."""
+        widget = UserCountWidget(request=make_request(self.admin))
+        assert widget_cache.acquire_lock(widget_cache_key(widget))
+
+        results = precompute_widgets([UserCountWidget])
+        assert [result.status for result in results] == ['locked']
+        assert widget_cache.get_entry(widget_cache_key(widget)) is None
+
+    def test_scheduler(self):
+        """Test widgets are computed when due and rescheduled on their refresh interval."""
+        scheduler = PrecomputeScheduler([UserCountWidget], jitter=0.1)
+
+        assert [result.widget_id for result in scheduler.run_pending()] == ['user_count']
+        assert scheduler.run_pending() == []
+        assert 270 <= scheduler.get_delay() <= 330
+
+    def test_worker_command_once(self):
+        """Test the worker command can compute every widget once."""
+        out = StringIO()
+        call_command('dashboard_worker', '--once', '--widget', 'user_count', stdout=out)
+
+        assert 'user_count' in out.getvalue()
+        assert 'computed' in out.getvalue()
+
+    def test_margin(self):
+        """Test entries fresh for longer than the margin are not recomputed."""
+        precompute_widgets([UserCountWidget])
+
+        assert [result.status for result in precompute_widgets([UserCountWidget], margin=30)] == ['fresh']
+        assert [result.status for result in precompute_widgets([UserCountWidget], margin=3600)] == ['computed']
+
+    def test_warm_cache_command(self):
+        """Test warming fills the data and fragment caches and reports timings."""
+        from dashboard.cache import widget_fragment_cache_key
+
+        out = StringIO()
+        call_command('dashboard_warm_cache', '--widget', 'user_count', stdout=out)
+
+        assert 'queries' in out.getvalue()
+        assert 'Warmed 1 of 1 cache entries' in out.getvalue()
+
+        widget = UserCountWidget(request=make_request(self.staff))
+        for theme in ('light', 'dark'):
+            entry = widget_cache.get_entry(widget_fragment_cache_key(widget, theme, 'card'))
+            assert 'data-widget-id="user_count"' in entry['value']
+            assert widget_cache.get_entry(widget_fragment_cache_key(widget, theme)) is not None
+
+    def test_get_widget_classes(self):
+        """Test widgets are looked up by ID, defaulting to every enabled widget."""
+        assert get_widget_classes(['user_count']) == [UserCountWidget]
+        assert UserCountWidget in get_widget_classes()
+        with pytest.raises(ValueError, match='invalid'):
+            get_widget_classes(['user_count', 'invalid'])
+
+    def test_worker_command_unknown_widget(self):
+        """Test unknown widgets are rejected."""
+        with pytest.raises(CommandError):
+            call_command('dashboard_worker', '--once', '--widget', 'invalid')
+        with pytest.raises(CommandError):
+            call_command('dashboard_warm_cache', '--widget', 'invalid')
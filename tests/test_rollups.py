@@ -0,0 +1,93 @@
+"""
+Tests for the dashboard daily rollups.
+"""
+
+from datetime import timedelta
+
+import pytest
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import RequestFactory
+from django.utils import timezone
+
+from dashboard.cache import get_model_versions
+from dashboard.models import DailyMetric
+from dashboard.rollups import RollupMetric, rollup_registry, update_rollup, update_rollups
+from dashboard.widgets import RollupChartWidget
+
+
+@pytest.mark.django_db
+class TestRollups:
+    """Test incremental daily rollups."""
+    
+    def setup_method(self):
+        """Set up test data."""
+        cache.clear()
+        self.today = timezone.localdate()
+        self.metric = RollupMetric('test.user.registrations', User, 'date_joined', backfill_days=7)
+        
+        now = timezone.now()
+        for i, days_ago in enumerate([0, 0, 2]):
+            User.objects.create_user(
+                username=f'user{i}',
+                date_joined=now - timedelta(days=days_ago),
+            )
+    
+    def get_values(self):
+        return dict(
+            DailyMetric.objects.filter(key=self.metric.key).values_list('date', 'value')
+        )
+    
+    def test_backfill_is_zero_filled(self):
+        """Test a new metric is backfilled with one row per day."""
+        assert update_rollup(self.metric, today=self.today) == 7
+        
+        values = self.get_values()
+        assert len(values) == 7
+        assert values[self.today] == 2
+        assert values[self.today - timedelta(days=1)] == 0
+        assert values[self.today - timedelta(days=2)] == 1
+    
+    def test_incremental_update(self):
+        """Test later runs only recompute from the last stored day."""
+        update_rollup(self.metric, today=self.today)
+        User.objects.create_user(username='late', date_joined=timezone.now())
+        
+        assert update_rollup(self.metric, today=self.today) == 1
+        assert self.get_values()[self.today] == 3
+    
+    def test_update_rollups_bumps_version(self):
+        """Test updating rollups invalidates dependent widget data."""
+        before = get_model_versions([DailyMetric])
+        
+        written = update_rollups(keys=['auth.user.registrations'], today=self.today)
+        
+        assert list(written) == ['auth.user.registrations']
+        assert get_model_versions([DailyMetric]) != before
+    
+    def test_rollup_chart_widget(self, django_assert_num_queries):
+        """Test the rollup chart widget reads the stored rows."""
+        update_rollups(keys=['auth.user.registrations'], today=self.today)
+        
+        class RegistrationsWidget(RollupChartWidget):
+            title = "Registrations"
+            rollup_key = 'auth.user.registrations'
+        
+        request = RequestFactory().get('/')
+        widget = RegistrationsWidget(request=request)
+        
+        with django_assert_num_queries(1):
+            chart_data = widget.get_chart_data()
+        
+        data = chart_data['data']['datasets'][0]['data']
+        assert len(data) == 7
+        assert data[-1] == 2
+        assert data[-3] == 1
+    
+    def test_rollup_command(self):
+        """Test the dashboard_rollup management command."""
+        call_command('dashboard_rollup', metric=['auth.user.registrations'], since=str(self.today))
+        
+        assert DailyMetric.objects.filter(key='auth.user.registrations').count() == 1
+        assert rollup_registry.get_metric('auth.user.registrations') is not None
@@ -3,7 +3,7 @@ Tests for dashboard views.
 """
 
 import json
-from django.test import TestCase, Client
+from django.test import TestCase, Client, RequestFactory
 from django.contrib.auth.models import User
 from django.urls import reverse
 from django.core.cache import cache
@@ -82,6 +82,74 @@ class TestDashboardViews(TestCase):
         self.assertIn('title', data)
         self.assertIn('value', data)
     
+    def test_widget_data_view_conditional_request(self):
+        """Test unchanged widget data and HTML is answered with 304 Not Modified."""
+        self.client.login(username='staffuser', password='testpass123')
+        url = reverse('dashboard:widget_data', kwargs={'widget_id': 'user_count'})
+        
+        for headers in [{}, {'HTTP_HX_REQUEST': 'true'}]:
+            response = self.client.get(url, **headers)
+            self.assertEqual(response.status_code, 200)
+            etag = response['ETag']
+            
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag, **headers)
+            self.assertEqual(response.status_code, 304)
+        
+        # New users change the data
+        with self.captureOnCommitCallbacks(execute=True):
+            User.objects.create_user(username='newuser', password='testpass123')
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag, HTTP_HX_REQUEST='true')
+        self.assertEqual(response.status_code, 200)
+    
+    def test_widget_data_view_card_fragment(self):
+        """Test lazy widgets can load their rendered card."""
+        self.client.login(username='staffuser', password='testpass123')
+        
+        response = self.client.get(
+            reverse('dashboard:widget_data', kwargs={'widget_id': 'user_count'}),
+            {'fragment': 'card'},
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'data-widget-id="user_count"')
+        self.assertNotContains(response, 'This widget could not be loaded.')
+    
+    def test_lazy_widgets_are_not_prefetched(self):
+        """Test lazy widgets are left out of page prefetching."""
+        from dashboard.views import _get_eager_widgets
+        from dashboard.widgets import MetricWidget
+        
+        class EagerWidget(MetricWidget):
+            title = "Eager"
+        
+        class LazyWidget(MetricWidget):
+            title = "Lazy"
+            lazy = True
+        
+        eager, lazy = EagerWidget(), LazyWidget()
+        self.assertEqual(_get_eager_widgets([eager, lazy]), [eager])
+    
+    def test_admin_index_skips_lazy_widgets(self):
+        """Test the admin index only prefetches eager widgets, from the cache."""
+        from unittest import mock
+        from django.http import HttpResponse
+        from dashboard import views
+        from dashboard.widgets import MetricWidget
+        
+        class LazyWidget(MetricWidget):
+            title = "Lazy"
+            lazy = True
+        
+        request = RequestFactory().get('/admin/')
+        request.user = self.staff_user
+        eager, lazy = MetricWidget(request=request), LazyWidget(request=request)
+        
+        with mock.patch.object(views, '_get_permitted_widgets', return_value=[eager, lazy]), \
+                mock.patch.object(views, 'prefetch_widgets') as prefetch, \
+                mock.patch.object(views, 'render', return_value=HttpResponse()):
+            views.admin_index_view(request)
+        
+        prefetch.assert_called_once_with([eager], cached=True)
+    
     def test_widget_data_view_not_found(self):
         """Test widget data view with invalid widget ID."""
         self.client.login(username='staffuser', password='testpass123')
@@ -101,12 +169,59 @@ class TestDashboardViews(TestCase):
         )
         self.assertEqual(response.status_code, 302)  # Redirected by staff_member_required
     
+    def test_async_widget_data_view(self):
+        """Test async widget data endpoint."""
+        self.client.login(username='staffuser', password='testpass123')
+        
+        response = self.client.get(
+            reverse('dashboard:widget_data_async', kwargs={'widget_id': 'user_count'})
+        )
+        self.assertEqual(response.status_code, 200)
+        
+        data = json.loads(response.content)
+        self.assertEqual(data['value'], User.objects.count())
+        
+        response = self.client.get(
+            reverse('dashboard:widget_data_async', kwargs={'widget_id': 'invalid_widget'})
+        )
+        self.assertEqual(response.status_code, 404)
+    
+    def test_async_widget_data_view_permissions_scope(self):
+        """Test the async endpoint builds permission-scoped cache keys off the event loop."""
+        from unittest import mock
+        from dashboard.widgets import UserCountWidget
+        
+        self.client.login(username='staffuser', password='testpass123')
+        
+        with mock.patch.object(UserCountWidget, 'cache_scope', 'permissions'):
+            response = self.client.get(
+                reverse('dashboard:widget_data_async', kwargs={'widget_id': 'user_count'})
+            )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(json.loads(response.content)['value'], User.objects.count())
+    
+    def test_async_views_require_staff(self):
+        """Test async views redirect non-staff users to the login page."""
+        self.client.login(username='testuser', password='testpass123')
+        
+        for url in [
+            reverse('dashboard:widgets_async'),
+            reverse('dashboard:widget_data_async', kwargs={'widget_id': 'user_count'}),
+        ]:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 302)
+    
     def test_refresh_widget_view(self):
         """Test widget refresh functionality."""
         self.client.login(username='staffuser', password='testpass123')
         
         # Set up cache
-        cache_key = f"widget_data_user_count_{self.staff_user.id}"
+        from dashboard.cache import widget_cache_key
+        from dashboard.widgets import UserCountWidget
+        
+        request = RequestFactory().get('/')
+        request.user = self.staff_user
+        cache_key = widget_cache_key(UserCountWidget(request=request))
         cache.set(cache_key, {'cached': True}, 60)
         
         # Refresh widget
@@ -121,6 +236,29 @@ class TestDashboardViews(TestCase):
         if cached_data:
             self.assertNotEqual(cached_data, {'cached': True})
     
+    def test_widget_html_fragment_cache(self):
+        """Test HTMX refreshes are served from the fragment cache until refreshed."""
+        from unittest import mock
+        from dashboard.widgets import UserCountWidget
+        
+        cache.clear()
+        self.client.login(username='staffuser', password='testpass123')
+        url = reverse('dashboard:widget_data', kwargs={'widget_id': 'user_count'})
+        
+        with mock.patch.object(UserCountWidget, 'render', return_value='<p>42</p>') as render:
+            self.client.get(url, HTTP_HX_REQUEST='true')
+            response = self.client.get(url, HTTP_HX_REQUEST='true')
+            self.assertEqual(json.loads(response.content), {'html': '<p>42</p>'})
+            self.assertEqual(render.call_count, 1)
+            
+            # Refreshing the widget renders it again
+            self.client.get(
+                reverse('dashboard:widget_refresh', kwargs={'widget_id': 'user_count'}),
+                HTTP_HX_REQUEST='true',
+            )
+            self.client.get(url, HTTP_HX_REQUEST='true')
+            self.assertEqual(render.call_count, 2)
+    
     def test_dashboard_settings_view_get(self):
         """Test dashboard settings GET request."""
         self.client.login(username='staffuser', password='testpass123')
@@ -172,6 +310,58 @@ class TestDashboardViews(TestCase):
         for widget_data in widgets:
             self.assertIn('widget_id', widget_data)
             self.assertIn('title', widget_data)
+    
+    def test_export_ndjson(self):
+        """Test exports are streamed as NDJSON, with one record per table row."""
+        from django.utils import timezone
+        
+        User.objects.filter(username='staffuser').update(last_login=timezone.now())
+        self.client.login(username='staffuser', password='testpass123')
+        
+        response = self.client.get(reverse('dashboard:export'), {'format': 'ndjson'})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        self.assertIn('dashboard_export.ndjson', response['Content-Disposition'])
+        
+        records = [json.loads(line) for line in b''.join(response.streaming_content).splitlines()]
+        self.assertEqual(records[0]['record'], 'export')
+        self.assertIn('config', records[0])
+        
+        rows = [record for record in records if record['record'] == 'row']
+        self.assertIn('staffuser', [record['row'][0] for record in rows])
+        self.assertEqual({record['widget_id'] for record in rows}, {'recent_logins'})
+        
+        widgets = {record['widget_id']: record for record in records if record['record'] == 'widget'}
+        self.assertEqual(widgets['recent_logins']['headers'][0], 'Username')
+        self.assertEqual(widgets['user_count']['value'], User.objects.count())
+    
+    def test_export_csv_gzip(self):
+        """Test exports are streamed as CSV, gzipped for clients accepting it."""
+        import csv
+        import gzip
+        
+        self.client.login(username='staffuser', password='testpass123')
+        
+        response = self.client.get(
+            reverse('dashboard:export'), {'format': 'csv'}, HTTP_ACCEPT_ENCODING='gzip, deflate'
+        )
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', response['Vary'])
+        self.assertTrue(response['Content-Type'].startswith('text/csv'))
+        
+        content = gzip.decompress(b''.join(response.streaming_content)).decode()
+        lines = list(csv.reader(content.splitlines()))
+        self.assertEqual(lines[0], ['widget_id', 'record', 'data'])
+        self.assertIn(['user_count', 'widget', 'Total Users', str(User.objects.count())], lines)
+        self.assertIn(['recent_logins', 'headers', 'Username', 'Email', 'Last Login', 'Status'], lines)
+    
+    def test_export_unknown_format(self):
+        """Test unknown export formats are rejected."""
+        self.client.login(username='staffuser', password='testpass123')
+        
+        response = self.client.get(reverse('dashboard:export'), {'format': 'xml'})
+        self.assertEqual(response.status_code, 400)
 
 
 class TestDashboardIntegration(TestCase):
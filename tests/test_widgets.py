@@ -3,6 +3,7 @@ Tests for dashboard widgets.
 """
 
 import pytest
+from datetime import timedelta
 from django.contrib.auth.models import User
 from django.test import RequestFactory
 from dashboard.widgets import (
@@ -14,6 +15,8 @@ from dashboard.widgets import (
     UserCountWidget,
     RecentLoginsWidget,
     LoginActivityChartWidget,
+    TimeSeriesChartWidget,
+    UserRegistrationChartWidget,
 )
 
 
@@ -44,6 +47,92 @@ class TestWidgetRegistry:
         widget_names = [w.__name__ for w in enabled]
         assert 'UserCountWidget' in widget_names
         assert 'RecentLoginsWidget' in widget_names
+    
+    def test_enabled_widgets_computed_once(self):
+        """Test the enabled widget list is cached until settings change."""
+        from django.test import override_settings
+        
+        specs = widget_registry.get_enabled_specs()
+        assert widget_registry.get_enabled_specs() is specs
+        assert [spec.widget_id for spec in specs] == ['user_count', 'recent_logins']
+        
+        with override_settings(CUSTOM_ADMIN_DASHBOARD_CONFIG={
+            'WIDGETS': ['LoginActivityChartWidget', 'dashboard.widgets.UserCountWidget', 'Missing'],
+        }):
+            enabled = widget_registry.get_enabled_widgets()
+            assert enabled == [LoginActivityChartWidget, UserCountWidget]
+        
+        assert widget_registry.get_enabled_specs() is not specs
+        assert widget_registry.get_enabled_widgets()[0] is UserCountWidget
+    
+    def test_register_does_not_instantiate(self):
+        """Test widget ids are read from the class when possible."""
+        from dashboard.widgets import WidgetRegistry
+        
+        class CountingWidget(BaseWidget):
+            instances = 0
+            
+            def __init__(self, *args, **kwargs):
+                CountingWidget.instances += 1
+                super().__init__(*args, **kwargs)
+            
+            def get_context_data(self):
+                return {}
+        
+        registry = WidgetRegistry()
+        registry.register(CountingWidget)
+        
+        assert CountingWidget.instances == 0
+        spec = registry.get_spec('countingwidget')
+        assert spec.widget_class is CountingWidget
+        assert spec.name == 'CountingWidget'
+        assert registry.find_spec(spec.path) is spec
+    
+    def test_widget_spec_metadata(self):
+        """Test widget specs carry the class metadata."""
+        spec = widget_registry.get_spec('user_count')
+        
+        assert spec.title == UserCountWidget.title
+        assert spec.widget_type == 'metric'
+        assert spec.cache_scope == 'global'
+        assert spec.get_metadata()['id'] == 'user_count'
+    
+    @pytest.mark.django_db
+    def test_widget_spec_permissions(self):
+        """Test permissions are checked on the spec without instantiating widgets."""
+        from dashboard.widgets import WidgetSpec
+        
+        staff = User.objects.create_user(username='staff', is_staff=True)
+        regular = User.objects.create_user(username='regular')
+        
+        class RestrictedWidget(BaseWidget):
+            requires_permissions = ['auth.delete_user']
+            
+            def __init__(self, *args, **kwargs):
+                raise AssertionError("Widget should not be instantiated")
+            
+            def get_context_data(self):
+                return {}
+        
+        class CustomPermissionWidget(BaseWidget):
+            def has_permission(self, user):
+                return user.username == 'regular'
+            
+            def get_context_data(self):
+                return {}
+        
+        spec = WidgetSpec.from_class('restricted', RestrictedWidget)
+        assert not spec.custom_permission
+        assert not spec.has_permission(staff)
+        
+        spec = widget_registry.get_spec('user_count')
+        assert spec.has_permission(staff)
+        assert not spec.has_permission(regular)
+        
+        spec = WidgetSpec.from_class('custom', CustomPermissionWidget)
+        assert spec.custom_permission
+        assert spec.has_permission(regular)
+        assert not spec.has_permission(staff)
 
 
 @pytest.mark.django_db
@@ -192,6 +281,30 @@ class TestUserCountWidget:
         assert 'new_this_week' in context
         assert context['active_users'] == 6  # All users are active by default
     
+    def test_user_count_data_memoized(self, django_assert_num_queries):
+        """Test widget data methods hit the database once per instance."""
+        widget = UserCountWidget(request=self.request)
+        widget.prefetch()
+        
+        with django_assert_num_queries(0):
+            widget.get_value()
+            widget.get_trend()
+            widget.get_context_data()
+            widget.get_api_data()
+            widget.render()
+    
+    def test_user_count_invalidate(self):
+        """Test invalidation re-evaluates memoized data."""
+        widget = UserCountWidget(request=self.request)
+        assert widget.get_value() == 6
+        
+        User.objects.create_user(username='late', email='late@example.com')
+        assert widget.get_value() == 6
+        
+        widget.invalidate()
+        assert widget.get_value() == 7
+        assert widget.data['value'] == 7
+    
     def test_user_count_trend(self):
         """Test user count trend calculation."""
         widget = UserCountWidget(request=self.request)
@@ -236,6 +349,49 @@ class TestRecentLoginsWidget:
         # Each row should have 4 columns (matching headers)
         for row in rows:
             assert len(row) == 4
+    
+    def test_iter_rows(self):
+        """Test rows are streamed from the queryset in chunks, up to max_rows."""
+        from django.utils import timezone
+        
+        for i in range(7):
+            User.objects.create_user(username=f'login{i}', last_login=timezone.now())
+        widget = RecentLoginsWidget(request=self.request)
+        
+        rows = list(widget.iter_rows(chunk_size=2))
+        assert rows == widget.get_rows()
+        assert len(rows) == widget.max_rows
+    
+    def test_default_format_row(self):
+        """Test queryset rows default to one column holding each object's string."""
+        from dashboard.widgets import TableWidget
+        
+        class UserTableWidget(TableWidget):
+            title = "Users"
+            
+            def get_queryset(self):
+                return User.objects.order_by('pk')
+        
+        widget = UserTableWidget(request=self.request)
+        assert widget.get_rows() == [['testuser']]
+        assert list(widget.iter_rows()) == [['testuser']]
+    
+    def test_iter_rows_default_chunk_size(self):
+        """Test rows are fetched EXPORT_CHUNK_SIZE at a time unless told otherwise."""
+        from dashboard.widgets import TableWidget
+        
+        class GroupedUserTableWidget(TableWidget):
+            title = "Users"
+            
+            def get_queryset(self):
+                # iterator() needs a chunk size to prefetch related objects
+                return User.objects.prefetch_related('groups').order_by('pk')
+            
+            def format_row(self, obj):
+                return [obj.username, len(obj.groups.all())]
+        
+        widget = GroupedUserTableWidget(request=self.request)
+        assert list(widget.iter_rows()) == [['testuser', 0]]
 
 
 @pytest.mark.django_db
@@ -327,6 +483,91 @@ class TestLoginActivityChartWidget:
         assert 'label' in dataset
         assert 'data' in dataset
         assert len(dataset['data']) == 7  # 7 days of data
+    
+    def test_login_chart_single_query(self, django_assert_num_queries):
+        """Test login activity is bucketed with a single query."""
+        from django.utils import timezone
+        
+        self.user.last_login = timezone.now()
+        self.user.save()
+        
+        widget = LoginActivityChartWidget(request=self.request)
+        with django_assert_num_queries(1):
+            chart_data = widget.get_chart_data()
+        
+        data = chart_data['data']['datasets'][0]['data']
+        assert data == [0, 0, 0, 0, 0, 0, 1]
+
+
+@pytest.mark.django_db
+class TestTimeSeriesChartWidget:
+    """Test time bucketed chart widgets."""
+    
+    def setup_method(self):
+        """Set up test data."""
+        from django.utils import timezone
+        
+        self.request = RequestFactory().get('/dashboard/')
+        self.now = timezone.localtime()
+        for i, age in enumerate([timedelta(0), timedelta(0), timedelta(days=40)]):
+            User.objects.create_user(
+                username=f'user{i}',
+                date_joined=self.now - age,
+            )
+    
+    def make_widget(self, **attrs):
+        attrs.setdefault('title', 'Registrations')
+        attrs.setdefault('queryset', User)
+        attrs.setdefault('date_field', 'date_joined')
+        widget_class = type('RegistrationsWidget', (TimeSeriesChartWidget,), attrs)
+        return widget_class(request=self.request)
+    
+    def test_day_buckets_zero_filled(self):
+        """Test daily buckets include days without rows."""
+        widget = self.make_widget(bucket='day', periods=7)
+        labels, data = widget.get_series()
+        
+        assert len(labels) == 7
+        assert labels[-1] == self.now.strftime('%m/%d')
+        assert data == [0, 0, 0, 0, 0, 0, 2]
+    
+    def test_hour_buckets(self):
+        """Test hourly buckets end with the current hour."""
+        widget = self.make_widget(bucket='hour', periods=24)
+        labels, data = widget.get_series()
+        
+        assert len(data) == 24
+        assert labels[-1] == self.now.strftime('%H:00')
+        assert data[-1] == 2
+    
+    def test_week_and_month_buckets(self):
+        """Test weekly and monthly buckets cover older rows."""
+        weeks = self.make_widget(bucket='week', periods=8).get_series()[1]
+        months = self.make_widget(bucket='month', periods=3).get_series()[1]
+        
+        assert len(weeks) == 8
+        assert sum(weeks) == 3
+        assert months[-1] == 2
+        assert sum(months) == 3
+    
+    def test_sum_aggregate(self):
+        """Test custom aggregates are applied per bucket."""
+        from django.db.models import Sum
+        
+        widget = self.make_widget(aggregate=Sum('id'), periods=1)
+        ids = User.objects.filter(date_joined__date=self.now.date()).values_list('id', flat=True)
+        
+        assert widget.get_series()[1] == [sum(ids)]
+    
+    def test_registration_widget_context(self, django_assert_num_queries):
+        """Test the registration summary reuses the chart series."""
+        widget = UserRegistrationChartWidget(request=self.request)
+        
+        with django_assert_num_queries(1):
+            widget.get_chart_data()
+            context = widget.get_context_data()
+        
+        assert context['this_month'] == 2
 
 
 @pytest.mark.django_db
@@ -389,3 +630,231 @@ class TestWidgetIntegration:
         assert data1 == data2
         assert 'title' in data1
         assert 'value' in data1
+
+
+class TestWidgetEngine:
+    """Test concurrent widget evaluation."""
+    
+    def make_widget_class(self):
+        import threading
+        
+        class ThreadRecordingWidget(BaseWidget):
+            title = "Thread Recording"
+            
+            def get_value(self):
+                return threading.current_thread().name
+            
+            def get_context_data(self):
+                return {}
+        
+        return ThreadRecordingWidget
+    
+    def test_prefetch_widgets_concurrently(self):
+        """Test widgets are evaluated in worker threads."""
+        import threading
+        from dashboard.engine import prefetch_widgets
+        
+        widget_class = self.make_widget_class()
+        widgets = prefetch_widgets([widget_class() for _ in range(3)], max_workers=3)
+        
+        main_thread = threading.current_thread().name
+        for widget in widgets:
+            assert widget.data['value'] != main_thread
+            assert widget.data['value'].startswith('dashboard-widget')
+    
+    def test_prefetch_widgets_serial(self):
+        """Test a single worker evaluates widgets in the calling thread."""
+        import threading
+        from dashboard.engine import prefetch_widgets
+        
+        widget_class = self.make_widget_class()
+        widgets = prefetch_widgets([widget_class() for _ in range(3)], max_workers=1)
+        
+        for widget in widgets:
+            assert widget.data['value'] == threading.current_thread().name
+    
+    def test_aprefetch_widgets(self):
+        """Test async prefetch evaluates sync widgets in worker threads."""
+        import asyncio
+        import threading
+        from dashboard.engine import aprefetch_widgets
+        
+        widget_class = self.make_widget_class()
+        widgets = asyncio.run(aprefetch_widgets([widget_class() for _ in range(3)]))
+        
+        for widget in widgets:
+            assert widget.data['value'] != threading.current_thread().name
+    
+    @pytest.mark.django_db
+    def test_prefetch_widgets_inside_transaction(self):
+        """Test widgets are evaluated serially inside an open transaction."""
+        import threading
+        from dashboard.engine import prefetch_widgets
+        
+        widget_class = self.make_widget_class()
+        widgets = prefetch_widgets([widget_class() for _ in range(3)], max_workers=3)
+        
+        for widget in widgets:
+            assert widget.data['value'] == threading.current_thread().name
+    
+    def test_iter_prefetch_widgets_completion_order(self):
+        """Test widgets are yielded as they complete, with their errors."""
+        import threading
+        from dashboard.engine import iter_prefetch_widgets
+        
+        release = threading.Event()
+        
+        class SlowWidget(BaseWidget):
+            title = "Slow"
+            
+            def get_value(self):
+                release.wait(timeout=5)
+                return 'slow'
+            
+            def get_context_data(self):
+                return {}
+        
+        class BrokenWidget(BaseWidget):
+            title = "Broken"
+            
+            def get_value(self):
+                raise ValueError("broken")
+            
+            def get_context_data(self):
+                return {}
+        
+        slow, broken = SlowWidget(), BrokenWidget()
+        results = iter_prefetch_widgets([slow, broken], max_workers=2)
+        
+        widget, error = next(results)
+        assert widget is broken
+        assert isinstance(error, ValueError)
+        
+        release.set()
+        widget, error = next(results)
+        assert widget is slow
+        assert error is None
+        assert widget.data['value'] == 'slow'
+    
+    def test_iter_prefetch_widgets_cancels_pending(self):
+        """Test widgets not started yet are cancelled when the consumer stops."""
+        import threading
+        import time
+        from dashboard.engine import iter_prefetch_widgets
+        
+        release = threading.Event()
+        started = []
+        
+        class BlockingWidget(BaseWidget):
+            title = "Blocking"
+            
+            def get_value(self):
+                started.append(self)
+                release.wait(timeout=5)
+            
+            def get_context_data(self):
+                return {}
+        
+        class FastWidget(BaseWidget):
+            title = "Fast"
+            
+            def get_context_data(self):
+                return {}
+        
+        fast = FastWidget()
+        blocking = [BlockingWidget() for _ in range(4)]
+        results = iter_prefetch_widgets([fast, *blocking], max_workers=2)
+        
+        assert next(results) == (fast, None)
+        # Wait for the freed worker to start the next widget
+        deadline = time.monotonic() + 5
+        while len(started) < 2 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        
+        threading.Timer(0.2, release.set).start()
+        results.close()
+        
+        # Only the widgets already running when the consumer stopped were evaluated
+        assert len(started) == 2
+    
+    def test_iter_prefetch_widgets_serial(self):
+        """Test a single worker yields every widget in order."""
+        from dashboard.engine import iter_prefetch_widgets
+        
+        widget_class = self.make_widget_class()
+        widgets = [widget_class() for _ in range(3)]
+        results = list(iter_prefetch_widgets(widgets, max_workers=1))
+        
+        assert [widget for widget, error in results] == widgets
+        assert all(error is None for widget, error in results)
+    
+    def test_stream_fragment(self):
+        """Test a streamed widget fragment swaps itself into its placeholder."""
+        from django.template.loader import render_to_string
+        
+        class BrokenWidget(MetricWidget):
+            title = "Broken"
+        
+        widget = BrokenWidget()
+        html = render_to_string('dashboard/widgets/stream_fragment.html', {
+            'widget': widget,
+            'widget_error': ValueError("broken"),
+        })
+        
+        assert f'<template id="widget-fragment-{widget.widget_id}">' in html
+        assert f'dashboardSwapWidget("{widget.widget_id}")' in html
+        assert 'This widget could not be loaded.' in html
+
+
+@pytest.mark.django_db
+class TestWidgetInstrumentation:
+    """Test per-widget timing and query instrumentation."""
+    
+    def setup_method(self):
+        """Set up test data."""
+        self.request = RequestFactory().get('/dashboard/')
+        self.request.user = User.objects.create_user(username='staff', is_staff=True)
+    
+    def test_prefetch_records_queries(self):
+        """Test prefetching a widget records its queries and duration."""
+        widget = UserCountWidget(request=self.request)
+        widget.prefetch()
+        
+        assert widget.timing.widget_id == 'user_count'
+        assert widget.timing.queries == 4  # value, trend and two context counts
+        assert widget.timing.duration >= widget.timing.db_time > 0
+    
+    @pytest.mark.django_db(transaction=True)
+    def test_aprefetch_records_queries(self):
+        """Test async prefetch records the queries run in worker threads."""
+        import asyncio
+        from dashboard.engine import aprefetch_widgets
+        
+        # Every run evaluates each data method once, as prefetch() does
+        for _ in range(10):
+            widget = UserCountWidget(request=self.request)
+            asyncio.run(aprefetch_widgets([widget]))
+            assert widget.timing.queries == 4
+    
+    def test_over_budget_is_logged(self, caplog, settings):
+        """Test widgets over the query budget are logged."""
+        settings.CUSTOM_ADMIN_DASHBOARD_CONFIG = {'WIDGET_QUERY_BUDGET': 1}
+        
+        with caplog.at_level('WARNING', logger='dashboard'):
+            UserCountWidget(request=self.request).prefetch()
+        
+        assert 'Widget user_count over budget' in caplog.text
+    
+    def test_server_timing_header(self):
+        """Test widget timings are formatted as a Server-Timing header."""
+        from django.http import HttpResponse
+        from dashboard.instrumentation import add_server_timing, get_widget_timings
+        
+        widget = UserCountWidget(request=self.request)
+        widget.prefetch()
+        
+        response = add_server_timing(HttpResponse(), get_widget_timings([widget]))
+        
+        assert response['Server-Timing'].startswith('user_count;dur=')
+        assert 'desc="4 queries"' in response['Server-Timing']
+        assert 'user_count-db;dur=' in response['Server-Timing']